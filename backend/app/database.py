@@ -1,24 +1,168 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from beanie import init_beanie
-from app.models import Goal, Task
+from app.instrumentation import db_command_listener, metrics, span
+from app.models import CachedBreakdown, GenerationJob, Goal, IdempotencyRecord, Task
+from typing import Any, Dict, Optional
+import asyncio
 import os
+import time
 
-async def get_database():
+
+class DatabaseManager:
+    """
+    Process-wide MongoDB connection manager
+
+    The Motor client is created lazily on first use and reused for every
+    request served by this process (warm serverless invocations and
+    long-lived uvicorn workers alike). Beanie is initialized exactly once
+    per client.
     """
-    Create a fresh database connection for each request
-    This is required for serverless environments like Vercel
+
+    def __init__(self):
+        self._client: Optional[AsyncIOMotorClient] = None
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._supports_transactions: Optional[bool] = None
+        self._metrics = {
+            "clients_created": 0,
+            "beanie_inits": 0,
+            "connection_requests": 0,
+            "last_connect_ms": None,
+        }
+
+    def _client_options(self) -> Dict[str, Any]:
+        """Build pool options from environment variables"""
+        return {
+            "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "20")),
+            "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+            "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "60000")),
+            "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        }
+
+    async def connect(self) -> AsyncIOMotorDatabase:
+        """
+        Return the shared database handle, connecting on first use
+
+        Returns:
+            Database with Beanie models initialized
+        """
+        self._metrics["connection_requests"] += 1
+        loop = asyncio.get_running_loop()
+
+        # Fast path: already connected on this event loop
+        if self._db is not None and self._loop is loop:
+            return self._db
+
+        if self._lock is None or self._loop is not loop:
+            # Motor clients and asyncio locks are bound to the loop they were
+            # created on, so a new loop (e.g. a fresh serverless runtime) starts over
+            self._lock = asyncio.Lock()
+            self._reset()
+            self._loop = loop
+
+        async with self._lock:
+            if self._db is None:
+                await self._initialize()
+
+        return self._db
+
+    async def _initialize(self):
+        """Create the client and initialize Beanie once"""
+        mongodb_url = os.getenv("MONGODB_URL")
+        database_name = os.getenv("DATABASE_NAME", "smart_task_planner")
+
+        if not mongodb_url:
+            raise ValueError("MONGODB_URL environment variable not set")
+
+        started = time.perf_counter()
+        options = self._client_options()
+        if metrics.enabled:
+            options["event_listeners"] = [db_command_listener]
+        client = AsyncIOMotorClient(mongodb_url, **options)
+        db = client[database_name]
+        self._metrics["clients_created"] += 1
+
+        try:
+            await init_beanie(database=db, document_models=[Goal, Task, CachedBreakdown, GenerationJob, IdempotencyRecord])
+        except Exception:
+            client.close()
+            raise
+
+        self._metrics["beanie_inits"] += 1
+        self._metrics["last_connect_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        self._client = client
+        self._db = db
+
+    def _reset(self):
+        """Drop the current client without touching the lock"""
+        if self._client is not None:
+            self._client.close()
+        self._client = None
+        self._db = None
+        self._supports_transactions = None
+
+    @property
+    def client(self) -> Optional[AsyncIOMotorClient]:
+        """The shared client, or None before the first connect()"""
+        return self._client
+
+    async def supports_transactions(self) -> bool:
+        """
+        Whether the deployment accepts multi-document transactions
+
+        Only replica sets and sharded clusters do; standalone servers and
+        in-memory test doubles do not. The answer is cached per client.
+        """
+        if self._supports_transactions is None:
+            db = await self.connect()
+            try:
+                hello = await db.command("hello")
+                self._supports_transactions = bool(
+                    hello.get("setName") or hello.get("msg") == "isdbgrid"
+                )
+            except Exception:
+                self._supports_transactions = False
+        return self._supports_transactions
+
+    async def close(self):
+        """Close the shared client (used on shutdown and in tests)"""
+        self._reset()
+        self._loop = None
+        self._lock = None
+
+    async def health(self) -> Dict[str, Any]:
+        """Ping the database and report round-trip latency"""
+        try:
+            db = await self.connect()
+            started = time.perf_counter()
+            await db.command("ping")
+            return {
+                "status": "healthy",
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+            }
+        except Exception as e:
+            return {"status": "unhealthy", "error": str(e)}
+
+    def metrics(self) -> Dict[str, Any]:
+        """Connection counters for the metrics endpoint"""
+        return {
+            **self._metrics,
+            "connected": self._db is not None,
+            "pool_options": self._client_options(),
+        }
+
+
+# Create singleton instance
+db_manager = DatabaseManager()
+
+
+async def get_database() -> AsyncIOMotorDatabase:
+    """
+    FastAPI dependency returning the shared database handle
+
+    Routes declare `db = Depends(get_database)` instead of opening and
+    closing their own client.
     """
-    mongodb_url = os.getenv("MONGODB_URL")
-    database_name = os.getenv("DATABASE_NAME", "smart_task_planner")
-    
-    if not mongodb_url:
-        raise ValueError("MONGODB_URL environment variable not set")
-    
-    # Create a fresh client for this request
-    client = AsyncIOMotorClient(mongodb_url)
-    db = client[database_name]
-    
-    # Initialize Beanie with the database
-    await init_beanie(database=db, document_models=[Goal, Task])
-    
-    return db, client
+    with span("db.connect"):
+        return await db_manager.connect()
@@ -0,0 +1,290 @@
+"""
+Request instrumentation: timing histograms, DB command counts and spans
+
+InstrumentationMiddleware times every HTTP request by route template and
+status. span() times a block inside a request (database connect, LLM
+calls, response parsing), and DatabaseCommandListener times every MongoDB
+command the driver sends, so each Beanie query is covered without
+wrapping it by hand. Everything lands in one in-process registry rendered
+in the Prometheus text format at /metrics.
+
+A random METRICS_LOG_SAMPLE_RATE share of requests, plus every request
+slower than METRICS_SLOW_REQUEST_MS, is also logged as one JSON line with
+its span breakdown and DB command count.
+
+With METRICS_ENABLED=false the middleware and listener are not installed
+and span() returns a shared no-op context manager.
+"""
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import os
+import random
+import sys
+import threading
+import time
+
+from pymongo import monitoring
+
+from app.serialization import dumps
+
+# Seconds; covers fast cache hits through slow LLM generations
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+logger = logging.getLogger("app.requests")
+
+
+class Metrics:
+    """
+    Thread-safe counters and histograms with Prometheus text output
+
+    Driver callbacks run on Motor's executor threads, hence the lock.
+    Metric names are declared once with describe(); samples are keyed by
+    their label values.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        self._lock = threading.Lock()
+        self._meta: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {}
+        self._samples: Dict[str, Dict[tuple, Any]] = {}
+        self._gauges: List[Tuple[str, str, Callable[[], Dict[tuple, float]]]] = []
+
+    def describe(self, name: str, kind: str, help_text: str, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        """Declare a "counter" or "histogram" (buckets only apply to histograms)"""
+        self._meta[name] = (kind, help_text, buckets)
+        self._samples.setdefault(name, {})
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Dict[tuple, float]]):
+        """
+        Register a gauge read when /metrics is scraped
+
+        Args:
+            name: Metric name
+            help_text: HELP line
+            collect: Returns label tuples (of (name, value) pairs) -> value
+        """
+        self._gauges.append((name, help_text, collect))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(labels.items())
+        with self._lock:
+            samples = self._samples[name]
+            samples[key] = samples.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(labels.items())
+        buckets = self._meta[name][2]
+        with self._lock:
+            samples = self._samples[name]
+            sample = samples.get(key)
+            if sample is None:
+                # Per-bucket counts (last is +Inf), then sum
+                sample = samples[key] = [0] * (len(buckets) + 1) + [0.0]
+            sample[bisect_left(buckets, value)] += 1
+            sample[-1] += value
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            snapshot = {
+                name: {key: list(sample) if isinstance(sample, list) else sample for key, sample in samples.items()}
+                for name, samples in self._samples.items()
+            }
+
+        for name, (kind, help_text, buckets) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, sample in snapshot[name].items():
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(key)} {_number(sample)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(buckets + (float("inf"),), sample):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(key)} {_number(sample[-1])}")
+                lines.append(f"{name}_count{_labels(key)} {cumulative}")
+
+        for name, help_text, collect in self._gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for key, value in collect().items():
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key: tuple) -> str:
+    if not key:
+        return ""
+    pairs = ",".join(
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in key
+    )
+    return "{" + pairs + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class RequestTrace:
+    """Spans and DB commands of the request being served"""
+
+    __slots__ = ("spans", "db_commands")
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+        self.db_commands = 0
+
+
+_trace: ContextVar[Optional[RequestTrace]] = ContextVar("request_trace", default=None)
+
+
+class _Span:
+    __slots__ = ("name", "labels", "started")
+
+    def __init__(self, name: str, labels: Dict[str, Any]):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        metrics.observe("app_span_duration_seconds", elapsed, span=self.name,
+                        outcome="error" if exc_type else "ok", **self.labels)
+        trace = _trace.get()
+        if trace is not None:
+            trace.spans.append((self.name, elapsed))
+        return False
+
+
+_NOOP_SPAN = nullcontext()
+
+
+def span(name: str, **labels):
+    """
+    Time a block as a named span (no-op when metrics are disabled)
+
+    Usage:
+        with span("llm.generate", provider=llm.name):
+            ...
+
+    Args:
+        name: Span name, dotted by subsystem
+        labels: Extra low-cardinality labels for the histogram
+    """
+    if not metrics.enabled:
+        return _NOOP_SPAN
+    return _Span(name, labels)
+
+
+class DatabaseCommandListener(monitoring.CommandListener):
+    """
+    Times every MongoDB command and counts it against the current request
+
+    Motor runs driver calls on executor threads with a copy of the caller's
+    context, so the request's trace is visible here.
+    """
+
+    def started(self, event):
+        trace = _trace.get()
+        if trace is not None:
+            trace.db_commands += 1
+
+    def succeeded(self, event):
+        metrics.observe("app_db_command_duration_seconds", event.duration_micros / 1e6,
+                        command=event.command_name, outcome="ok")
+
+    def failed(self, event):
+        metrics.observe("app_db_command_duration_seconds", event.duration_micros / 1e6,
+                        command=event.command_name, outcome="error")
+
+
+class InstrumentationMiddleware:
+    """
+    ASGI middleware recording request latency and DB commands per request
+
+    Requests are labelled by route template (/api/goals/{goal_id}), not raw
+    path, to keep label cardinality bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sample_rate = float(os.getenv("METRICS_LOG_SAMPLE_RATE", "0.01"))
+        self.slow_seconds = float(os.getenv("METRICS_SLOW_REQUEST_MS", "1000")) / 1000
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            _trace.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            metrics.observe("app_request_duration_seconds", elapsed,
+                            method=scope["method"], route=path, status=str(status))
+            metrics.observe("app_request_db_commands", trace.db_commands, route=path)
+            if elapsed >= self.slow_seconds or random.random() < self.sample_rate:
+                self._log(scope, path, status, elapsed, trace)
+
+    def _log(self, scope, path: str, status: int, elapsed: float, trace: RequestTrace):
+        spans: Dict[str, float] = {}
+        for name, seconds in trace.spans:
+            spans[name] = spans.get(name, 0) + seconds * 1000
+        logger.info(dumps({
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": path,
+            "status": status,
+            "duration_ms": round(elapsed * 1000, 2),
+            "db_commands": trace.db_commands,
+            "spans_ms": {name: round(ms, 2) for name, ms in spans.items()},
+            "slow": elapsed >= self.slow_seconds
+        }).decode())
+
+
+def configure_logging():
+    """Send sampled request logs to stdout unless the host configured a handler"""
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+# Create singleton instances
+metrics = Metrics()
+db_command_listener = DatabaseCommandListener()
+
+metrics.describe("app_request_duration_seconds", "histogram", "HTTP request latency by route and status")
+metrics.describe("app_request_db_commands", "histogram", "MongoDB commands sent per HTTP request", COUNT_BUCKETS)
+metrics.describe("app_db_command_duration_seconds", "histogram", "MongoDB command round-trip time by command")
+metrics.describe("app_span_duration_seconds", "histogram", "Duration of instrumented blocks by span name")
+metrics.describe("app_llm_tokens_total", "counter", "LLM tokens by provider, call kind and direction")
+metrics.describe("app_llm_cost_usd_total", "counter", "Estimated LLM spend in US dollars")
+metrics.describe("app_llm_call_duration_seconds", "histogram", "LLM call latency by provider and call kind")
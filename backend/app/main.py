@@ -1,8 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import os
+import logging
 
-from app.routes import goals, tasks
+from app.routes import goals, jobs, search, tasks
+from app.database import db_manager
+from app.instrumentation import InstrumentationMiddleware, configure_logging, metrics
+from app.services.breakdown_cache import breakdown_cache
+from app.services.event_hub import event_hub
+from app.services.llm_provider import llm
+from app.services.read_cache import read_cache
+from app.services.search_service import search_service
+from app.services.task_service import task_service
+from app.warmup import warm_up, warm_up_on_startup
+
+logger = logging.getLogger(__name__)
 
 # NO lifespan context manager for serverless!
 app = FastAPI(
@@ -25,11 +38,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Idempotent-Replayed"],
 )
 
+# Outermost, so request timings include CORS handling
+if metrics.enabled:
+    configure_logging()
+    app.add_middleware(InstrumentationMiddleware)
+    metrics.gauge("app_read_cache_entries", "Goal detail responses in the read cache",
+                  lambda: {(): read_cache.stats()["entries"]})
+    metrics.gauge("app_breakdown_cache_events", "Breakdown cache lookups by outcome since start",
+                  lambda: {(("outcome", name),): value for name, value in breakdown_cache.stats().items()
+                           if name in ("hits", "mongo_hits", "misses")})
+    metrics.gauge("app_llm_generations_in_flight", "Distinct LLM generations running now",
+                  lambda: {(): task_service.generation_flights.stats()["in_flight"]})
+    metrics.gauge("app_event_subscribers", "Open live update connections",
+                  lambda: {(): event_hub.stats()["subscribers"]})
+
+# Clients are built on first use; long-lived servers can opt into paying
+# that cost at startup instead (serverless runtimes skip startup events)
+if warm_up_on_startup():
+    async def warm_up_at_startup():
+        logger.info("Warm-up: %s", await warm_up())
+
+    app.router.on_startup.append(warm_up_at_startup)
+
 # Include routers
 app.include_router(goals.router)
 app.include_router(tasks.router)
+app.include_router(jobs.router)
+app.include_router(search.router)
 
 @app.get("/")
 async def root():
@@ -39,7 +77,9 @@ async def root():
         "endpoints": {
             "docs": "/docs",
             "goals": "/api/goals",
-            "tasks": "/api/tasks"
+            "tasks": "/api/tasks",
+            "jobs": "/api/jobs",
+            "search": "/api/search"
         }
     }
 
@@ -49,3 +89,61 @@ async def health_check():
         "status": "healthy",
         "service": "smart-task-planner"
     }
+
+
+@app.get("/health/db")
+async def database_health_check():
+    """Database ping plus connection pool counters"""
+    return {
+        **await db_manager.health(),
+        "metrics": db_manager.metrics()
+    }
+
+
+@app.get("/health/llm")
+async def llm_health_check():
+    """Configured LLM provider with its token usage and estimated spend"""
+    try:
+        return {"provider": llm.name, **llm.provider.usage_stats()}
+    except ValueError as e:
+        return {"provider": llm.name, "status": "unavailable", "error": str(e)}
+
+
+@app.get("/health/warmup")
+async def warmup_check():
+    """
+    Connect to the database and build the LLM provider now
+    
+    Point a scheduled ping (e.g. a Vercel cron) here so the first real
+    request after a cold start doesn't pay for client setup.
+    """
+    return await warm_up()
+
+
+@app.get("/health/cache")
+async def cache_health_check():
+    """Breakdown and read cache hit/miss counters"""
+    return {
+        **breakdown_cache.stats(),
+        "read_cache": read_cache.stats()
+    }
+
+
+@app.get("/health/events")
+async def events_health_check():
+    """Live update subscribers and delivery counters"""
+    return {"enabled": event_hub.enabled, **event_hub.stats()}
+
+
+@app.get("/health/search")
+async def search_health_check():
+    """Search backend in use and in-process index size"""
+    return search_service.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Request, span, database and LLM metrics in the Prometheus text format"""
+    if not metrics.enabled:
+        return PlainTextResponse("# metrics disabled (METRICS_ENABLED=false)\n", status_code=404)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,6 +1,7 @@
-from beanie import Document
+from beanie import Document, Indexed, PydanticObjectId
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from pymongo import TEXT, IndexModel
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -29,7 +30,7 @@ class TaskDependency(BaseModel):
 
 class Task(Document):
     """Task model for MongoDB"""
-    goal_id: str
+    goal_id: PydanticObjectId
     title: str
     description: str
     status: TaskStatus = TaskStatus.PENDING
@@ -38,11 +39,33 @@ class Task(Document):
     start_date: Optional[datetime] = None
     end_date: Optional[datetime] = None
     dependencies: List[TaskDependency] = []
+    version: int = 0  # Bumped on every write; part of the task's ETag
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "tasks"
+        indexes = [
+            # Also serves plain goal_id lookups through its prefix
+            IndexModel([("goal_id", 1), ("created_at", 1)], name="goal_id_created_at"),
+            IndexModel([("goal_id", 1), ("status", 1)], name="goal_id_status"),
+            # Full-text search (GET /api/search); weights match search_index.FIELD_WEIGHTS
+            IndexModel([("title", TEXT), ("description", TEXT)], name="title_description_text",
+                       weights={"title": 3, "description": 1}),
+        ]
+
+
+class GoalProgress(BaseModel):
+    """Task rollups kept on the goal so views don't have to scan its tasks"""
+    total_tasks: int = 0
+    # One counter per TaskStatus value, so updates can $inc "progress.<status>"
+    pending: int = 0
+    in_progress: int = 0
+    completed: int = 0
+    blocked: int = 0
+    total_hours: float = 0
+    completed_hours: float = 0
+    next_actionable: List[TaskDependency] = []  # Unfinished tasks whose dependencies are done
 
 
 class Goal(Document):
@@ -51,13 +74,154 @@ class Goal(Document):
     description: str
     deadline: Optional[datetime] = None
     total_estimated_hours: Optional[float] = None
+    progress: Optional[GoalProgress] = None
+    # Set by status changes, which only $inc the counters, until the refresh that
+    # follows them brings progress.next_actionable up to date
+    needs_refresh: bool = False
+    version: int = 0  # Bumped whenever the goal or any of its tasks changes; part of the ETag
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "goals"
+        indexes = [
+            # Keyset pagination orders by (field, _id)
+            IndexModel([("created_at", -1), ("_id", -1)], name="created_at_id"),
+            IndexModel([("deadline", 1), ("_id", 1)], name="deadline_id"),
+            IndexModel([("title", TEXT), ("description", TEXT)], name="title_description_text",
+                       weights={"title": 3, "description": 1}),
+        ]
+
+
+# Projections (fetch only the fields a view needs)
+class GoalSummary(BaseModel):
+    """Goal fields shown in the goals list"""
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    description: str
+    deadline: Optional[datetime] = None
+    total_estimated_hours: Optional[float] = None
+    progress: Optional[GoalProgress] = None
+    created_at: datetime
+
+
+class TaskSummary(BaseModel):
+    """Task fields shown in the goal detail view"""
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    description: str
+    status: TaskStatus
+    priority: TaskPriority
+    estimated_hours: Optional[float] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    dependencies: List[TaskDependency] = []
+
+
+class TaskSearchView(BaseModel):
+    """Task fields shown in search results"""
+    id: PydanticObjectId = Field(alias="_id")
+    goal_id: PydanticObjectId
+    title: str
+    description: str
+    status: TaskStatus
+    priority: TaskPriority
+    estimated_hours: Optional[float] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+
+
+class TaskPlanningView(BaseModel):
+    """Task fields used by dependency analysis, scheduling and status cascades"""
+    id: PydanticObjectId = Field(alias="_id")
+    goal_id: PydanticObjectId
+    title: str
+    status: TaskStatus
+    priority: TaskPriority
+    estimated_hours: Optional[float] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    dependencies: List[TaskDependency] = []
+
+
+class TaskStatusView(BaseModel):
+    """Task fields returned by a status update"""
+    id: PydanticObjectId = Field(alias="_id")
+    goal_id: PydanticObjectId
+    title: str
+    status: TaskStatus
+    estimated_hours: Optional[float] = None
+    version: int = 0
+    updated_at: datetime
 
 
+class CachedBreakdown(Document):
+    """Shared cache entry for an AI task breakdown"""
+    key: Indexed(str, unique=True)
+    response: Dict[str, Any]
+    anchor_date: datetime  # Day the breakdown was generated; dates are rebased from it
+    expires_at: datetime
+    
+    class Settings:
+        name = "breakdown_cache"
+        indexes = [
+            IndexModel("expires_at", expireAfterSeconds=0)
+        ]
+
+
+class JobStatus(str, Enum):
+    """Background job states"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    DEAD = "dead"  # Out of attempts; kept for inspection (dead-letter)
+
+
+class GenerationJob(Document):
+    """Queued goal generation, claimed by workers under a lease"""
+    title: str
+    description: str
+    deadline: Optional[str] = None
+    goal_id: PydanticObjectId = Field(default_factory=PydanticObjectId)  # Reserved up front so retries never duplicate the goal
+    status: JobStatus = JobStatus.QUEUED
+    stage: str = "queued"
+    attempts: int = 0
+    max_attempts: int = 3
+    available_at: datetime = Field(default_factory=datetime.utcnow)
+    lease_owner: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    
+    class Settings:
+        name = "jobs"
+        indexes = [
+            # Claim queries: due queued jobs, and running jobs with expired leases
+            IndexModel([("status", 1), ("available_at", 1)], name="status_available_at"),
+            IndexModel([("status", 1), ("lease_expires_at", 1)], name="status_lease_expires_at"),
+        ]
+
+
+class IdempotencyRecord(Document):
+    """Outcome of a goal creation submitted with an Idempotency-Key header"""
+    key: Indexed(str, unique=True)
+    fingerprint: str  # Hash of the normalized request; a reused key must send the same one
+    status: str = "processing"  # "processing" until the goal is stored, then "completed"
+    goal_id: Optional[PydanticObjectId] = None
+    ai_insights: Dict[str, Any] = Field(default_factory=dict)
+    owner: Optional[str] = None  # Token of the request holding the claim; changes on takeover
+    locked_until: datetime  # A "processing" record past this is assumed abandoned
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+    
+    class Settings:
+        name = "idempotency_keys"
+        indexes = [
+            IndexModel("expires_at", expireAfterSeconds=0)
+        ]
+
 # Request/Response Models (for API)
 class GoalCreate(BaseModel):
     """Request model for creating a goal"""
@@ -66,6 +230,13 @@ class GoalCreate(BaseModel):
     deadline: Optional[str] = None  # ISO format string
 
 
+class GoalRefine(BaseModel):
+    """Request model for rewriting part of a goal's plan"""
+    task_ids: List[str] = Field(min_length=1, max_length=50)
+    instruction: str = Field(min_length=1, max_length=2000)
+    include_dependents: bool = False  # Also rewrite every task downstream of task_ids
+
+
 class TaskResponse(BaseModel):
     """Response model for a single task"""
     id: str
@@ -1,158 +1,285 @@
-from fastapi import APIRouter, HTTPException
-from app.models import GoalCreate, Goal
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.models import GoalCreate, GoalRefine
+from app.services.event_hub import event_hub
+from app.services.idempotency import IdempotencyConflictError, IdempotencyKeyReuseError
 from app.services.task_service import task_service
 from app.database import get_database
-from typing import List
-import traceback
+from app.services.read_cache import read_cache
+from app.serialization import FastJSONResponse, conditional_response, dumps, goal_to_dict, make_etag, task_to_dict
+from contextlib import aclosing
+from datetime import datetime
+from typing import Optional
+import logging
 
-router = APIRouter(prefix="/api/goals", tags=["goals"])
+logger = logging.getLogger(__name__)
 
-@router.get("/", response_model=List[dict])
-async def list_goals():
-    """List all goals"""
-    client = None
+router = APIRouter(prefix="/api/goals", tags=["goals"], default_response_class=FastJSONResponse)
+
+
+@router.get("/")
+async def list_goals(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: str = "newest",
+    deadline_after: Optional[datetime] = None,
+    deadline_before: Optional[datetime] = None,
+    has_overdue_tasks: Optional[bool] = None,
+    db=Depends(get_database)
+):
+    """
+    List goals one page at a time
+    
+    Pass the returned next_cursor back as `cursor` to get the following
+    page; it is null on the last page. sort is one of newest, oldest,
+    deadline, deadline_desc.
+    """
     try:
-        print("=== DEBUG: list_goals called ===")
-        
-        # Get fresh database connection
-        db, client = await get_database()
-        print("=== DEBUG: DB connected, fetching goals ===")
-        
-        goals = await Goal.find_all().to_list()
-        print(f"=== DEBUG: Found {len(goals)} goals ===")
-        
-        result = [
-            {
-                "id": str(goal.id),
-                "title": goal.title,
-                "description": goal.description,
-                "deadline": goal.deadline.isoformat() if goal.deadline else None,
-                "total_estimated_hours": goal.total_estimated_hours,
-                "created_at": goal.created_at.isoformat()
-            }
-            for goal in goals
-        ]
-        
-        return result
+        page = await task_service.list_goals(
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            deadline_after=deadline_after,
+            deadline_before=deadline_before,
+            has_overdue_tasks=has_overdue_tasks
+        )
+        return FastJSONResponse({
+            "success": True,
+            "goals": [goal_to_dict(goal) for goal in page["goals"]],
+            "next_cursor": page["next_cursor"]
+        })
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"=== ERROR in list_goals ===")
-        print(f"Error: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("list_goals failed")
         raise HTTPException(status_code=500, detail=f"Failed to list goals: {str(e)}")
-    finally:
-        # Always close the client
-        if client:
-            client.close()
-            print("=== DEBUG: MongoDB client closed ===")
-
-@router.post("/", response_model=dict)
-async def create_goal(goal_data: GoalCreate):
-    """Create a new goal and generate tasks using AI"""
-    client = None
+
+@router.post("/")
+async def create_goal(
+    goal_data: GoalCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db=Depends(get_database)
+):
+    """
+    Create a new goal and generate tasks using AI
+    
+    Send an Idempotency-Key header to make retries safe: repeating the
+    request with the same key returns the goal created the first time
+    (marked with Idempotent-Replayed: true) instead of generating another.
+    """
     try:
-        print(f"=== DEBUG: create_goal called ===")
-        
-        # Get fresh database connection
-        db, client = await get_database()
-        print("=== DEBUG: DB connected ===")
-        
-        result = await task_service.create_goal_with_tasks(
+        result = await task_service.create_goal_idempotent(
             title=goal_data.title,
             description=goal_data.description,
-            deadline=goal_data.deadline
+            deadline=goal_data.deadline,
+            idempotency_key=idempotency_key
         )
         
         goal = result["goal"]
         tasks = result["tasks"]
         
-        print(f"=== DEBUG: Goal created with {len(tasks)} tasks ===")
-        
-        return {
+        return FastJSONResponse({
             "success": True,
-            "goal": {
-                "id": str(goal.id),
-                "title": goal.title,
-                "description": goal.description,
-                "deadline": goal.deadline.isoformat() if goal.deadline else None,
-                "total_estimated_hours": goal.total_estimated_hours,
-                "created_at": goal.created_at.isoformat()
-            },
-            "tasks": [
-                {
-                    "id": str(task.id),
-                    "title": task.title,
-                    "description": task.description,
-                    "status": task.status.value,
-                    "priority": task.priority.value,
-                    "estimated_hours": task.estimated_hours,
-                    "start_date": task.start_date.isoformat() if task.start_date else None,
-                    "end_date": task.end_date.isoformat() if task.end_date else None,
-                    "dependencies": [
-                        {"task_id": dep.task_id, "task_title": dep.task_title}
-                        for dep in task.dependencies
-                    ]
-                }
-                for task in tasks
-            ],
+            "goal": goal_to_dict(goal),
+            "tasks": [task_to_dict(task) for task in tasks],
             "ai_insights": result["ai_insights"]
-        }
+        }, headers={"Idempotent-Replayed": "true"} if result["replayed"] else None)
         
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except IdempotencyKeyReuseError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        print(f"=== ERROR in create_goal ===")
-        print(f"Error: {str(e)}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.exception("create_goal failed")
         raise HTTPException(status_code=500, detail=f"Failed to create goal: {str(e)}")
-    finally:
-        if client:
-            client.close()
-            print("=== DEBUG: MongoDB client closed ===")
-
-@router.get("/{goal_id}", response_model=dict)
-async def get_goal(goal_id: str):
-    """Get a specific goal with all its tasks"""
-    client = None
+
+@router.post("/stream")
+async def create_goal_stream(
+    goal_data: GoalCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db=Depends(get_database)
+):
+    """
+    Create a goal and stream its tasks as NDJSON while the AI generates them
+    
+    With an Idempotency-Key header, a retry replays the stored goal as the
+    same sequence of events.
+    
+    One JSON object per line:
+    {"type": "goal", "goal": {...}}
+    {"type": "task", "task": {...}}            // repeated, dependencies empty
+    {"type": "complete", "goal": {...}, "tasks": [...], "ai_insights": {...}}
+    {"type": "error", "detail": "..."}         // instead of complete on failure
+    """
+    
+    async def events():
+        # aclosing: a client disconnect closes the service stream right away,
+        # which removes the half-built goal
+        async with aclosing(task_service.stream_goal_with_tasks(
+            title=goal_data.title,
+            description=goal_data.description,
+            deadline=goal_data.deadline,
+            idempotency_key=idempotency_key
+        )) as stream:
+            async for event in stream:
+                if event["type"] == "goal":
+                    payload = {"type": "goal", "goal": goal_to_dict(event["goal"])}
+                elif event["type"] == "task":
+                    payload = {"type": "task", "task": task_to_dict(event["task"])}
+                elif event["type"] == "complete":
+                    payload = {
+                        "type": "complete",
+                        "goal": goal_to_dict(event["goal"]),
+                        "tasks": [task_to_dict(task) for task in event["tasks"]],
+                        "ai_insights": event["ai_insights"]
+                    }
+                else:
+                    payload = event
+                yield dumps(payload) + b"\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def event_stream(topic: str) -> StreamingResponse:
+    """Server-Sent Events response for an event_hub topic"""
+    if not event_hub.enabled:
+        raise HTTPException(status_code=503, detail="Live updates are disabled")
+    return StreamingResponse(
+        event_hub.stream(topic),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/events")
+async def goal_list_events(db=Depends(get_database)):
+    """
+    Server-Sent Events for the goals list
+    
+    event: goal_created, data: {"type": "goal_created", "goal": {...}}
+    """
+    return event_stream("goals")
+
+@router.get("/{goal_id}")
+async def get_goal(goal_id: str, request: Request, db=Depends(get_database)):
+    """
+    Get a specific goal with all its tasks
+    
+    Responses carry an ETag; send it back as If-None-Match to get a 304
+    when nothing changed. Bodies are served from the in-process read cache
+    until a write to the goal or its tasks invalidates them.
+    """
     try:
-        # Get fresh database connection
-        db, client = await get_database()
+        cache_key = f"goal:{goal_id}"
+        cached = read_cache.get(cache_key)
+        if cached is None:
+            # Taken before the read: a write landing meanwhile keeps this body out of the cache
+            generation = read_cache.generation()
+            result = await task_service.get_goal_with_tasks(goal_id)
+            goal = result["goal"]
+            tasks = result["tasks"]
+            
+            cached = (
+                make_etag(goal.id, goal.version, goal.updated_at),
+                dumps({
+                    "success": True,
+                    "goal": goal_to_dict(goal),
+                    "tasks": [task_to_dict(task) for task in tasks]
+                })
+            )
+            read_cache.set(cache_key, str(goal.id), *cached, generation=generation)
         
-        result = await task_service.get_goal_with_tasks(goal_id)
-        goal = result["goal"]
-        tasks = result["tasks"]
+        return conditional_response(request, *cached)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.exception("Failed to retrieve goal %s", goal_id)
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve goal: {str(e)}")
+
+
+@router.get("/{goal_id}/graph")
+async def get_goal_graph(goal_id: str, db=Depends(get_database)):
+    """
+    Dependency analysis for a goal: topological order, levels, cycles,
+    dangling references, slack and the critical path by estimated hours
+    """
+    try:
+        graph = await task_service.get_goal_graph(goal_id)
+        return FastJSONResponse({"success": True, "goal_id": goal_id, **graph})
         
-        return {
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.exception("Failed to analyze goal graph %s", goal_id)
+        raise HTTPException(status_code=500, detail=f"Failed to analyze goal graph: {str(e)}")
+
+
+@router.post("/{goal_id}/schedule")
+async def reschedule_goal(goal_id: str, max_parallel: Optional[int] = Query(None, ge=0), db=Depends(get_database)):
+    """
+    Recompute task dates from dependencies, estimated hours and the working
+    calendar, starting now. max_parallel caps tasks worked on at once
+    (0 or omitted = unlimited unless SCHEDULE_MAX_PARALLEL is set).
+    """
+    try:
+        summary = await task_service.reschedule_goal(goal_id, max_parallel=max_parallel)
+        return FastJSONResponse({"success": True, "goal_id": goal_id, **summary})
+        
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.exception("Failed to schedule goal %s", goal_id)
+        raise HTTPException(status_code=500, detail=f"Failed to schedule goal: {str(e)}")
+
+
+@router.post("/{goal_id}/refine")
+async def refine_goal(goal_id: str, refine: GoalRefine, db=Depends(get_database)):
+    """
+    Rewrite some tasks (and optionally everything downstream of them) from
+    an instruction, e.g. "split this into smaller steps"
+    
+    Only those tasks and their direct neighbours are sent to the LLM; the
+    result is applied as the minimal set of inserts, updates and deletes,
+    with dependencies of untouched tasks re-linked.
+    """
+    try:
+        result = await task_service.refine_goal(
+            goal_id,
+            refine.task_ids,
+            refine.instruction,
+            include_dependents=refine.include_dependents
+        )
+        return FastJSONResponse({
             "success": True,
-            "goal": {
-                "id": str(goal.id),
-                "title": goal.title,
-                "description": goal.description,
-                "deadline": goal.deadline.isoformat() if goal.deadline else None,
-                "total_estimated_hours": goal.total_estimated_hours,
-                "created_at": goal.created_at.isoformat()
-            },
-            "tasks": [
-                {
-                    "id": str(task.id),
-                    "title": task.title,
-                    "description": task.description,
-                    "status": task.status.value,
-                    "priority": task.priority.value,
-                    "estimated_hours": task.estimated_hours,
-                    "start_date": task.start_date.isoformat() if task.start_date else None,
-                    "end_date": task.end_date.isoformat() if task.end_date else None,
-                    "dependencies": [
-                        {"task_id": dep.task_id, "task_title": dep.task_title}
-                        for dep in task.dependencies
-                    ]
-                }
-                for task in tasks
-            ]
-        }
+            "goal": goal_to_dict(result["goal"]),
+            "tasks": [task_to_dict(task) for task in result["tasks"]],
+            "changes": result["changes"]
+        })
         
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except NotImplementedError as e:
+        raise HTTPException(status_code=501, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to retrieve goal: {str(e)}")
-    finally:
-        if client:
-            client.close()
+        logger.exception("Failed to refine goal %s", goal_id)
+        raise HTTPException(status_code=500, detail=f"Failed to refine goal: {str(e)}")
+
+
+@router.get("/{goal_id}/events")
+async def goal_events(goal_id: str, db=Depends(get_database)):
+    """
+    Server-Sent Events with live changes to a goal's tasks
+    
+    Instead of reloading the goal, apply each patch to the loaded copy:
+    event: patch, data: {"type": "patch", "goal_id": ..., "tasks": [{"id": ..., <changed fields>}], "removed": [<task ids>], "progress": {...} or null}
+    Tasks with an unknown id are new (sent in full); drop the ids in removed.
+    On event: resync the client missed events and should GET the goal
+    again. Comment lines (": ping") are heartbeats.
+    """
+    if not await task_service.goal_exists(goal_id):
+        raise HTTPException(status_code=404, detail=f"Goal not found: {goal_id}")
+    return event_stream(goal_id)
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.models import GoalCreate
+from app.services.job_queue import job_queue, job_worker, worker_mode
+from app.database import get_database
+from app.serialization import FastJSONResponse, job_to_dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"], default_response_class=FastJSONResponse)
+
+
+@router.post("/", status_code=202)
+async def enqueue_goal_job(goal_data: GoalCreate, db=Depends(get_database)):
+    """
+    Queue goal generation and return immediately
+    
+    Poll GET /api/jobs/{job_id} until status is "succeeded" (then load
+    goal_id from /api/goals) or "dead".
+    
+    Deployment: with JOB_WORKER_MODE=inline this process runs the jobs,
+    which needs a long-lived server. Serverless hosts (Vercel, AWS Lambda)
+    stop the process once the response is sent, so there the mode
+    defaults to "external" and jobs stay queued until a separate
+    `python -m app.worker` on an always-on machine claims them.
+    """
+    try:
+        job = await job_queue.enqueue(
+            title=goal_data.title,
+            description=goal_data.description,
+            deadline=goal_data.deadline
+        )
+        if worker_mode() == "inline":
+            job_worker.start()
+        
+        return FastJSONResponse({"success": True, "job": job_to_dict(job)}, status_code=202)
+        
+    except Exception as e:
+        logger.exception("enqueue_goal_job failed")
+        raise HTTPException(status_code=500, detail=f"Failed to queue goal: {str(e)}")
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, db=Depends(get_database)):
+    """Status, stage, attempts and (once succeeded) goal_id of a job"""
+    try:
+        job = await job_queue.get(job_id)
+        return FastJSONResponse({"success": True, "job": job_to_dict(job)})
+        
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.exception("Failed to retrieve job %s", job_id)
+        raise HTTPException(status_code=500, detail=f"Failed to retrieve job: {str(e)}")
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.models import TaskPriority, TaskStatus
+from app.services.search_service import search_service
+from app.database import get_database
+from app.serialization import FastJSONResponse
+from datetime import datetime
+from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/search", tags=["search"], default_response_class=FastJSONResponse)
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    status: Optional[List[TaskStatus]] = Query(None),
+    priority: Optional[List[TaskPriority]] = Query(None),
+    goal_id: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db=Depends(get_database)
+):
+    """
+    Full-text search over task and goal titles and descriptions
+
+    q takes words (any may match), "quoted phrases" (must match) and
+    -words (must not). status and priority can be repeated; date_from and
+    date_to keep tasks scheduled within the range. Tasks come best match
+    first with highlight offsets; pass next_cursor back as `cursor` for
+    the next page. The first page also carries the best matching goals,
+    the total and facet counts by status, priority, goal and start month.
+    """
+    try:
+        result = await search_service.search(
+            q,
+            status=status,
+            priority=priority,
+            goal_id=goal_id,
+            date_from=date_from,
+            date_to=date_to,
+            limit=limit,
+            cursor=cursor
+        )
+        return FastJSONResponse({"success": True, "query": q, **result})
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("search failed")
+        raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
@@ -1,33 +1,85 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from app.models import TaskStatus, Task
-from app.services.task_service import task_service
+from app.services.task_service import VersionConflictError, task_service
 from app.database import get_database
+from app.services.read_cache import read_cache
+from app.serialization import FastJSONResponse, conditional_response, dumps, make_etag, task_to_dict
+import logging
 
+logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/api/tasks", tags=["tasks"])
+router = APIRouter(prefix="/api/tasks", tags=["tasks"], default_response_class=FastJSONResponse)
 
 
 class TaskStatusUpdate(BaseModel):
     """Request model for updating task status"""
     status: str
+    version: Optional[int] = None  # Reject the update if the task has changed since
+
+
+class TaskStatusChange(BaseModel):
+    """One entry of a bulk status update"""
+    task_id: str
+    status: str
+
+
+class BulkStatusUpdate(BaseModel):
+    """Request model for updating many task statuses at once"""
+    updates: List[TaskStatusChange] = Field(..., min_length=1, max_length=1000)
+    cascade: bool = True
+
+
+@router.patch("/bulk-status")
+async def bulk_update_status(bulk_update: BulkStatusUpdate, db=Depends(get_database)):
+    """
+    Update the status of many tasks in one request
+    
+    Request body:
+    {
+        "updates": [{"task_id": "...", "status": "completed"}, ...],
+        "cascade": true  // unblock/block dependents of the changed tasks
+    }
+    
+    Returns every status change made, including cascaded ones, the tasks
+    skipped because they changed concurrently ("conflicts") and the new
+    progress of each affected goal.
+    """
+    valid_statuses = [status.value for status in TaskStatus]
+    invalid = [change.status for change in bulk_update.updates if change.status not in valid_statuses]
+    if invalid:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}"
+        )
+    
+    try:
+        result = await task_service.bulk_update_status(
+            {change.task_id: TaskStatus(change.status) for change in bulk_update.updates},
+            cascade=bulk_update.cascade
+        )
+        return FastJSONResponse({"success": True, **result})
+        
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.exception("bulk_update_status failed")
+        raise HTTPException(status_code=500, detail=f"Failed to update tasks: {str(e)}")
 
 
 @router.patch("/{task_id}/status")
-async def update_task_status(task_id: str, status_update: TaskStatusUpdate):
+async def update_task_status(task_id: str, status_update: TaskStatusUpdate, db=Depends(get_database)):
     """
     Update the status of a task
     
     Request body:
     {
-        "status": "in_progress"  // pending, in_progress, completed, blocked
+        "status": "in_progress",  // pending, in_progress, completed, blocked
+        "version": 3              // optional; 409 if the task is no longer at it
     }
     """
-    client = None
     try:
-        # Get fresh database connection
-        db, client = await get_database()
-        
         # Validate status
         valid_statuses = ["pending", "in_progress", "completed", "blocked"]
         if status_update.status not in valid_statuses:
@@ -40,65 +92,55 @@ async def update_task_status(task_id: str, status_update: TaskStatusUpdate):
         status_enum = TaskStatus(status_update.status)
         
         # Update task
-        task = await task_service.update_task_status(task_id, status_enum)
+        result = await task_service.update_task_status(task_id, status_enum, status_update.version)
+        task = result["task"]
         
-        return {
+        return FastJSONResponse({
             "success": True,
             "task": {
-                "id": str(task.id),
+                "id": task.id,
                 "title": task.title,
-                "status": task.status.value,
-                "updated_at": task.updated_at.isoformat()
-            }
-        }
+                "status": task.status,
+                "version": task.version,
+                "updated_at": task.updated_at
+            },
+            "goal_progress": result["progress"]
+        })
         
+    except HTTPException:
+        raise
+    except VersionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
+        logger.exception("Failed to update task %s", task_id)
         raise HTTPException(status_code=500, detail=f"Failed to update task: {str(e)}")
-    finally:
-        if client:
-            client.close()
 
 
 @router.get("/{task_id}")
-async def get_task(task_id: str):
-    """Get a specific task by ID"""
-    client = None
+async def get_task(task_id: str, request: Request, db=Depends(get_database)):
+    """Get a specific task by ID (ETag / If-None-Match aware, read-cached)"""
     try:
-        # Get fresh database connection
-        db, client = await get_database()
-        
-        task = await Task.get(task_id)
-        
-        if not task:
-            raise HTTPException(status_code=404, detail="Task not found")
+        cache_key = f"task:{task_id}"
+        cached = read_cache.get(cache_key)
+        if cached is None:
+            generation = read_cache.generation()
+            task = await Task.get(task_id)
+            
+            if not task:
+                raise HTTPException(status_code=404, detail="Task not found")
+            
+            cached = (
+                make_etag(task.id, task.version, task.updated_at),
+                dumps({"success": True, "task": task_to_dict(task, detail=True)})
+            )
+            read_cache.set(cache_key, str(task.goal_id), *cached, generation=generation)
         
-        return {
-            "success": True,
-            "task": {
-                "id": str(task.id),
-                "goal_id": task.goal_id,
-                "title": task.title,
-                "description": task.description,
-                "status": task.status.value,
-                "priority": task.priority.value,
-                "estimated_hours": task.estimated_hours,
-                "start_date": task.start_date.isoformat() if task.start_date else None,
-                "end_date": task.end_date.isoformat() if task.end_date else None,
-                "dependencies": [
-                    {"task_id": dep.task_id, "task_title": dep.task_title}
-                    for dep in task.dependencies
-                ],
-                "created_at": task.created_at.isoformat(),
-                "updated_at": task.updated_at.isoformat()
-            }
-        }
+        return conditional_response(request, *cached)
         
     except HTTPException:
         raise
     except Exception as e:
+        logger.exception("Failed to retrieve task %s", task_id)
         raise HTTPException(status_code=500, detail=f"Failed to retrieve task: {str(e)}")
-    finally:
-        if client:
-            client.close()
@@ -0,0 +1,171 @@
+"""
+JSON serialization for API responses
+
+Goals and tasks are flattened into plain dicts (datetimes, enums and
+ObjectIds left as-is) and encoded to bytes in one pass by orjson, which
+handles datetimes and enums natively and everything else through a small
+default hook. Routes return FastJSONResponse directly, so
+FastAPI skips response_model validation and the jsonable_encoder walk.
+Without orjson installed the standard library encoder is used instead.
+
+Cacheable reads are sent with an ETag and answered with 304 Not Modified
+when the client's If-None-Match still matches (conditional_response).
+"""
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+import json
+import os
+
+from bson import ObjectId
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.models import JobStatus
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode the types neither encoder handles natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def make_etag(doc_id: Any, version: int, updated_at: datetime) -> str:
+    """Strong ETag for a document at a given version"""
+    return f'"{doc_id}-{version}-{updated_at:%Y%m%d%H%M%S%f}"'
+
+
+def cache_control() -> str:
+    """
+    Cache-Control for cacheable reads
+
+    By default clients must revalidate every time (cheap with ETags);
+    HTTP_CACHE_MAX_AGE > 0 lets them reuse a response for that many seconds.
+    """
+    max_age = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+    return f"private, max-age={max_age}" if max_age > 0 else "private, no-cache"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in (
+        candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates
+    )
+
+
+def conditional_response(request: Request, etag: str, body: bytes) -> Response:
+    """
+    Encoded body with ETag and Cache-Control, or 304 if the client has it
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        etag: ETag of body
+        body: Encoded JSON body
+
+    Returns:
+        200 response with body, or an empty 304
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control()}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def goal_to_dict(goal: Any) -> Dict[str, Any]:
+    """
+    Goal (or GoalSummary) fields sent to the client
+
+    Args:
+        goal: Goal document or projection
+
+    Returns:
+        Dict ready for dumps()
+    """
+    return {
+        "id": goal.id,
+        "title": goal.title,
+        "description": goal.description,
+        "deadline": goal.deadline,
+        "total_estimated_hours": goal.total_estimated_hours,
+        "progress": goal.progress,
+        "created_at": goal.created_at,
+    }
+
+
+def task_to_dict(task: Any, detail: bool = False) -> Dict[str, Any]:
+    """
+    Task (or TaskSummary) fields sent to the client
+
+    Args:
+        task: Task document or projection
+        detail: Also include goal_id and timestamps (full Task only)
+
+    Returns:
+        Dict ready for dumps()
+    """
+    data = {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "status": task.status,
+        "priority": task.priority,
+        "estimated_hours": task.estimated_hours,
+        "start_date": task.start_date,
+        "end_date": task.end_date,
+        "dependencies": [
+            {"task_id": dep.task_id, "task_title": dep.task_title}
+            for dep in task.dependencies
+        ],
+    }
+    if detail:
+        data["goal_id"] = task.goal_id
+        data["created_at"] = task.created_at
+        data["updated_at"] = task.updated_at
+    return data
+
+
+def job_to_dict(job: Any) -> Dict[str, Any]:
+    """Background job fields sent to the client"""
+    return {
+        "id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "goal_id": job.goal_id if job.status == JobStatus.SUCCEEDED else None,
+        "error": job.error,
+        "available_at": job.available_at,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at,
+    }
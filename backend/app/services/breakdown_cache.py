@@ -0,0 +1,159 @@
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+import copy
+import hashlib
+import logging
+import os
+import re
+
+from app.models import CachedBreakdown
+from app.services.llm_provider import llm
+from app.services.prompt_schema import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+
+class BreakdownCache:
+    """
+    Content-addressed cache for AI task breakdowns
+
+    Keys hash the normalized goal title, description, deadline horizon (days
+    from today), prompt version and LLM provider, so "Learn React in 2 weeks"
+    asked on two different days with the same relative deadline shares one
+    entry. Dates in a cached plan are shifted by the number of days since it
+    was generated.
+
+    Two tiers: an in-process TTL+LRU dict, and an optional Mongo collection
+    (BREAKDOWN_CACHE_MONGO=true) shared by all workers.
+    """
+
+    DATE_FIELDS = ("start_date", "end_date")
+
+    def __init__(self):
+        self.enabled = os.getenv("BREAKDOWN_CACHE_ENABLED", "true").lower() == "true"
+        self.use_mongo = os.getenv("BREAKDOWN_CACHE_MONGO", "false").lower() == "true"
+        self.ttl = timedelta(seconds=int(os.getenv("BREAKDOWN_CACHE_TTL_SECONDS", "86400")))
+        self.max_entries = int(os.getenv("BREAKDOWN_CACHE_MAX_ENTRIES", "256"))
+        self._entries: "OrderedDict[str, Tuple[datetime, date, Dict[str, Any]]]" = OrderedDict()
+        self._stats = {"hits": 0, "mongo_hits": 0, "misses": 0, "evictions": 0}
+
+    def make_key(self, title: str, description: str, deadline: Optional[datetime]) -> str:
+        """Hash of the normalized request"""
+        horizon = ""
+        if deadline:
+            horizon = str((deadline.date() - date.today()).days)
+
+        parts = [
+            PROMPT_VERSION,
+            llm.name,
+            self._normalize(title),
+            self._normalize(description),
+            horizon,
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a breakdown, rebased to today
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            The AI response dict, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        now = datetime.utcnow()
+        entry = self._entries.get(key)
+        if entry and entry[0] > now:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return self._rebase(entry[2], entry[1])
+        if entry:
+            del self._entries[key]
+
+        if self.use_mongo:
+            try:
+                cached = await CachedBreakdown.find_one(CachedBreakdown.key == key)
+            except Exception as e:
+                logger.warning("Breakdown cache lookup failed: %s", e)
+                cached = None
+            if cached and cached.expires_at > now:
+                self._store_local(key, cached.expires_at, cached.anchor_date.date(), cached.response)
+                self._stats["mongo_hits"] += 1
+                return self._rebase(cached.response, cached.anchor_date.date())
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, response: Dict[str, Any]):
+        """Store a freshly generated breakdown in every enabled tier"""
+        if not self.enabled:
+            return
+
+        expires_at = datetime.utcnow() + self.ttl
+        today = date.today()
+        self._store_local(key, expires_at, today, copy.deepcopy(response))
+
+        if self.use_mongo:
+            anchor = datetime.combine(today, datetime.min.time())
+            try:
+                await CachedBreakdown.find_one(CachedBreakdown.key == key).upsert(
+                    {"$set": {"response": response, "anchor_date": anchor, "expires_at": expires_at}},
+                    on_insert=CachedBreakdown(key=key, response=response, anchor_date=anchor, expires_at=expires_at)
+                )
+            except Exception as e:
+                logger.warning("Breakdown cache write failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the metrics endpoint"""
+        lookups = self._stats["hits"] + self._stats["mongo_hits"] + self._stats["misses"]
+        hits = self._stats["hits"] + self._stats["mongo_hits"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._entries.clear()
+
+    def _store_local(self, key: str, expires_at: datetime, anchor: date, response: Dict[str, Any]):
+        self._entries[key] = (expires_at, anchor, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _rebase(self, response: Dict[str, Any], anchor: date) -> Dict[str, Any]:
+        """Copy a cached response with every task date shifted to today"""
+        result = copy.deepcopy(response)
+        shift = date.today() - anchor
+        if not shift:
+            return result
+
+        for task in result.get("tasks", []):
+            for field in self.DATE_FIELDS:
+                value = task.get(field)
+                if not value:
+                    continue
+                try:
+                    shifted = datetime.fromisoformat(value.replace('Z', '+00:00')) + shift
+                except (TypeError, ValueError):
+                    continue
+                # Keep the original precision (date-only vs full timestamp)
+                task[field] = shifted.date().isoformat() if len(value) == 10 else shifted.isoformat()
+        return result
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        """Lowercase, drop punctuation and collapse whitespace"""
+        text = re.sub(r"[^\w\s]", " ", (text or "").lower())
+        return " ".join(text.split())
+
+
+# Create singleton instance
+breakdown_cache = BreakdownCache()
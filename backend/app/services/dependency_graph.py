@@ -0,0 +1,283 @@
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import os
+
+from app.models import Task
+
+
+class DependencyGraph:
+    """
+    Dependency analysis for the tasks of one goal
+
+    Everything runs in O(V+E): Kahn's algorithm for the topological order
+    and levels, a forward/backward pass for earliest/latest times weighted
+    by estimated_hours, and Tarjan's algorithm for cycle reports. Tasks that
+    sit on or behind a cycle get no schedule values.
+    """
+
+    def __init__(self, ids: Sequence[str], titles: Sequence[str], hours: Sequence[float], dependencies: Sequence[Sequence[str]]):
+        self.ids = list(ids)
+        self.titles = list(titles)
+        self.hours = [h or 0.0 for h in hours]
+        self.index = {task_id: i for i, task_id in enumerate(self.ids)}
+
+        n = len(self.ids)
+        self.predecessors: List[List[int]] = [[] for _ in range(n)]
+        self.successors: List[List[int]] = [[] for _ in range(n)]
+        self.dangling: List[Dict[str, str]] = []
+
+        for i, deps in enumerate(dependencies):
+            seen = set()
+            for dep_id in deps:
+                j = self.index.get(dep_id)
+                if j is None:
+                    self.dangling.append({"task_id": self.ids[i], "missing_task_id": dep_id})
+                elif j not in seen:
+                    seen.add(j)
+                    self.predecessors[i].append(j)
+                    self.successors[j].append(i)
+
+    @classmethod
+    def from_tasks(cls, tasks: Sequence[Task]) -> "DependencyGraph":
+        return cls(
+            ids=[str(task.id) for task in tasks],
+            titles=[task.title for task in tasks],
+            hours=[task.estimated_hours for task in tasks],
+            dependencies=[[dep.task_id for dep in task.dependencies] for task in tasks]
+        )
+
+    def topological_order(self) -> Tuple[List[int], List[int]]:
+        """
+        Kahn's algorithm
+
+        Returns:
+            (order, levels) where order lists acyclic task indices and levels[i]
+            is the longest dependency chain above task i (-1 if unreachable
+            because of a cycle)
+        """
+        n = len(self.ids)
+        indegree = [len(preds) for preds in self.predecessors]
+        levels = [-1] * n
+        queue = deque(i for i in range(n) if indegree[i] == 0)
+        for i in queue:
+            levels[i] = 0
+
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(i)
+            for j in self.successors[i]:
+                if levels[i] + 1 > levels[j]:
+                    levels[j] = levels[i] + 1
+                indegree[j] -= 1
+                if indegree[j] == 0:
+                    queue.append(j)
+
+        if len(order) < n:
+            in_order = set(order)
+            for i in range(n):
+                if i not in in_order:
+                    levels[i] = -1
+        return order, levels
+
+    def cycles(self, candidates: Sequence[int]) -> List[List[int]]:
+        """
+        Strongly connected components that form cycles (iterative Tarjan)
+
+        Args:
+            candidates: Task indices left over by Kahn's algorithm
+
+        Returns:
+            One list of task indices per cycle
+        """
+        allowed = set(candidates)
+        index_of: Dict[int, int] = {}
+        lowlink: Dict[int, int] = {}
+        on_stack = set()
+        stack: List[int] = []
+        result = []
+        counter = 0
+
+        for root in candidates:
+            if root in index_of:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    index_of[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+
+                successors = self.successors[node]
+                recurse = False
+                while child < len(successors):
+                    nxt = successors[child]
+                    child += 1
+                    if nxt not in allowed:
+                        continue
+                    if nxt not in index_of:
+                        work.append((node, child))
+                        work.append((nxt, 0))
+                        recurse = True
+                        break
+                    if nxt in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[nxt])
+                if recurse:
+                    continue
+
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.predecessors[node]:
+                        result.append(component[::-1])
+
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+        return result
+
+    def analyze(self) -> Dict[str, Any]:
+        """
+        Full analysis: order, levels, cycles, slack and critical path
+
+        Returns:
+            JSON-ready dict keyed by task id
+        """
+        n = len(self.ids)
+        order, levels = self.topological_order()
+
+        # Forward pass: earliest start/finish in hours from the plan start
+        earliest_start = [0.0] * n
+        earliest_finish = [0.0] * n
+        for i in order:
+            start = 0.0
+            for j in self.predecessors[i]:
+                if earliest_finish[j] > start:
+                    start = earliest_finish[j]
+            earliest_start[i] = start
+            earliest_finish[i] = start + self.hours[i]
+
+        duration = max((earliest_finish[i] for i in order), default=0.0)
+
+        # Backward pass: latest start/finish without delaying the plan
+        latest_finish = [duration] * n
+        latest_start = [0.0] * n
+        for i in reversed(order):
+            finish = duration
+            for j in self.successors[i]:
+                if latest_start[j] < finish:
+                    finish = latest_start[j]
+            latest_finish[i] = finish
+            latest_start[i] = finish - self.hours[i]
+
+        critical_path = self._critical_path(order, earliest_start, earliest_finish, latest_start, duration)
+        critical = set(critical_path)
+
+        in_order = set(order)
+        cyclic = [i for i in range(n) if i not in in_order]
+        cycles = self.cycles(cyclic) if cyclic else []
+
+        max_level = max(levels, default=-1)
+        by_level: List[List[str]] = [[] for _ in range(max_level + 1)]
+        for i in order:
+            by_level[levels[i]].append(self.ids[i])
+
+        nodes = {}
+        for i in range(n):
+            scheduled = i in in_order
+            nodes[self.ids[i]] = {
+                "title": self.titles[i],
+                "level": levels[i] if scheduled else None,
+                "estimated_hours": self.hours[i],
+                "earliest_start": earliest_start[i] if scheduled else None,
+                "earliest_finish": earliest_finish[i] if scheduled else None,
+                "latest_start": latest_start[i] if scheduled else None,
+                "latest_finish": latest_finish[i] if scheduled else None,
+                "slack": round(latest_start[i] - earliest_start[i], 6) if scheduled else None,
+                "critical": i in critical,
+            }
+
+        return {
+            "order": [self.ids[i] for i in order],
+            "levels": by_level,
+            "nodes": nodes,
+            "critical_path": [self.ids[i] for i in critical_path],
+            "critical_path_hours": duration,
+            "cycles": [[self.ids[i] for i in cycle] for cycle in cycles],
+            "blocked_by_cycle": [self.ids[i] for i in cyclic],
+            "dangling_dependencies": self.dangling,
+            "is_acyclic": not cyclic,
+        }
+
+    def _critical_path(self, order, earliest_start, earliest_finish, latest_start, duration) -> List[int]:
+        """Walk back from a zero-slack task that finishes last"""
+        epsilon = 1e-9
+        end = None
+        for i in order:
+            if abs(earliest_finish[i] - duration) < epsilon and abs(latest_start[i] - earliest_start[i]) < epsilon:
+                end = i
+                break
+        if end is None:
+            return []
+
+        path = [end]
+        current = end
+        while True:
+            previous = None
+            for j in self.predecessors[current]:
+                if abs(earliest_finish[j] - earliest_start[current]) < epsilon and abs(latest_start[j] - earliest_start[j]) < epsilon:
+                    previous = j
+                    break
+            if previous is None:
+                break
+            path.append(previous)
+            current = previous
+        return path[::-1]
+
+
+class GraphCache:
+    """
+    Per-goal cache of graph analyses
+
+    Keyed by the canonical goal id (str(ObjectId)). Write paths call
+    invalidate(goal_id). Entries also expire after GRAPH_CACHE_TTL_SECONDS
+    so other workers' writes are picked up; the LRU is capped at
+    GRAPH_CACHE_MAX_ENTRIES.
+    """
+
+    def __init__(self):
+        self.ttl = timedelta(seconds=int(os.getenv("GRAPH_CACHE_TTL_SECONDS", "60")))
+        self.max_entries = int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "1000"))
+        self._entries: "OrderedDict[str, Tuple[datetime, Dict[str, Any]]]" = OrderedDict()
+
+    def get(self, goal_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(goal_id)
+        if entry and entry[0] > datetime.utcnow():
+            self._entries.move_to_end(goal_id)
+            return entry[1]
+        self._entries.pop(goal_id, None)
+        return None
+
+    def set(self, goal_id: str, analysis: Dict[str, Any]):
+        self._entries[goal_id] = (datetime.utcnow() + self.ttl, analysis)
+        self._entries.move_to_end(goal_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, goal_id: str):
+        self._entries.pop(goal_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Create singleton instance
+graph_cache = GraphCache()
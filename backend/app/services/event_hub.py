@@ -0,0 +1,208 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+import asyncio
+import itertools
+import logging
+import os
+
+from app.database import db_manager
+from app.models import GoalSummary, TaskSummary
+from app.serialization import dumps, goal_to_dict, task_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Task fields a change-stream update is turned into a patch of (everything
+# task_service may patch: status changes, rescheduling and refinement)
+TASK_PATCH_FIELDS = (
+    "title", "description", "status", "priority", "estimated_hours",
+    "start_date", "end_date", "dependencies", "version", "updated_at",
+)
+
+
+class EventHub:
+    """
+    In-process pub/sub of goal and task changes for Server-Sent Events
+
+    Topics are goal ids (patches to that goal's tasks and progress) plus
+    "goals" (newly created goals). Each event is encoded once into an SSE
+    frame and fanned out to per-subscriber queues of EVENTS_QUEUE_SIZE; a
+    subscriber that falls behind gets its queue replaced by a single
+    "resync" event telling it to refetch.
+
+    With EVENTS_CHANGE_STREAMS=true (and a replica set) events come from a
+    MongoDB change stream instead of local publish() calls, so clients of
+    every worker see every write. Deleted tasks are only known by id there;
+    the watcher enables pre-images on the tasks collection (MongoDB 6.0+)
+    to find their goal, and without them sends "resync" to every goal
+    topic instead.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("EVENTS_ENABLED", "true").lower() == "true"
+        self.use_change_streams = os.getenv("EVENTS_CHANGE_STREAMS", "false").lower() == "true"
+        self.heartbeat = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+        self.queue_size = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._ids = itertools.count(1)
+        self._watcher: Optional[asyncio.Task] = None
+        self._stats = {"published": 0, "delivered": 0, "resyncs": 0}
+
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None and not self._watcher.done()
+
+    def publish(self, topic: str, event: Dict[str, Any]):
+        """
+        Send an event to the topic's subscribers
+
+        A no-op without subscribers, and while the change stream is the
+        source of events (it will see the same write).
+
+        Args:
+            topic: Goal id or "goals"
+            event: Dict with a "type" plus payload, encoded with dumps()
+        """
+        if not self.watching:
+            self._fan_out(topic, event)
+
+    def subscribe(self, topic: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, topic: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(topic)
+        if queues:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[topic]
+
+    async def stream(self, topic: str) -> AsyncIterator[bytes]:
+        """
+        SSE byte stream for one subscriber
+
+        Starts with a retry hint, then yields event frames, with a comment
+        line every EVENTS_HEARTBEAT_SECONDS so proxies keep the connection
+        open. Unsubscribes when the client goes away.
+        """
+        await self._ensure_watcher()
+        queue = self.subscribe(topic)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield frame
+        finally:
+            self.unsubscribe(topic, queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "topics": len(self._subscribers),
+            "change_streams": self.watching
+        }
+
+    def _fan_out(self, topic: str, event: Dict[str, Any]):
+        queues = self._subscribers.get(topic)
+        if not queues:
+            return
+        frame = self._frame(event)
+        self._stats["published"] += 1
+        for queue in queues:
+            try:
+                queue.put_nowait(frame)
+                self._stats["delivered"] += 1
+            except asyncio.QueueFull:
+                # Too far behind: drop its backlog and ask it to refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(self._frame({"type": "resync"}))
+                self._stats["resyncs"] += 1
+
+    def _frame(self, event: Dict[str, Any]) -> bytes:
+        return b"id: %d\nevent: %s\ndata: %s\n\n" % (next(self._ids), event["type"].encode(), dumps(event))
+
+    async def _ensure_watcher(self):
+        if not self.use_change_streams or self.watching:
+            return
+        if not await db_manager.supports_transactions():
+            logger.warning("EVENTS_CHANGE_STREAMS needs a replica set; using in-process events")
+            self.use_change_streams = False
+            return
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        db = await db_manager.connect()
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": ["goals", "tasks"]},
+            "operationType": {"$in": ["insert", "update", "replace", "delete"]}
+        }}]
+        options = {"full_document": "updateLookup"}
+        try:
+            # Lets delete events carry the task (and so its goal_id)
+            await db.command({"collMod": "tasks", "changeStreamPreAndPostImages": {"enabled": True}})
+            options["full_document_before_change"] = "whenAvailable"
+        except Exception as e:
+            logger.warning("Change stream pre-images unavailable (%s); deleted tasks trigger a resync", e)
+        try:
+            async with db.watch(pipeline, **options) as changes:
+                async for change in changes:
+                    for topic, event in self._translate(change):
+                        self._fan_out(topic, event)
+        except Exception as e:
+            # Fall back to local events; clients refetch to cover the gap
+            logger.warning("Change stream stopped: %s", e)
+            for topic in list(self._subscribers):
+                self._fan_out(topic, {"type": "resync"})
+
+    def _translate(self, change: Dict[str, Any]) -> List[tuple]:
+        """Turn a change event into (topic, event) pairs in the publish() format"""
+        collection = change["ns"]["coll"]
+        operation = change["operationType"]
+        if operation == "delete":
+            return self._translate_delete(collection, change)
+
+        doc = change.get("fullDocument")
+        if not doc:
+            return []
+        inserted = operation != "update"
+        changed = {
+            key.split(".", 1)[0]
+            for key in change.get("updateDescription", {}).get("updatedFields", {})
+        }
+
+        if collection == "tasks":
+            if inserted:
+                task = task_to_dict(TaskSummary.model_validate(doc))
+            else:
+                task = {"id": doc["_id"], **{field: doc.get(field) for field in TASK_PATCH_FIELDS if field in changed}}
+            return [(str(doc["goal_id"]), self._patch(doc["goal_id"], tasks=[task]))]
+
+        if inserted:
+            return [("goals", {"type": "goal_created", "goal": goal_to_dict(GoalSummary.model_validate(doc))})]
+        if "progress" in changed:
+            return [(str(doc["_id"]), self._patch(doc["_id"], progress=doc.get("progress")))]
+        return []
+
+    def _translate_delete(self, collection: str, change: Dict[str, Any]) -> List[tuple]:
+        deleted_id = change["documentKey"]["_id"]
+        if collection == "goals":
+            # Its page refetches and finds the goal gone
+            return [(str(deleted_id), {"type": "resync"})]
+        before = change.get("fullDocumentBeforeChange")
+        if before:
+            return [(str(before["goal_id"]), self._patch(before["goal_id"], removed=[str(deleted_id)]))]
+        # No pre-image: the goal is unknown, so every open goal page refetches
+        return [(topic, {"type": "resync"}) for topic in self._subscribers if topic != "goals"]
+
+    def _patch(self, goal_id: Any, tasks: List[Dict[str, Any]] = None, progress: Any = None, removed: List[Any] = None) -> Dict[str, Any]:
+        """Patch event shaped like task_service._publish_patch()"""
+        return {"type": "patch", "goal_id": goal_id, "tasks": tasks or [], "removed": removed or [], "progress": progress}
+
+
+# Create singleton instance
+event_hub = EventHub()
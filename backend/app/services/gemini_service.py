@@ -1,15 +1,41 @@
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+import functools
+import logging
 import os
-import json
+import random
+import time
 from dotenv import load_dotenv
-from typing import Dict, Any
+from app.instrumentation import metrics
+from app.services.llm_provider import LLMProvider
+from app.services.prompt_schema import PROMPT_VERSION, REFINE_RESPONSE_SCHEMA, RESPONSE_SCHEMA, build_compact_prompt, build_refine_prompt, build_verbose_prompt
+from app.services.response_parser import parse_refinement, parse_task_breakdown
+from typing import AsyncIterator, Dict, Any, List
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-class GeminiService:
+# Errors worth retrying: rate limits, overloaded or flaky backends, timeouts
+TRANSIENT_ERRORS = (
+    asyncio.TimeoutError,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+
+class GeminiService(LLMProvider):
     """Service for interacting with Google Gemini API"""
     
+    name = "gemini"
+    PROMPT_VERSION = PROMPT_VERSION
+    
     def __init__(self):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
@@ -17,7 +43,168 @@ class GeminiService:
         
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-2.5-flash')  # or 'gemini-2.5-pro'
-
+        
+        self.timeout_seconds = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+        self.max_retries = int(os.getenv("GEMINI_MAX_RETRIES", "2"))
+        self.max_concurrency = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+        self._semaphore = None
+        self._executor = None
+        
+        # Compact output: short keys, index dependencies and day offsets,
+        # enforced through structured output (JSON schema) mode
+        self.compact_schema = os.getenv("GEMINI_COMPACT_SCHEMA", "true").lower() == "true"
+        self.generation_config = {"response_mime_type": "application/json"}
+        if self.compact_schema:
+            self.generation_config["response_schema"] = RESPONSE_SCHEMA
+        
+        # Token accounting; prices are USD per million tokens
+        self.input_price = float(os.getenv("GEMINI_INPUT_USD_PER_MTOK", "0.30"))
+        self.output_price = float(os.getenv("GEMINI_OUTPUT_USD_PER_MTOK", "2.50"))
+        self._usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        self._recent_calls = deque(maxlen=100)
+        
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Global cap on in-flight LLM calls, created on first use"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+    
+    async def _generate_content(self, prompt: str, stream: bool = False, generation_config: Dict[str, Any] = None):
+        """
+        Call the model without blocking the event loop
+        
+        Uses the SDK's async API when available and falls back to a bounded
+        thread pool for models that only expose the synchronous call (in
+        which case a stream request returns the whole response at once).
+        """
+        generation_config = generation_config or self.generation_config
+        if hasattr(self.model, "generate_content_async"):
+            if stream:
+                return await self.model.generate_content_async(
+                    prompt, generation_config=generation_config, stream=True
+                )
+            return await self.model.generate_content_async(prompt, generation_config=generation_config)
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="gemini"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(self.model.generate_content, prompt, generation_config=generation_config)
+        )
+    
+    def _record_usage(self, kind: str, usage_metadata, started: float):
+        """Add one call's token counts (from the response's usage_metadata) to the totals"""
+        input_tokens = getattr(usage_metadata, "prompt_token_count", 0) or 0
+        output_tokens = getattr(usage_metadata, "candidates_token_count", 0) or 0
+        self._usage["calls"] += 1
+        self._usage["input_tokens"] += input_tokens
+        self._usage["output_tokens"] += output_tokens
+        elapsed = time.perf_counter() - started
+        cost = self._cost(input_tokens, output_tokens)
+        metrics.inc("app_llm_tokens_total", input_tokens, provider=self.name, kind=kind, direction="input")
+        metrics.inc("app_llm_tokens_total", output_tokens, provider=self.name, kind=kind, direction="output")
+        metrics.inc("app_llm_cost_usd_total", cost, provider=self.name)
+        metrics.observe("app_llm_call_duration_seconds", elapsed, provider=self.name, kind=kind)
+        self._recent_calls.append({
+            "at": datetime.utcnow().isoformat(),
+            "kind": kind,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "latency_ms": round(elapsed * 1000, 1),
+            "cost_usd": round(cost, 6)
+        })
+    
+    def _cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self.input_price + output_tokens * self.output_price) / 1_000_000
+    
+    def usage_stats(self) -> Dict[str, Any]:
+        """Token totals, estimated spend and the most recent calls"""
+        calls = self._usage["calls"]
+        return {
+            **self._usage,
+            "avg_output_tokens": round(self._usage["output_tokens"] / calls, 1) if calls else 0,
+            "estimated_cost_usd": round(self._cost(self._usage["input_tokens"], self._usage["output_tokens"]), 6),
+            "compact_schema": self.compact_schema,
+            "recent_calls": list(self._recent_calls)
+        }
+    
+    async def _generate_with_retry(self, prompt: str, stream: bool = False, generation_config: Dict[str, Any] = None):
+        """
+        Generate with a per-call timeout and jittered exponential backoff
+        
+        Callers hold the concurrency semaphore around this call (and around
+        the whole iteration when streaming).
+        
+        Args:
+            prompt: Full prompt text
+            stream: Request a streaming response
+            generation_config: Overrides the breakdown generation config
+            
+        Returns:
+            The SDK response object
+        """
+        attempt = 0
+        while True:
+            try:
+                return await asyncio.wait_for(
+                    self._generate_content(prompt, stream=stream, generation_config=generation_config),
+                    timeout=self.timeout_seconds
+                )
+            except TRANSIENT_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning("Transient Gemini error (%s), retrying in %.2fs", type(e).__name__, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+    
+    async def stream_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> AsyncIterator[str]:
+        """
+        Stream the raw text of a task breakdown as Gemini produces it
+        
+        Args:
+            goal_title: The main goal title
+            goal_description: Detailed description of the goal
+            deadline: Optional deadline string
+            
+        Yields:
+            Text chunks of the JSON response
+        """
+        
+        prompt = self._build_task_breakdown_prompt(goal_title, goal_description, deadline)
+        started = time.perf_counter()
+        
+        async with self.semaphore:
+            response = await self._generate_with_retry(prompt, stream=True)
+            
+            if not hasattr(response, "__aiter__"):
+                self._record_usage("stream", getattr(response, "usage_metadata", None), started)
+                yield response.text
+                return
+            
+            chunks = response.__aiter__()
+            usage_metadata = None
+            while True:
+                try:
+                    # The timeout applies to the gap between chunks
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=self.timeout_seconds)
+                except StopAsyncIteration:
+                    self._record_usage("stream", usage_metadata, started)
+                    return
+                # Token counts arrive with the final chunks
+                usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. safety metadata)
+                    continue
+                if text:
+                    yield text
     
     async def generate_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> Dict[str, Any]:
         """
@@ -34,10 +221,13 @@ class GeminiService:
         
         # Build the prompt
         prompt = self._build_task_breakdown_prompt(goal_title, goal_description, deadline)
+        started = time.perf_counter()
         
         try:
             # Generate response from Gemini
-            response = self.model.generate_content(prompt)
+            async with self.semaphore:
+                response = await self._generate_with_retry(prompt)
+            self._record_usage("generate", getattr(response, "usage_metadata", None), started)
             
             # Parse the JSON response
             result = self._parse_gemini_response(response.text)
@@ -45,87 +235,54 @@ class GeminiService:
             return result
             
         except Exception as e:
-            print(f"Error generating task breakdown: {e}")
+            logger.error("Error generating task breakdown: %s", e)
             raise
     
-    def _build_task_breakdown_prompt(self, goal_title: str, goal_description: str, deadline: str = None) -> str:
-        """Build the prompt for Gemini"""
-        
-        deadline_text = f"\nDeadline: {deadline}" if deadline else "\nNo specific deadline provided."
+    async def refine_task_breakdown(
+        self,
+        goal_title: str,
+        goal_description: str,
+        instruction: str,
+        tasks: List[Dict[str, Any]],
+        context: List[Dict[str, Any]],
+        deadline: str = None
+    ) -> Dict[str, Any]:
+        """
+        Rewrite part of a plan from the given tasks and their neighbours
         
-        prompt = f"""You are an expert project manager and task breakdown specialist. 
-
-Goal: {goal_title}
-Description: {goal_description}{deadline_text}
-
-Break down this goal into a detailed, actionable task plan. For each task:
-1. Create clear, specific task titles
-2. Provide detailed descriptions
-3. Estimate hours needed (realistic estimates)
-4. Set priority (low, medium, high, critical)
-5. Identify dependencies (which tasks must be completed before others)
-6. Suggest start and end dates based on the deadline and task order
-
-Return your response as a valid JSON object with this EXACT structure:
-
-{{
-  "tasks": [
-    {{
-      "title": "Task title",
-      "description": "Detailed description of what needs to be done",
-      "estimated_hours": 8,
-      "priority": "high",
-      "dependencies": [],
-      "start_date": "2025-10-16",
-      "end_date": "2025-10-18"
-    }}
-  ],
-  "total_estimated_hours": 40,
-  "suggested_timeline": "Brief timeline overview"
-}}
-
-Rules:
-- Create 5-15 tasks depending on goal complexity
-- Be specific and actionable
-- Consider realistic time estimates
-- Identify critical path and dependencies
-- Tasks should flow logically
-- Use ISO date format (YYYY-MM-DD)
-- First tasks should have no dependencies
-- Later tasks can depend on earlier ones using the task title
-
-Return ONLY the JSON, no additional text or markdown formatting."""
-
-        return prompt
+        Args:
+            goal_title: The main goal title
+            goal_description: Detailed description of the goal
+            instruction: What to change
+            tasks: Tasks to rewrite (see build_refine_prompt)
+            context: Neighbouring tasks they may depend on
+            deadline: Optional deadline string
+            
+        Returns:
+            Dict with the rewritten "tasks"
+        """
+        prompt = build_refine_prompt(goal_title, goal_description, instruction, tasks, context, deadline)
+        started = time.perf_counter()
+        async with self.semaphore:
+            response = await self._generate_with_retry(prompt, generation_config={
+                "response_mime_type": "application/json",
+                "response_schema": REFINE_RESPONSE_SCHEMA
+            })
+        self._record_usage("refine", getattr(response, "usage_metadata", None), started)
+        return parse_refinement(response.text)
+    
+    def _build_task_breakdown_prompt(self, goal_title: str, goal_description: str, deadline: str = None) -> str:
+        """Build the prompt for Gemini (compact schema unless GEMINI_COMPACT_SCHEMA=false)"""
+        if self.compact_schema:
+            return build_compact_prompt(goal_title, goal_description, deadline)
+        return build_verbose_prompt(goal_title, goal_description, deadline)
     
     def _parse_gemini_response(self, response_text: str) -> Dict[str, Any]:
-        """Parse and validate Gemini's JSON response"""
-        
-        # Clean up response (remove markdown code blocks if present)
-        cleaned = response_text.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        if cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
+        """Parse and validate Gemini's JSON response, repairing it if needed"""
         
         try:
-            # Parse JSON
-            result = json.loads(cleaned)
-            
-            # Validate structure
-            if "tasks" not in result:
-                raise ValueError("Response missing 'tasks' field")
-            
-            return result
-            
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse JSON: {e}")
-            print(f"Response text: {response_text}")
-            raise ValueError(f"Invalid JSON response from Gemini: {e}")
-
-
-# Create a singleton instance
-gemini_service = GeminiService()
\ No newline at end of file
+            return parse_task_breakdown(response_text)
+        except ValueError as e:
+            # Only the size: the response echoes the user's goal
+            logger.warning("Failed to parse Gemini response (%d chars): %s", len(response_text), e)
+            raise
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from uuid import uuid4
+import asyncio
+import hashlib
+import os
+
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.models import IdempotencyRecord
+
+
+class IdempotencyConflictError(Exception):
+    """Raised when a request with the same key is still being processed"""
+
+
+class IdempotencyKeyReuseError(Exception):
+    """Raised when a key is sent again with a different request body"""
+
+
+class IdempotencyClaimLostError(Exception):
+    """Raised when another request took over a claim after its lock ran out"""
+
+
+class IdempotencyStore:
+    """
+    Mongo-backed record of requests made with an Idempotency-Key header
+
+    The first request for a key inserts a "processing" record (the unique
+    index makes that an atomic claim) and stores the created goal's id when
+    it finishes. A retry with the same key replays that goal instead of
+    generating a new one; a duplicate arriving while the first is still
+    running waits up to IDEMPOTENCY_WAIT_SECONDS for it. Records expire
+    after IDEMPOTENCY_TTL_SECONDS. A claim whose owner died is taken over
+    once IDEMPOTENCY_LOCK_SECONDS have passed.
+
+    Each claim carries an owner token, and renew(), complete() and
+    release() only act while the caller still holds it. An owner that was
+    merely slow and got taken over can therefore neither delete the new
+    claim nor overwrite it with a second goal.
+    """
+
+    def __init__(self):
+        self.ttl = timedelta(seconds=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400")))
+        self.lock = timedelta(seconds=int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "300")))
+        self.wait = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120"))
+        self.poll_interval = 0.25
+
+    def fingerprint(self, title: str, description: str, deadline: Optional[str]) -> str:
+        """Hash of the request body a key is bound to"""
+        parts = [" ".join((value or "").split()) for value in (title, description, deadline)]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    async def acquire(self, key: str, fingerprint: str) -> IdempotencyRecord:
+        """
+        Claim a key, or wait for the request that already holds it
+
+        Args:
+            key: Client-supplied Idempotency-Key
+            fingerprint: fingerprint() of the request body
+
+        Returns:
+            The completed record to replay, or the caller's own claim
+            (status "processing"): the caller should do the work and pass
+            its owner token to complete() or release()
+
+        Raises:
+            IdempotencyKeyReuseError: The key was used for a different request
+            IdempotencyConflictError: The owner did not finish within the wait
+        """
+        collection = IdempotencyRecord.get_motor_collection()
+        give_up = datetime.utcnow() + timedelta(seconds=self.wait)
+        while True:
+            now = datetime.utcnow()
+            claim = IdempotencyRecord(
+                key=key,
+                fingerprint=fingerprint,
+                owner=uuid4().hex,
+                locked_until=now + self.lock,
+                expires_at=now + self.ttl
+            )
+            try:
+                await claim.insert()
+                return claim
+            except DuplicateKeyError:
+                pass
+
+            record = await IdempotencyRecord.find_one(IdempotencyRecord.key == key)
+            if record is None:
+                continue  # Released between the insert and the read
+            if record.fingerprint != fingerprint:
+                raise IdempotencyKeyReuseError(f"Idempotency-Key {key} was already used for a different request")
+            if record.status == "completed":
+                return record
+            if record.locked_until < now:
+                taken = await collection.find_one_and_update(
+                    {"key": key, "status": "processing", "locked_until": record.locked_until},
+                    {"$set": {"locked_until": now + self.lock, "owner": uuid4().hex}},
+                    return_document=ReturnDocument.AFTER
+                )
+                if taken:
+                    return IdempotencyRecord.model_validate(taken)
+            if now >= give_up:
+                raise IdempotencyConflictError(f"A request with Idempotency-Key {key} is still in progress")
+            await asyncio.sleep(self.poll_interval)
+
+    async def renew(self, key: str, owner: str) -> bool:
+        """Extend the caller's lock; False if the claim is no longer the caller's"""
+        result = await IdempotencyRecord.get_motor_collection().update_one(
+            {"key": key, "owner": owner, "status": "processing"},
+            {"$set": {"locked_until": datetime.utcnow() + self.lock}}
+        )
+        return result.matched_count == 1
+
+    async def complete(self, key: str, owner: str, goal_id: PydanticObjectId, ai_insights: Dict[str, Any]) -> bool:
+        """Store the created goal for replays; False if the claim was lost (nothing stored)"""
+        result = await IdempotencyRecord.get_motor_collection().update_one(
+            {"key": key, "owner": owner, "status": "processing"},
+            {"$set": {"status": "completed", "goal_id": goal_id, "ai_insights": ai_insights}}
+        )
+        return result.matched_count == 1
+
+    async def release(self, key: str, owner: str):
+        """Drop the caller's claim after a failure so the client can retry with the same key"""
+        await IdempotencyRecord.get_motor_collection().delete_one({"key": key, "owner": owner, "status": "processing"})
+
+
+# Create singleton instance
+idempotency_store = IdempotencyStore()
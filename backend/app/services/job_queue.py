@@ -0,0 +1,262 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from uuid import uuid4
+import asyncio
+import logging
+import os
+import random
+import socket
+
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+
+from app.models import GenerationJob, Goal, JobStatus
+from app.services.task_service import task_service
+
+logger = logging.getLogger(__name__)
+
+# Set by hosts that freeze or end the process once the response is sent
+SERVERLESS_ENV_VARS = ("VERCEL", "AWS_LAMBDA_FUNCTION_NAME")
+
+
+def worker_mode() -> str:
+    """
+    Where queued jobs run: "inline" (in the API process) or "external"
+
+    JOB_WORKER_MODE wins when set. Otherwise serverless hosts get
+    "external", since in-process workers would be stopped with the request
+    and leave their jobs leased until the lease ran out.
+    """
+    mode = os.getenv("JOB_WORKER_MODE", "").strip().lower()
+    if mode:
+        return mode
+    return "external" if any(os.getenv(name) for name in SERVERLESS_ENV_VARS) else "inline"
+
+
+class JobQueue:
+    """
+    Mongo-backed queue of goal generation jobs
+
+    Workers claim a job with one find_one_and_update, which also takes a
+    lease (JOB_LEASE_SECONDS) that they renew while working. A job whose
+    lease runs out (crashed worker) becomes claimable again. Failed attempts
+    are retried with exponential backoff from JOB_RETRY_BASE_SECONDS; after
+    JOB_MAX_ATTEMPTS the job is parked as "dead" with its last error.
+    """
+
+    def __init__(self):
+        self.max_attempts = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+        self.lease = timedelta(seconds=int(os.getenv("JOB_LEASE_SECONDS", "120")))
+        self.retry_base = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+
+    async def enqueue(self, title: str, description: str, deadline: Optional[str] = None) -> GenerationJob:
+        """
+        Queue a goal generation
+
+        Args:
+            title: Goal title
+            description: Goal description
+            deadline: Optional deadline string
+
+        Returns:
+            The stored job
+        """
+        job = GenerationJob(title=title, description=description, deadline=deadline, max_attempts=self.max_attempts)
+        await job.insert()
+        return job
+
+    async def get(self, job_id: str) -> GenerationJob:
+        """Fetch a job, raising ValueError if it does not exist"""
+        try:
+            job = await GenerationJob.get(PydanticObjectId(job_id))
+        except Exception:
+            job = None
+        if not job:
+            raise ValueError(f"Job not found: {job_id}")
+        return job
+
+    async def claim(self, owner: str) -> Optional[GenerationJob]:
+        """
+        Take the oldest due job (or one whose lease expired) for owner
+
+        Returns:
+            The claimed job with attempts already incremented, or None
+        """
+        now = datetime.utcnow()
+        doc = await GenerationJob.get_motor_collection().find_one_and_update(
+            {"$or": [
+                {"status": JobStatus.QUEUED.value, "available_at": {"$lte": now}},
+                {"status": JobStatus.RUNNING.value, "lease_expires_at": {"$lt": now}},
+            ]},
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING.value,
+                    "stage": "generating",
+                    "lease_owner": owner,
+                    "lease_expires_at": now + self.lease,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        return GenerationJob.model_validate(doc) if doc else None
+
+    async def heartbeat(self, job: GenerationJob, owner: str) -> bool:
+        """Extend the lease; False if another worker has taken the job over"""
+        now = datetime.utcnow()
+        result = await GenerationJob.get_motor_collection().update_one(
+            {"_id": job.id, "lease_owner": owner, "status": JobStatus.RUNNING.value},
+            {"$set": {"lease_expires_at": now + self.lease, "updated_at": now}}
+        )
+        return result.matched_count == 1
+
+    async def complete(self, job: GenerationJob, owner: str):
+        """Mark a claimed job as succeeded"""
+        now = datetime.utcnow()
+        await self._finish(job, owner, {
+            "status": JobStatus.SUCCEEDED.value,
+            "stage": "completed",
+            "error": None,
+            "finished_at": now,
+            "updated_at": now
+        })
+
+    async def fail(self, job: GenerationJob, owner: str, error: str) -> JobStatus:
+        """
+        Record a failed attempt
+
+        Returns:
+            QUEUED if the job will be retried, DEAD if it is out of attempts
+        """
+        now = datetime.utcnow()
+        if job.attempts >= job.max_attempts:
+            await self._finish(job, owner, {
+                "status": JobStatus.DEAD.value,
+                "stage": "failed",
+                "error": error,
+                "finished_at": now,
+                "updated_at": now
+            })
+            return JobStatus.DEAD
+
+        delay = self.retry_base * 2 ** (job.attempts - 1)
+        await self._finish(job, owner, {
+            "status": JobStatus.QUEUED.value,
+            "stage": "retrying",
+            "error": error,
+            "available_at": now + timedelta(seconds=delay * random.uniform(0.8, 1.2)),
+            "updated_at": now
+        })
+        return JobStatus.QUEUED
+
+    async def pending(self) -> int:
+        """Number of jobs not yet finished"""
+        return await GenerationJob.get_motor_collection().count_documents(
+            {"status": {"$in": [JobStatus.QUEUED.value, JobStatus.RUNNING.value]}}
+        )
+
+    async def _finish(self, job: GenerationJob, owner: str, fields: Dict):
+        # Only the current lease holder may move the job on
+        await GenerationJob.get_motor_collection().update_one(
+            {"_id": job.id, "lease_owner": owner},
+            {"$set": {**fields, "lease_owner": None, "lease_expires_at": None}}
+        )
+
+
+class JobWorker:
+    """
+    Pool of coroutines that claim and run generation jobs
+
+    Each of the JOB_WORKER_CONCURRENCY loops runs one job at a time, which
+    caps concurrent generations per process. Used in-process by the API
+    (JOB_WORKER_MODE=inline) or standalone via `python -m app.worker`.
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: Optional[int] = None, poll_interval: Optional[float] = None):
+        self.queue = queue
+        self.concurrency = concurrency or int(os.getenv("JOB_WORKER_CONCURRENCY", "4"))
+        self.poll_interval = poll_interval or float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.stats = {"claimed": 0, "succeeded": 0, "retried": 0, "dead": 0}
+        self._loops: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._loops) and self._loop is asyncio.get_running_loop() \
+            and not all(loop.done() for loop in self._loops)
+
+    def start(self):
+        """Start the worker loops on the running event loop (idempotent)"""
+        if self.running:
+            return
+        self._stopping = False
+        self._loop = asyncio.get_running_loop()
+        self._loops = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Stop claiming new jobs and wait for the ones in flight"""
+        self._stopping = True
+        await asyncio.gather(*self._loops, return_exceptions=True)
+        self._loops = []
+
+    async def drain(self):
+        """Run until no job is queued or running (local runs and benchmarks)"""
+        self._stopping = False
+        await asyncio.gather(*(self._run(until_empty=True) for _ in range(self.concurrency)))
+
+    async def _run(self, until_empty: bool = False):
+        while not self._stopping:
+            try:
+                job = await self.queue.claim(self.owner)
+            except Exception as e:
+                logger.warning("Job claim failed: %s", e)
+                job = None
+            if job is None:
+                if until_empty and not await self.queue.pending():
+                    return
+                await asyncio.sleep(self.poll_interval)
+                continue
+            self.stats["claimed"] += 1
+            await self._process(job)
+
+    async def _process(self, job: GenerationJob):
+        if job.attempts > job.max_attempts:
+            # Its lease ran out on every attempt (e.g. the worker kept dying)
+            await self.queue.fail(job, self.owner, job.error or "Lease expired")
+            self.stats["dead"] += 1
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            # A previous attempt may have saved the goal before its worker died
+            if await Goal.get(job.goal_id) is None:
+                await task_service.create_goal_with_tasks(
+                    title=job.title,
+                    description=job.description,
+                    deadline=job.deadline,
+                    goal_id=job.goal_id
+                )
+            await self.queue.complete(job, self.owner)
+            self.stats["succeeded"] += 1
+        except Exception as e:
+            logger.warning("Job %s attempt %d failed: %s", job.id, job.attempts, e)
+            outcome = await self.queue.fail(job, self.owner, str(e))
+            self.stats["dead" if outcome == JobStatus.DEAD else "retried"] += 1
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: GenerationJob):
+        interval = self.queue.lease.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not await self.queue.heartbeat(job, self.owner):
+                return
+
+
+# Create singleton instances
+job_queue = JobQueue()
+job_worker = JobWorker(job_queue)
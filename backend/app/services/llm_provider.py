@@ -0,0 +1,352 @@
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from dotenv import load_dotenv
+
+from app.services.prompt_schema import PROMPT_VERSION
+from app.services.response_parser import parse_refinement, parse_task_breakdown
+
+load_dotenv()
+
+
+class LLMProvider:
+    """
+    Interface TaskService uses to generate task breakdowns
+
+    Implementations: GeminiService (the live API), StubProvider
+    (deterministic offline plans), ReplayProvider (captured responses) and
+    RecordingProvider (captures another provider's responses).
+    """
+
+    name = "base"
+
+    async def generate_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> Dict[str, Any]:
+        """
+        Generate a structured task breakdown
+
+        Returns:
+            Dict with "tasks", "total_estimated_hours" and "suggested_timeline"
+        """
+        raise NotImplementedError
+
+    def stream_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> AsyncIterator[str]:
+        """
+        Stream the raw text of a task breakdown as it is generated
+
+        Yields:
+            Text chunks of the JSON response
+        """
+        raise NotImplementedError
+
+    async def refine_task_breakdown(
+        self,
+        goal_title: str,
+        goal_description: str,
+        instruction: str,
+        tasks: List[Dict[str, Any]],
+        context: List[Dict[str, Any]],
+        deadline: str = None
+    ) -> Dict[str, Any]:
+        """
+        Rewrite some tasks of an existing plan (see build_refine_prompt)
+
+        Returns:
+            Dict with "tasks", each carrying the "ref" of the task it
+            revises (None for new tasks) and dependency refs
+        """
+        raise NotImplementedError(f"The {self.name} provider cannot refine plans")
+
+    def usage_stats(self) -> Dict[str, Any]:
+        """Counters for /health/llm"""
+        return {}
+
+
+def request_key(goal_title: str, goal_description: str, deadline: Optional[str] = None) -> str:
+    """Stable hash of a generation request, used to match recordings"""
+    parts = [PROMPT_VERSION] + [" ".join((value or "").lower().split()) for value in (goal_title, goal_description, deadline)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+async def _stream_text(text: str, latency: float, chunk_size: int = 64) -> AsyncIterator[str]:
+    """Yield text in fixed-size chunks, spreading latency across them"""
+    chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or [""]
+    for chunk in chunks:
+        await asyncio.sleep(latency / len(chunks))
+        yield chunk
+
+
+class StubProvider(LLMProvider):
+    """
+    Deterministic offline provider for local runs and load tests
+
+    Plans are derived from a hash of the request, so the same goal always
+    gets the same tasks. Responses are compact-format JSON text that goes
+    through the real parser. Latency and output size come from
+    LLM_STUB_LATENCY_SECONDS, LLM_STUB_TASK_COUNT and
+    LLM_STUB_DESCRIPTION_WORDS.
+    """
+
+    name = "stub"
+
+    WORDS = (
+        "research", "draft", "review", "outline", "build", "test", "measure",
+        "document", "refine", "practice", "schedule", "prepare", "deliver",
+        "analyse", "plan", "collect", "share", "prototype", "validate", "ship",
+    )
+
+    def __init__(self, latency: Optional[float] = None, task_count: Optional[int] = None, description_words: Optional[int] = None):
+        self.latency = float(os.getenv("LLM_STUB_LATENCY_SECONDS", "1.0")) if latency is None else latency
+        self.task_count = task_count or int(os.getenv("LLM_STUB_TASK_COUNT", "8"))
+        self.description_words = description_words or int(os.getenv("LLM_STUB_DESCRIPTION_WORDS", "12"))
+        self._stats = {"calls": 0, "output_chars": 0}
+
+    def render(self, goal_title: str, goal_description: str, deadline: str = None) -> str:
+        """The response text for a request"""
+        rng = random.Random(request_key(goal_title, goal_description, deadline))
+        tasks = []
+        day = 0
+        for i in range(self.task_count):
+            hours = rng.choice((1, 2, 3, 4, 6, 8))
+            deps = sorted(rng.sample(range(i), min(i, rng.randint(1, 2)))) if i else []
+            words = " ".join(rng.choice(self.WORDS) for _ in range(self.description_words))
+            tasks.append({
+                "t": f"{goal_title[:40]} step {i + 1}",
+                "d": words.capitalize() + ".",
+                "h": hours,
+                "p": rng.choice(("low", "medium", "high", "critical")),
+                "dep": deps,
+                "s": day,
+                "e": day + hours // 4,
+            })
+            day += hours // 4 + 1
+        return json.dumps({
+            "tasks": tasks,
+            "h": sum(task["h"] for task in tasks),
+            "tl": f"About {day} days"
+        }, separators=(",", ":"))
+
+    async def generate_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> Dict[str, Any]:
+        text = self.render(goal_title, goal_description, deadline)
+        self._count(text)
+        await asyncio.sleep(self.latency)
+        return parse_task_breakdown(text)
+
+    async def stream_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> AsyncIterator[str]:
+        text = self.render(goal_title, goal_description, deadline)
+        self._count(text)
+        async for chunk in _stream_text(text, self.latency):
+            yield chunk
+
+    def render_refinement(self, instruction: str, tasks: List[Dict[str, Any]]) -> str:
+        """
+        The refinement response text for a request
+
+        Each task is kept or reworded (never dropped) and one new task
+        following the last of them is added, so refinements exercise both
+        updates and inserts.
+        """
+        rng = random.Random(request_key(instruction, "\x1f".join(task["ref"] for task in tasks)))
+        refined = []
+        for task in tasks:
+            item = {
+                "ref": task["ref"],
+                "t": task["title"],
+                "d": task["description"],
+                "h": task["estimated_hours"] or 1,
+                "p": task["priority"],
+                "dep": task["dependencies"],
+            }
+            if rng.random() < 0.4:
+                item["d"] = f"{instruction.strip().rstrip('.')}: {task['description']}"
+                item["h"] = item["h"] + rng.choice((1, 2))
+            refined.append(item)
+        refined.append({
+            "t": f"{instruction.strip()[:40]} follow-up",
+            "d": " ".join(rng.choice(self.WORDS) for _ in range(self.description_words)).capitalize() + ".",
+            "h": rng.choice((1, 2, 4)),
+            "p": "medium",
+            "dep": [f"n{len(refined) - 1}"] if refined else [],
+        })
+        return json.dumps({"tasks": refined}, separators=(",", ":"))
+
+    async def refine_task_breakdown(
+        self,
+        goal_title: str,
+        goal_description: str,
+        instruction: str,
+        tasks: List[Dict[str, Any]],
+        context: List[Dict[str, Any]],
+        deadline: str = None
+    ) -> Dict[str, Any]:
+        text = self.render_refinement(instruction, tasks)
+        self._count(text)
+        # Latency scales with output size, as it does for a real model
+        await asyncio.sleep(self.latency * min(1.0, (len(tasks) + 1) / self.task_count))
+        return parse_refinement(text)
+
+    def usage_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "latency_seconds": self.latency, "task_count": self.task_count}
+
+    def _count(self, text: str):
+        self._stats["calls"] += 1
+        self._stats["output_chars"] += len(text)
+
+
+class ReplayProvider(LLMProvider):
+    """
+    Serves responses captured by RecordingProvider (LLM_REPLAY_PATH)
+
+    A request gets the recording with the same request_key(); unknown
+    requests get a recording picked deterministically from their key, so
+    load tests with synthetic goals still see real-sized responses. Each
+    reply waits the recorded latency times LLM_REPLAY_LATENCY_SCALE.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: Optional[str] = None, latency_scale: Optional[float] = None):
+        self.path = Path(path or os.getenv("LLM_REPLAY_PATH", "recordings/llm_responses.jsonl"))
+        self.latency_scale = float(os.getenv("LLM_REPLAY_LATENCY_SCALE", "1.0")) if latency_scale is None else latency_scale
+        self._records: Optional[List[Dict[str, Any]]] = None
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self._stats = {"calls": 0, "exact_matches": 0}
+
+    def _load(self) -> List[Dict[str, Any]]:
+        if self._records is None:
+            if not self.path.exists():
+                raise ValueError(f"No LLM recordings at {self.path}")
+            records = [json.loads(line) for line in self.path.read_text().splitlines() if line.strip()]
+            if not records:
+                raise ValueError(f"No LLM recordings at {self.path}")
+            for record in records:
+                goal = record.get("goal", {})
+                key = record.get("key") or request_key(goal.get("title"), goal.get("description"), goal.get("deadline"))
+                self._by_key.setdefault(key, record)
+            self._records = records
+        return self._records
+
+    def _pick(self, goal_title: str, goal_description: str, deadline: str = None) -> Dict[str, Any]:
+        records = self._load()
+        key = request_key(goal_title, goal_description, deadline)
+        self._stats["calls"] += 1
+        record = self._by_key.get(key)
+        if record is not None:
+            self._stats["exact_matches"] += 1
+            return record
+        return records[int(key, 16) % len(records)]
+
+    def _latency(self, record: Dict[str, Any]) -> float:
+        return record.get("latency_ms", 0) / 1000 * self.latency_scale
+
+    async def generate_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> Dict[str, Any]:
+        record = self._pick(goal_title, goal_description, deadline)
+        await asyncio.sleep(self._latency(record))
+        return parse_task_breakdown(record["text"])
+
+    async def stream_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> AsyncIterator[str]:
+        record = self._pick(goal_title, goal_description, deadline)
+        async for chunk in _stream_text(record["text"], self._latency(record)):
+            yield chunk
+
+    def usage_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "recordings": len(self._records or []), "path": str(self.path)}
+
+
+class RecordingProvider(LLMProvider):
+    """
+    Wraps a provider and appends every response to LLM_REPLAY_PATH
+
+    The captured file is what ReplayProvider serves.
+    """
+
+    def __init__(self, inner: LLMProvider, path: Optional[str] = None):
+        self.inner = inner
+        self.name = inner.name
+        self.path = Path(path or os.getenv("LLM_REPLAY_PATH", "recordings/llm_responses.jsonl"))
+
+    async def generate_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> Dict[str, Any]:
+        started = time.perf_counter()
+        result = await self.inner.generate_task_breakdown(goal_title, goal_description, deadline)
+        self._record(goal_title, goal_description, deadline, json.dumps(result), started)
+        return result
+
+    async def stream_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None) -> AsyncIterator[str]:
+        started = time.perf_counter()
+        chunks = []
+        async for chunk in self.inner.stream_task_breakdown(goal_title, goal_description, deadline):
+            chunks.append(chunk)
+            yield chunk
+        self._record(goal_title, goal_description, deadline, "".join(chunks), started)
+
+    async def refine_task_breakdown(self, *args, **kwargs) -> Dict[str, Any]:
+        # Refinements are not replayable, so they are passed through unrecorded
+        return await self.inner.refine_task_breakdown(*args, **kwargs)
+
+    def usage_stats(self) -> Dict[str, Any]:
+        return {**self.inner.usage_stats(), "recording_to": str(self.path)}
+
+    def _record(self, goal_title: str, goal_description: str, deadline: Optional[str], text: str, started: float):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(json.dumps({
+                "key": request_key(goal_title, goal_description, deadline),
+                "recorded_on": date.today().isoformat(),
+                "recorded_at": datetime.utcnow().isoformat(),
+                "goal": {"title": goal_title, "description": goal_description, "deadline": deadline},
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+                "text": text
+            }) + "\n")
+
+
+def create_provider(name: str) -> LLMProvider:
+    """
+    Build a provider by name
+
+    Args:
+        name: gemini, stub, replay, or record (gemini, capturing responses)
+    """
+    if name in ("gemini", "record"):
+        # Imported here so other providers never load the Gemini SDK
+        from app.services.gemini_service import GeminiService
+        provider = GeminiService()
+        return RecordingProvider(provider) if name == "record" else provider
+    if name == "stub":
+        return StubProvider()
+    if name == "replay":
+        return ReplayProvider()
+    raise ValueError(f"Unknown LLM_PROVIDER: {name}")
+
+
+class LLMRegistry:
+    """
+    Holds the provider selected by LLM_PROVIDER (default "gemini")
+
+    The provider is built on first use, so the app imports and starts
+    without Gemini credentials; a missing GEMINI_API_KEY only fails the
+    requests that need the model.
+    """
+
+    def __init__(self):
+        self.name = os.getenv("LLM_PROVIDER", "gemini").strip().lower()
+        self._provider: Optional[LLMProvider] = None
+
+    @property
+    def provider(self) -> LLMProvider:
+        if self._provider is None:
+            self._provider = create_provider(self.name)
+        return self._provider
+
+    def use(self, provider: LLMProvider):
+        """Swap in a provider (benchmarks and tests)"""
+        self._provider = provider
+        self.name = provider.name
+
+
+# Create singleton instance
+llm = LLMRegistry()
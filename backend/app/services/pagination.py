@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import json
+
+from bson import ObjectId
+
+
+def encode_cursor(sort: str, value: Any, last_id: ObjectId) -> str:
+    """
+    Opaque keyset cursor for the row after (value, last_id)
+
+    Args:
+        sort: Sort option the cursor belongs to
+        value: Sort-field value of the last row on the page
+        last_id: _id of the last row on the page
+    """
+    if isinstance(value, datetime):
+        value = {"$date": value.isoformat()}
+    payload = json.dumps({"s": sort, "v": value, "id": str(last_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, ObjectId]:
+    """
+    Decode a cursor produced by encode_cursor for the same sort option
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload["v"]
+        if isinstance(value, dict) and "$date" in value:
+            value = datetime.fromisoformat(value["$date"])
+        last_id = ObjectId(payload["id"])
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if payload.get("s") != sort:
+        raise ValueError("Cursor does not match the requested sort")
+    return value, last_id
+
+
+def keyset_filter(field: str, descending: bool, cursor_value: Any, last_id: ObjectId) -> Dict[str, Any]:
+    """Match rows strictly after (cursor_value, last_id) in (field, _id) order"""
+    op = "$lt" if descending else "$gt"
+    return {"$or": [
+        {field: {op: cursor_value}},
+        {field: cursor_value, "_id": {op: last_id}},
+    ]}
+
+
+def keyset_sort(field: str, descending: bool) -> List[Tuple[str, int]]:
+    direction = -1 if descending else 1
+    return [(field, direction), ("_id", direction)]
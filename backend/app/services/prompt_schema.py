@@ -0,0 +1,220 @@
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+# Bump whenever the prompt or expected response shape changes so cached
+# breakdowns and recordings from the old prompt are not reused
+PROMPT_VERSION = "2"
+
+# Short keys the model writes -> the task fields the rest of the app uses
+TASK_KEYS = {
+    "t": "title",
+    "d": "description",
+    "h": "estimated_hours",
+    "p": "priority",
+    "dep": "dependencies",
+    "s": "start_date",
+    "e": "end_date",
+}
+
+BREAKDOWN_KEYS = {
+    "h": "total_estimated_hours",
+    "tl": "suggested_timeline",
+}
+
+# Gemini structured output schema for the compact format. Dependencies are
+# indices of earlier tasks and dates are day offsets from today, both far
+# cheaper to generate than repeated titles and ISO strings.
+RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "t": {"type": "string"},
+                    "d": {"type": "string"},
+                    "h": {"type": "number"},
+                    "p": {"type": "string", "enum": ["low", "medium", "high", "critical"]},
+                    "dep": {"type": "array", "items": {"type": "integer"}},
+                    "s": {"type": "integer"},
+                    "e": {"type": "integer"},
+                },
+                "required": ["t", "d", "h", "p", "dep"],
+            },
+        },
+        "h": {"type": "number"},
+        "tl": {"type": "string"},
+    },
+    "required": ["tasks"],
+}
+
+
+def build_compact_prompt(goal_title: str, goal_description: str, deadline: Optional[str] = None, today: Optional[date] = None) -> str:
+    """Prompt asking for the compact RESPONSE_SCHEMA format"""
+    today = today or date.today()
+    return f"""Break this goal into an ordered, actionable task plan.
+
+Goal: {goal_title}
+Description: {goal_description}
+Deadline: {deadline or "none"}
+Today: {today.isoformat()}
+
+JSON only: {{"tasks":[{{"t":title,"d":1-2 sentence description,"h":hours,"p":"low|medium|high|critical","dep":[indices of earlier tasks it needs],"s":start day,"e":end day}}],"h":total hours,"tl":one-line timeline}}
+5-15 specific tasks with realistic hours, in dependency order; first tasks have "dep":[]. Days count from today (0 = today) and should finish by the deadline."""
+
+
+def build_verbose_prompt(goal_title: str, goal_description: str, deadline: Optional[str] = None) -> str:
+    """Original prompt asking for full field names and title dependencies"""
+    deadline_text = f"\nDeadline: {deadline}" if deadline else "\nNo specific deadline provided."
+
+    return f"""You are an expert project manager and task breakdown specialist.
+
+Goal: {goal_title}
+Description: {goal_description}{deadline_text}
+
+Break down this goal into a detailed, actionable task plan. For each task:
+1. Create clear, specific task titles
+2. Provide detailed descriptions
+3. Estimate hours needed (realistic estimates)
+4. Set priority (low, medium, high, critical)
+5. Identify dependencies (which tasks must be completed before others)
+6. Suggest start and end dates based on the deadline and task order
+
+Return your response as a valid JSON object with this EXACT structure:
+
+{{
+  "tasks": [
+    {{
+      "title": "Task title",
+      "description": "Detailed description of what needs to be done",
+      "estimated_hours": 8,
+      "priority": "high",
+      "dependencies": [],
+      "start_date": "2025-10-16",
+      "end_date": "2025-10-18"
+    }}
+  ],
+  "total_estimated_hours": 40,
+  "suggested_timeline": "Brief timeline overview"
+}}
+
+Rules:
+- Create 5-15 tasks depending on goal complexity
+- Be specific and actionable
+- Consider realistic time estimates
+- Identify critical path and dependencies
+- Tasks should flow logically
+- Use ISO date format (YYYY-MM-DD)
+- First tasks should have no dependencies
+- Later tasks can depend on earlier ones using the task title
+
+Return ONLY the JSON, no additional text or markdown formatting."""
+
+
+def expand_task(data: Dict[str, Any], today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Map a compact task onto the full field names
+
+    Day offsets become ISO dates counted from today; index dependencies are
+    kept as ints, which dependency resolution already understands. Dicts
+    already using the full names pass through unchanged.
+
+    Args:
+        data: Task dict as produced by the model
+        today: Day offsets are counted from (defaults to today)
+
+    Returns:
+        Task dict with title, description, estimated_hours, ... keys
+    """
+    if "t" not in data or "title" in data:
+        return data
+
+    today = today or date.today()
+    task = {TASK_KEYS.get(key, key): value for key, value in data.items()}
+    for field in ("start_date", "end_date"):
+        offset = task.get(field)
+        if isinstance(offset, (int, float)) and not isinstance(offset, bool):
+            task[field] = (today + timedelta(days=int(offset))).isoformat()
+    return task
+
+
+def expand_breakdown(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map compact top-level keys (tasks are expanded one by one)"""
+    for short, name in BREAKDOWN_KEYS.items():
+        if short in data and name not in data:
+            data[name] = data.pop(short)
+    return data
+
+
+# Structured output for refining part of a plan. "ref" names the existing
+# task a returned task revises (absent for new tasks); dependencies are refs
+# of existing tasks or "n<i>" for the i-th task of the response.
+REFINE_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "ref": {"type": "string"},
+                    "t": {"type": "string"},
+                    "d": {"type": "string"},
+                    "h": {"type": "number"},
+                    "p": {"type": "string", "enum": ["low", "medium", "high", "critical"]},
+                    "dep": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["t", "d", "h", "p", "dep"],
+            },
+        },
+    },
+    "required": ["tasks"],
+}
+
+
+def build_refine_prompt(
+    goal_title: str,
+    goal_description: str,
+    instruction: str,
+    tasks: List[Dict[str, Any]],
+    context: List[Dict[str, Any]],
+    deadline: Optional[str] = None
+) -> str:
+    """
+    Prompt asking for a rewrite of some tasks in REFINE_RESPONSE_SCHEMA format
+
+    Only the tasks being rewritten are sent in full; neighbouring tasks go
+    as one-line context the rewrite may depend on.
+
+    Args:
+        goal_title: Goal title
+        goal_description: Goal description
+        instruction: What the user wants changed
+        tasks: Tasks to rewrite, each with ref, title, description,
+            estimated_hours, priority and dependencies (refs)
+        context: Neighbouring tasks, each with ref, title and relation
+            ("prerequisite" or "dependent")
+        deadline: Optional deadline string
+    """
+    task_lines = "\n".join(
+        f'{task["ref"]}: {task["title"]} | {task["estimated_hours"] or "?"}h | {task["priority"]}'
+        f' | dep: {",".join(task["dependencies"]) or "-"}\n  {task["description"]}'
+        for task in tasks
+    )
+    context_lines = "\n".join(f'{item["ref"]}: {item["title"]} ({item["relation"]})' for item in context) or "none"
+    return f"""Rewrite part of an existing task plan.
+
+Goal: {goal_title}
+Description: {goal_description}
+Deadline: {deadline or "none"}
+Instruction: {instruction}
+
+Tasks to rewrite (ref: title | hours | priority | dep):
+{task_lines}
+
+Other tasks (unchanged; usable as dependencies):
+{context_lines}
+
+JSON only: {{"tasks":[{{"ref":ref of the task it revises (omit for new tasks),"t":title,"d":1-2 sentence description,"h":hours,"p":"low|medium|high|critical","dep":[refs, or "n<i>" for the i-th task of this list]}}]}}
+Follow the instruction. Keep unchanged tasks with their ref; leave out tasks that should be removed. Tasks listed as dependents above will depend on whichever of your tasks nothing else here depends on."""
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+import os
+
+
+class ReadCache:
+    """
+    In-process read-through cache of rendered goal and task responses
+
+    Entries hold the encoded body and its ETag, grouped by goal so a write
+    can drop a goal and all of its tasks at once with invalidate_goal().
+    The cache is per process: invalidate_goal() only reaches the worker that
+    made the write, so entries also expire after READ_CACHE_TTL_SECONDS to
+    pick up writes made by other workers. The LRU is capped at
+    READ_CACHE_MAX_ENTRIES.
+
+    A reader takes generation() before it queries the database and passes
+    it to set(); if any invalidation happened in between, the body may
+    predate that write and is not stored.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("READ_CACHE_ENABLED", "true").lower() == "true"
+        self.ttl = timedelta(seconds=int(os.getenv("READ_CACHE_TTL_SECONDS", "30")))
+        self.max_entries = int(os.getenv("READ_CACHE_MAX_ENTRIES", "1000"))
+        self._entries: "OrderedDict[str, Tuple[datetime, str, str, bytes]]" = OrderedDict()
+        self._by_goal: Dict[str, Set[str]] = {}
+        self._generation = 0  # Bumped by every invalidation
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Look up a rendered response
+
+        Args:
+            key: Cache key, e.g. "goal:<id>" or "task:<id>"
+
+        Returns:
+            (etag, body) or None on a miss
+        """
+        entry = self._entries.get(key) if self.enabled else None
+        if entry and entry[0] > datetime.utcnow():
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[2], entry[3]
+        if entry:
+            self._drop(key)
+        self._stats["misses"] += 1
+        return None
+
+    def generation(self) -> int:
+        """Token to take before reading the data a response is rendered from"""
+        return self._generation
+
+    def set(self, key: str, goal_id: str, etag: str, body: bytes, generation: Optional[int] = None):
+        """
+        Store a rendered response
+
+        Args:
+            key: Cache key
+            goal_id: Goal the response belongs to (for invalidate_goal)
+            etag: ETag sent with the body
+            body: Encoded JSON body
+            generation: generation() taken before the read; the body is
+                dropped if an invalidation happened since
+
+        Returns:
+            Whether the response was stored
+        """
+        if not self.enabled:
+            return False
+        if generation is not None and generation != self._generation:
+            return False
+        self._drop(key)
+        self._entries[key] = (datetime.utcnow() + self.ttl, goal_id, etag, body)
+        self._by_goal.setdefault(goal_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+        return True
+
+    def invalidate_goal(self, goal_id: str):
+        """Drop the goal's response and those of all its tasks"""
+        keys = self._by_goal.pop(str(goal_id), ())
+        for key in keys:
+            self._entries.pop(key, None)
+        self._generation += 1
+        self._stats["invalidations"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._by_goal.clear()
+        self._generation += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "entries": len(self._entries)}
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry:
+            keys = self._by_goal.get(entry[1])
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self._by_goal[entry[1]]
+
+
+# Create singleton instance
+read_cache = ReadCache()
@@ -0,0 +1,433 @@
+from pydantic import BaseModel, ValidationError, field_validator
+from typing import Any, Dict, List, Optional, Union
+import json
+import re
+
+from app.instrumentation import span
+from app.services.prompt_schema import expand_breakdown, expand_task
+
+
+class AITask(BaseModel):
+    """Schema for one task in a Gemini breakdown, lenient about input types"""
+    title: str
+    description: str = ""
+    estimated_hours: Optional[float] = None
+    priority: str = "medium"
+    dependencies: List[Union[int, str]] = []
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+    @field_validator("title", mode="before")
+    @classmethod
+    def _title(cls, value):
+        if not isinstance(value, str) or not value.strip():
+            raise ValueError("task title is required")
+        return value.strip()
+
+    @field_validator("description", mode="before")
+    @classmethod
+    def _description(cls, value):
+        return value if isinstance(value, str) else ""
+
+    @field_validator("estimated_hours", mode="before")
+    @classmethod
+    def _hours(cls, value):
+        # Accept 8, "8", "8 hours", "2.5h"
+        if isinstance(value, str):
+            match = re.search(r"\d+(?:\.\d+)?", value)
+            value = float(match.group()) if match else None
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0:
+            return float(value)
+        return None
+
+    @field_validator("priority", mode="before")
+    @classmethod
+    def _priority(cls, value):
+        value = value.strip().lower() if isinstance(value, str) else ""
+        return value if value in ("low", "medium", "high", "critical") else "medium"
+
+    @field_validator("dependencies", mode="before")
+    @classmethod
+    def _dependencies(cls, value):
+        if isinstance(value, (str, int)) and not isinstance(value, bool):
+            value = [value]
+        if not isinstance(value, list):
+            return []
+        return [dep for dep in value if isinstance(dep, (str, int)) and not isinstance(dep, bool)]
+
+    @field_validator("start_date", "end_date", mode="before")
+    @classmethod
+    def _date(cls, value):
+        return value if isinstance(value, str) and value else None
+
+
+def validate_task(data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Normalize one task dict against AITask
+
+    Compact tasks (short keys, day offsets) are expanded first.
+
+    Returns:
+        The cleaned task dict, or None if it cannot be used (e.g. no title)
+    """
+    if not isinstance(data, dict):
+        return None
+    try:
+        return AITask.model_validate(expand_task(data)).model_dump()
+    except ValidationError:
+        return None
+
+
+def renumber_dependencies(tasks: List[Dict[str, Any]], positions: List[int]) -> List[Dict[str, Any]]:
+    """
+    Point index dependencies at the tasks' positions after invalid ones were dropped
+
+    Args:
+        tasks: Validated tasks, in order
+        positions: Each task's index in the model's original list
+
+    Returns:
+        tasks, updated in place: index dependencies are renumbered and
+        those pointing at a dropped task are removed. Title dependencies
+        are kept as they are.
+    """
+    new_index = {position: i for i, position in enumerate(positions)}
+    for task in tasks:
+        task["dependencies"] = [
+            new_index[dep] if isinstance(dep, int) else dep
+            for dep in task["dependencies"]
+            if not isinstance(dep, int) or dep in new_index
+        ]
+    return tasks
+
+
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair common defects in model-produced JSON in a single pass
+
+    - Skips prose and code fences before the first "{" and after the
+      top-level object closes
+    - Drops trailing commas and // comments, fixes mismatched closers
+    - Escapes raw newlines/tabs inside strings, maps True/False/None
+    - On truncated output, cuts back to the last complete task (or other
+      top-level value) and closes whatever is still open
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        JSON text that json.loads is likely to accept
+    """
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found in response")
+
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    last_safe = None  # (output length, open stack) after the last complete top-level value
+    i, n = start, len(text)
+
+    while i < n:
+        c = text[i]
+
+        if in_string:
+            if escape:
+                escape = False
+                out.append(c)
+            elif c == "\\":
+                escape = True
+                out.append(c)
+            elif c == '"':
+                in_string = False
+                out.append(c)
+            elif c == "\n":
+                out.append("\\n")
+            elif c == "\t":
+                out.append("\\t")
+            elif c != "\r":
+                out.append(c)
+            i += 1
+            continue
+
+        if c == '"':
+            in_string = True
+            out.append(c)
+        elif c == "{" or c == "[":
+            stack.append(c)
+            out.append(c)
+        elif c == "}" or c == "]":
+            _strip_trailing_comma(out)
+            if not stack:
+                break
+            opener = stack.pop()
+            out.append("}" if opener == "{" else "]")
+            if not stack:
+                return "".join(out)
+            if len(stack) <= 2:
+                last_safe = (len(out), "".join(stack))
+        elif c == "/" and text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        elif c in "TFN" and not (out and (out[-1].isalnum() or out[-1] == "_")):
+            for literal, replacement in _LITERALS.items():
+                if text.startswith(literal, i):
+                    out.append(replacement)
+                    i += len(literal)
+                    break
+            else:
+                out.append(c)
+                i += 1
+            continue
+        else:
+            out.append(c)
+        i += 1
+
+    # Truncated: fall back to the last complete value and close what is open
+    if last_safe is not None:
+        del out[last_safe[0]:]
+        stack = list(last_safe[1])
+    else:
+        out, stack = ["{"], ["{"]
+    _strip_trailing_comma(out)
+    for opener in reversed(stack):
+        out.append("}" if opener == "{" else "]")
+    return "".join(out)
+
+
+def _strip_trailing_comma(out: List[str]):
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+
+
+def parse_task_breakdown(text: str) -> Dict[str, Any]:
+    """
+    Parse a (possibly fenced, truncated or malformed) task breakdown
+
+    Well-formed output takes the json.loads fast path; anything else goes
+    through repair_json. Both the compact and the verbose response format
+    are accepted. Tasks that fail validation are dropped.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Dict with a non-empty "tasks" list
+
+    Raises:
+        ValueError: If no usable task can be recovered
+    """
+    with span("llm.parse"):
+        return _parse_task_breakdown(text)
+
+
+def _parse_task_breakdown(text: str) -> Dict[str, Any]:
+    start, end = text.find("{"), text.rfind("}")
+    result = None
+    if start != -1 and end > start:
+        try:
+            result = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            result = None
+
+    if not isinstance(result, dict):
+        try:
+            result = json.loads(repair_json(text))
+        except (json.JSONDecodeError, ValueError) as e:
+            raise ValueError(f"Invalid JSON response from Gemini: {e}")
+
+    if not isinstance(result, dict) or not isinstance(result.get("tasks"), list):
+        raise ValueError("Response missing 'tasks' field")
+    expand_breakdown(result)
+
+    tasks, positions = [], []
+    for position, task in enumerate(map(validate_task, result["tasks"])):
+        if task is not None:
+            tasks.append(task)
+            positions.append(position)
+    if not tasks:
+        raise ValueError("Response contained no valid tasks")
+    result["tasks"] = renumber_dependencies(tasks, positions)
+
+    total = result.get("total_estimated_hours")
+    if isinstance(total, bool) or not isinstance(total, (int, float)):
+        result["total_estimated_hours"] = sum(task["estimated_hours"] or 0 for task in tasks)
+
+    return result
+
+
+def parse_refinement(text: str) -> Dict[str, Any]:
+    """
+    Parse a REFINE_RESPONSE_SCHEMA response
+
+    Tasks are validated like breakdown tasks; each keeps the "ref" of the
+    existing task it revises (None for new tasks) and string dependency
+    refs. "n<i>" refs are renumbered past dropped tasks, like index
+    dependencies of a breakdown. An empty "tasks" list is valid: it
+    removes the refined tasks.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Dict with the "tasks" list
+
+    Raises:
+        ValueError: If the response is not a JSON object with "tasks"
+    """
+    with span("llm.parse_refinement"):
+        start, end = text.find("{"), text.rfind("}")
+        try:
+            result = json.loads(text[start:end + 1] if start != -1 and end > start else text)
+        except json.JSONDecodeError:
+            try:
+                result = json.loads(repair_json(text))
+            except (json.JSONDecodeError, ValueError) as e:
+                raise ValueError(f"Invalid JSON response from Gemini: {e}")
+
+        if not isinstance(result, dict) or not isinstance(result.get("tasks"), list):
+            raise ValueError("Response missing 'tasks' field")
+
+        tasks = []
+        new_index = {}
+        for position, data in enumerate(result["tasks"]):
+            task = validate_task(data)
+            if task is None:
+                continue
+            ref = data.get("ref")
+            task["ref"] = ref if isinstance(ref, str) and ref else None
+            task["dependencies"] = [str(dep) for dep in task["dependencies"]]
+            new_index[position] = len(tasks)
+            tasks.append(task)
+
+        for task in tasks:
+            dependencies = []
+            for dep in task["dependencies"]:
+                if dep.startswith("n") and dep[1:].isdigit():
+                    if int(dep[1:]) not in new_index:
+                        continue
+                    dep = f"n{new_index[int(dep[1:])]}"
+                dependencies.append(dep)
+            task["dependencies"] = dependencies
+        return {"tasks": tasks}
+
+
+class TaskStreamParser:
+    """
+    Incremental parser that pulls task objects out of a streamed Gemini response
+
+    Text is fed in arbitrary chunks. Each element of the top-level "tasks"
+    array is returned by feed() as soon as its closing brace arrives, so
+    tasks can be persisted and sent to the client while the model is still
+    generating the rest of the plan.
+
+    Index dependencies of the tasks returned by feed() count every element
+    the model wrote, including ones dropped as invalid; finish() renumbers
+    them in place once it is known which tasks were kept.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key: Optional[str] = None
+        self._in_tasks = False
+        self._object_start: Optional[int] = None
+        self._element = 0
+        self.tasks: List[Dict[str, Any]] = []
+        self._positions: List[int] = []
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of response text
+
+        Args:
+            chunk: Next piece of the raw model output
+
+        Returns:
+            Task dicts completed by this chunk, in order
+        """
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+
+        for i in range(self._pos, len(buffer)):
+            c = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = buffer[self._string_start + 1:i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c in "{[":
+                self._depth += 1
+                if c == "[" and self._depth == 2 and self._last_key == "tasks":
+                    self._in_tasks = True
+                    self._element = 0
+                elif c == "{" and self._in_tasks and self._depth == 3:
+                    self._object_start = i
+            elif c in "}]":
+                if c == "}" and self._in_tasks and self._depth == 3 and self._object_start is not None:
+                    task = self._load_task(buffer[self._object_start:i + 1])
+                    if task is not None:
+                        self.tasks.append(task)
+                        self._positions.append(self._element)
+                        completed.append(task)
+                    self._object_start = None
+                elif c == "]" and self._in_tasks and self._depth == 2:
+                    self._in_tasks = False
+                self._depth -= 1
+            elif c == "," and self._in_tasks and self._depth == 2:
+                self._element += 1
+
+        self._pos = len(buffer)
+        return completed
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Parse the complete response once the stream has ended
+
+        Returns:
+            The full response dict; if the document as a whole cannot be
+            recovered, the tasks emitted so far
+        """
+        renumber_dependencies(self.tasks, self._positions)
+        try:
+            return parse_task_breakdown(self._buffer)
+        except ValueError:
+            if not self.tasks:
+                raise
+        return {
+            "tasks": list(self.tasks),
+            "total_estimated_hours": sum(task["estimated_hours"] or 0 for task in self.tasks)
+        }
+
+    @staticmethod
+    def _load_task(text: str) -> Optional[Dict[str, Any]]:
+        try:
+            task = json.loads(text)
+        except json.JSONDecodeError:
+            try:
+                task = json.loads(repair_json(text))
+            except (json.JSONDecodeError, ValueError):
+                return None
+        return validate_task(task)
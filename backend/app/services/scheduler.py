@@ -0,0 +1,245 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+import bisect
+import heapq
+import os
+
+from app.models import Task, TaskPriority, TaskStatus
+from app.services.dependency_graph import DependencyGraph
+
+
+PRIORITY_RANK = {
+    TaskPriority.CRITICAL: 0,
+    TaskPriority.HIGH: 1,
+    TaskPriority.MEDIUM: 2,
+    TaskPriority.LOW: 3,
+}
+
+
+class WorkCalendar:
+    """
+    Maps working-hour offsets to wall-clock datetimes
+
+    A working day is `hours_per_day` hours starting at `day_start_hour` on
+    each weekday in `working_days` (0 = Monday). Conversions are O(1).
+    """
+
+    def __init__(self, day_start_hour: int = 9, hours_per_day: float = 8, working_days: Sequence[int] = (0, 1, 2, 3, 4)):
+        if not working_days:
+            raise ValueError("Calendar needs at least one working day")
+        self.day_start_hour = day_start_hour
+        self.hours_per_day = hours_per_day
+        self.working_days = sorted(set(working_days))
+
+    @classmethod
+    def from_env(cls) -> "WorkCalendar":
+        days = os.getenv("SCHEDULE_WORKING_DAYS", "0,1,2,3,4")
+        return cls(
+            day_start_hour=int(os.getenv("SCHEDULE_DAY_START_HOUR", "9")),
+            hours_per_day=float(os.getenv("SCHEDULE_HOURS_PER_DAY", "8")),
+            working_days=[int(day) for day in days.split(",") if day.strip()]
+        )
+
+    def align(self, moment: datetime) -> datetime:
+        """Move a moment forward to the next instant inside working hours"""
+        day_start = moment.replace(hour=self.day_start_hour, minute=0, second=0, microsecond=0)
+        day_end = day_start + timedelta(hours=self.hours_per_day)
+        if moment.weekday() in self.working_days and day_start <= moment < day_end:
+            return moment
+        if moment.weekday() in self.working_days and moment < day_start:
+            return day_start
+        return self._next_working_day(day_start)
+
+    def _next_working_day(self, day_start: datetime) -> datetime:
+        for offset in range(1, 8):
+            candidate = day_start + timedelta(days=offset)
+            if candidate.weekday() in self.working_days:
+                return candidate
+        raise ValueError("No working day found")
+
+    def plan(self, origin: datetime) -> "CalendarPlan":
+        """Offset converter anchored at an aligned origin"""
+        return CalendarPlan(self, self.align(origin))
+
+
+class CalendarPlan:
+    """Working-hour offsets from a fixed origin, converted to datetimes"""
+
+    def __init__(self, calendar: WorkCalendar, origin: datetime):
+        self.calendar = calendar
+        self.origin_day = origin.replace(hour=calendar.day_start_hour, minute=0, second=0, microsecond=0)
+        self.origin_offset = (origin - self.origin_day).total_seconds() / 3600
+
+        # Calendar-day distance of each working day in the first week from the origin day
+        weekday = self.origin_day.weekday()
+        self.week_offsets = sorted((day - weekday) % 7 for day in calendar.working_days)
+
+    def at(self, offset_hours: float, is_end: bool = False) -> datetime:
+        """
+        Datetime `offset_hours` working hours after the origin
+
+        With is_end, an offset landing exactly on a day boundary maps to the
+        end of the earlier day rather than the start of the next one.
+        """
+        hours = self.calendar.hours_per_day
+        total = self.origin_offset + offset_hours
+        day_index, remainder = divmod(total, hours)
+        day_index = int(day_index)
+        if is_end and remainder < 1e-9 and day_index > 0:
+            day_index -= 1
+            remainder = hours
+
+        weeks, slot = divmod(day_index, len(self.week_offsets))
+        day = self.origin_day + timedelta(days=weeks * 7 + self.week_offsets[slot])
+        return day + timedelta(minutes=round(remainder * 60))
+
+    def offset(self, moment: datetime) -> float:
+        """Working hours from the origin to `moment` (inverse of at(), 0 for the past)"""
+        hours = self.calendar.hours_per_day
+        day_start = moment.replace(hour=self.calendar.day_start_hour, minute=0, second=0, microsecond=0)
+        weeks, day = divmod((day_start - self.origin_day).days, 7)
+        # Working days of the week before `moment`'s day, plus the hours worked on it
+        slot = bisect.bisect_left(self.week_offsets, day)
+        within = 0.0
+        if slot < len(self.week_offsets) and self.week_offsets[slot] == day:
+            within = min(max((moment - day_start).total_seconds() / 3600, 0.0), hours)
+        return max(0.0, (weeks * len(self.week_offsets) + slot) * hours + within - self.origin_offset)
+
+
+class Scheduler:
+    """
+    List scheduler over the dependency DAG
+
+    Tasks are started as soon as their dependencies finish and a slot is
+    free (at most `max_parallel` at once, unlimited when None). Among ready
+    tasks, in-progress work goes first, then TaskPriority, then the longest
+    remaining dependency chain. Completed tasks are treated as already done.
+    In-progress tasks that already started keep their start date, and their
+    end date too while it is still ahead, so rescheduling doesn't rewrite
+    work that is under way. Runs in O((V+E) log V).
+    """
+
+    def __init__(self, calendar: Optional[WorkCalendar] = None, max_parallel: Optional[int] = None, default_hours: float = 1.0):
+        self.calendar = calendar or WorkCalendar.from_env()
+        self.max_parallel = max_parallel or None
+        self.default_hours = default_hours
+
+    @classmethod
+    def from_env(cls, max_parallel: Optional[int] = None) -> "Scheduler":
+        if max_parallel is None:
+            max_parallel = int(os.getenv("SCHEDULE_MAX_PARALLEL", "0"))
+        return cls(
+            calendar=WorkCalendar.from_env(),
+            max_parallel=max_parallel,
+            default_hours=float(os.getenv("SCHEDULE_DEFAULT_TASK_HOURS", "1"))
+        )
+
+    def schedule(self, tasks: Sequence[Task], start: Optional[datetime] = None, deadline: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Compute start/end dates for every unfinished task
+
+        Args:
+            tasks: All tasks of one goal
+            start: Earliest moment work can begin (defaults to the current
+                hour, UTC)
+            deadline: Optional goal deadline to check the result against
+
+        Returns:
+            Dict with per-task "dates" (task id -> (start, end)), makespan,
+            finish date, deadline fit and tasks left unscheduled by cycles
+        """
+        # Start from the top of the hour so re-running within the same hour
+        # yields identical dates (and no writes)
+        start = start or datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        plan = self.calendar.plan(start)
+
+        n = len(tasks)
+        hours = [
+            task.estimated_hours if task.estimated_hours and task.estimated_hours > 0 else self.default_hours
+            for task in tasks
+        ]
+        graph = DependencyGraph(
+            ids=[str(task.id) for task in tasks],
+            titles=[task.title for task in tasks],
+            hours=hours,
+            dependencies=[[dep.task_id for dep in task.dependencies] for task in tasks]
+        )
+        order, _ = graph.topological_order()
+
+        # Longest remaining chain (including the task itself) for tie-breaks
+        done = [task.status == TaskStatus.COMPLETED for task in tasks]
+        remaining = [0.0] * n
+        for i in reversed(order):
+            tail = max((remaining[j] for j in graph.successors[i]), default=0.0)
+            remaining[i] = (0.0 if done[i] else hours[i]) + tail
+
+        def rank(i: int):
+            in_progress = tasks[i].status == TaskStatus.IN_PROGRESS
+            return (0 if in_progress else 1, PRIORITY_RANK.get(tasks[i].priority, 2), -remaining[i], i)
+
+        pending = [len(preds) for preds in graph.predecessors]
+        ready: List[tuple] = []
+        running: List[tuple] = []
+        offsets: Dict[int, tuple] = {}
+
+        # Started work is already running: it holds a slot from the origin
+        # until its pinned end (or for its full estimate once that has passed)
+        pinned: Dict[int, tuple] = {}
+        for i, task in enumerate(tasks):
+            if task.status == TaskStatus.IN_PROGRESS and task.start_date is not None and task.start_date <= start:
+                end = task.end_date if task.end_date is not None and task.end_date > start else None
+                pinned[i] = (task.start_date, end)
+                offsets[i] = (0.0, plan.offset(end) if end is not None else hours[i])
+                heapq.heappush(running, (offsets[i][1], i))
+
+        def release(i: int):
+            # Iterative so long chains of completed tasks don't recurse
+            stack = [i]
+            while stack:
+                for j in graph.successors[stack.pop()]:
+                    pending[j] -= 1
+                    if pending[j] == 0:
+                        if done[j]:
+                            stack.append(j)
+                        elif j not in pinned:
+                            heapq.heappush(ready, rank(j))
+
+        for i in range(n):
+            if pending[i] == 0 and i not in pinned:
+                if done[i]:
+                    release(i)
+                else:
+                    heapq.heappush(ready, rank(i))
+
+        now = 0.0
+        while ready or running:
+            while ready and (self.max_parallel is None or len(running) < self.max_parallel):
+                i = heapq.heappop(ready)[-1]
+                offsets[i] = (now, now + hours[i])
+                heapq.heappush(running, (now + hours[i], i))
+
+            now, i = heapq.heappop(running)
+            finished = [i]
+            while running and running[0][0] <= now:
+                finished.append(heapq.heappop(running)[1])
+            for i in finished:
+                release(i)
+
+        if deadline is not None and deadline.tzinfo is not None:
+            deadline = deadline.astimezone(timezone.utc).replace(tzinfo=None)
+        makespan = max((end for _, end in offsets.values()), default=0.0)
+        finish = plan.at(makespan, is_end=True) if offsets else None
+
+        dates = {}
+        for i, (begin, end) in offsets.items():
+            pinned_start, pinned_end = pinned.get(i, (None, None))
+            dates[graph.ids[i]] = (pinned_start or plan.at(begin), pinned_end or plan.at(end, is_end=True))
+
+        return {
+            "dates": dates,
+            "makespan_hours": makespan,
+            "finish_date": finish,
+            "fits_deadline": None if deadline is None or finish is None else finish <= deadline,
+            "unscheduled": [graph.ids[i] for i in range(n) if not done[i] and i not in offsets],
+        }
+
@@ -0,0 +1,400 @@
+"""
+In-process full-text index over goals and tasks
+
+Used by the search service when the database has no $text operator
+(mongomock in tests and offline benchmarks). Tokenizing follows the Mongo
+text index closely enough for the two to be interchangeable: lowercase
+words, English stop words dropped, light suffix stemming, field weights.
+
+Postings are kept in flat arrays (document number, weight) per term, and
+documents are grouped by goal so a goal's entries can be dropped and
+re-added when it changes. Dropped documents stay in the arrays as dead
+entries until the index compacts itself.
+"""
+from array import array
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+import asyncio
+import re
+import sys
+import time
+
+from bson import ObjectId
+
+from app.database import db_manager
+from app.models import Goal, GoalSummary, Task, TaskPriority, TaskSearchView, TaskStatus
+from app.serialization import goal_to_dict
+
+WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+QUERY_TOKEN = re.compile(r'-?"[^"]*"|\S+')
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have
+having he her here hers him his how i if in into is it its itself just me more most my no nor not of
+off on once only or other our ours out over own same she should so some such than that the their
+theirs them then there these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your yours
+""".split())
+
+# Same weights as the Mongo text indexes on Goal and Task
+FIELD_WEIGHTS = {"title": 3, "description": 1}
+
+
+@lru_cache(maxsize=100_000)
+def stem(word: str) -> str:
+    """Strip common English suffixes ("planning", "plans" and "planned" -> "plan")"""
+    if word.endswith("'s"):
+        word = word[:-2]
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith("sses"):
+        return word[:-2]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            # "planning" -> "plann" -> "plan"
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            return word
+    if word.endswith("ly") and len(word) > 5:
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Stemmed index terms of a text, stop words removed"""
+    return [stem(word) for word in WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+class ParsedQuery:
+    """
+    A search string in Mongo $search syntax
+
+    Words match any document containing one of them; "quoted phrases" must
+    all be present (approximated here as all of their words); -word
+    excludes documents containing the word.
+    """
+
+    __slots__ = ("terms", "required", "excluded")
+
+    def __init__(self, query: str):
+        self.terms: List[str] = []
+        self.required: List[List[str]] = []
+        self.excluded: Set[str] = set()
+        for token in QUERY_TOKEN.findall(query):
+            negated = token.startswith("-")
+            token = token.lstrip("-")
+            if token.startswith('"'):
+                words = tokenize(token.strip('"'))
+                if negated:
+                    self.excluded.update(words)
+                elif words:
+                    self.required.append(words)
+                    self.terms.extend(words)
+                continue
+            words = tokenize(token)
+            if negated:
+                self.excluded.update(words)
+            else:
+                self.terms.extend(words)
+        self.terms = list(dict.fromkeys(term for term in self.terms if term not in self.excluded))
+
+    @property
+    def stems(self) -> Set[str]:
+        """Terms to highlight"""
+        return set(self.terms)
+
+
+def highlight(text: str, stems: Set[str], width: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Locate query terms in a field
+
+    Args:
+        text: Field value
+        stems: Stemmed query terms
+        width: Cut the text to a snippet of about this many characters
+            around the first match (None keeps all of it)
+
+    Returns:
+        {"text": text or snippet, "matches": [[start, end], ...]} with
+        offsets into "text", or None if no term occurs
+    """
+    spans = [
+        (match.start(), match.end())
+        for match in WORD.finditer(text.lower())
+        if stem(match.group()) in stems
+    ]
+    if not spans:
+        return None
+    if width is None or len(text) <= width:
+        return {"text": text, "matches": [list(span) for span in spans]}
+
+    start = max(0, spans[0][0] - width // 4)
+    end = min(len(text), start + width)
+    # Cut at word boundaries
+    if start > 0:
+        start = text.find(" ", start) + 1 or start
+    if end < len(text):
+        cut = text.rfind(" ", start, end)
+        if cut > spans[0][1]:
+            end = cut
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(text) else ""
+    shift = len(prefix) - start
+    return {
+        "text": prefix + text[start:end] + suffix,
+        "matches": [[s + shift, e + shift] for s, e in spans if s >= start and e <= end],
+    }
+
+
+class InvertedIndex:
+    """
+    Term -> (document numbers, weights) postings for one collection
+
+    Each document carries a value (whatever the caller filters, facets
+    and renders hits from) and belongs to a group (its goal) for bulk
+    removal.
+    """
+
+    def __init__(self, weights: Dict[str, int] = FIELD_WEIGHTS):
+        self.weights = weights
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self.keys: List[Any] = []
+        self.values: List[Any] = []
+        self._alive = bytearray()
+        self._groups: Dict[Any, List[int]] = {}
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self.keys) - self._dead
+
+    def add(self, key: Any, group: Any, fields: Dict[str, str], value: Any = None):
+        """
+        Index one document
+
+        Args:
+            key: Document id, returned with search hits
+            group: Group for remove_group (the goal id)
+            fields: Field name -> text, for the fields in weights
+            value: Stored with the document, see values
+        """
+        doc = len(self.keys)
+        self.keys.append(key)
+        self.values.append(value)
+        self._alive.append(1)
+        self._groups.setdefault(group, []).append(doc)
+
+        scores: Dict[str, float] = {}
+        for field, weight in self.weights.items():
+            terms = tokenize(fields.get(field) or "")
+            if not terms:
+                continue
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            # Mongo's per-field coefficient: repeated terms count, long fields dilute
+            for term, count in counts.items():
+                scores[term] = scores.get(term, 0.0) + weight * (0.5 * count / len(terms) + 0.5)
+
+        for term, score in scores.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = (array("I"), array("d"))
+            posting[0].append(doc)
+            posting[1].append(score)
+
+    def remove_group(self, group: Any):
+        """Drop every document of a group"""
+        for doc in self._groups.pop(group, ()):
+            if self._alive[doc]:
+                self._alive[doc] = 0
+                self._dead += 1
+        if self._dead > 1000 and self._dead > len(self):
+            self._compact()
+
+    def search(self, query: ParsedQuery) -> Dict[int, float]:
+        """
+        Score the live documents matching a query
+
+        Returns:
+            Document number -> score (sum of matched term weights)
+        """
+        alive = self._alive
+        scores: Dict[int, float] = {}
+        for term in query.terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            for doc, weight in zip(*posting):
+                if alive[doc]:
+                    scores[doc] = scores.get(doc, 0.0) + weight
+
+        for words in query.required:
+            for word in words:
+                docs = self._docs(word)
+                scores = {doc: score for doc, score in scores.items() if doc in docs}
+        for word in query.excluded:
+            docs = self._docs(word)
+            if docs:
+                scores = {doc: score for doc, score in scores.items() if doc not in docs}
+        return scores
+
+    def _docs(self, term: str) -> Set[int]:
+        posting = self._postings.get(term)
+        return set(posting[0]) if posting else set()
+
+    def _compact(self):
+        """Rebuild the arrays without dead documents"""
+        renumber = array("i", [-1]) * len(self.keys)
+        keys, values = [], []
+        for doc, alive in enumerate(self._alive):
+            if alive:
+                renumber[doc] = len(keys)
+                keys.append(self.keys[doc])
+                values.append(self.values[doc])
+
+        postings = {}
+        for term, (docs, weights) in self._postings.items():
+            kept = [(renumber[doc], weight) for doc, weight in zip(docs, weights) if renumber[doc] >= 0]
+            if kept:
+                postings[term] = (array("I", (doc for doc, _ in kept)), array("d", (weight for _, weight in kept)))
+
+        self._postings = postings
+        self._groups = {
+            group: [renumber[doc] for doc in docs if renumber[doc] >= 0]
+            for group, docs in self._groups.items()
+        }
+        self.keys, self.values = keys, values
+        self._alive = bytearray(b"\x01") * len(keys)
+        self._dead = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self), "dead": self._dead, "terms": len(self._postings)}
+
+
+class IndexedTask(NamedTuple):
+    """What the index keeps per task: filter and facet fields plus the hit itself"""
+    goal_id: ObjectId
+    status: str
+    priority: str
+    start_date: Optional[datetime]
+    end_date: Optional[datetime]
+    month: Optional[str]  # start_date as "YYYY-MM"
+    title: str
+    description: str
+    estimated_hours: Optional[float]
+
+
+class SearchIndex:
+    """
+    Inverted indexes of all goals and tasks, kept in sync goal by goal
+
+    Tasks are stored as IndexedTask and goals as response dicts, so a
+    search needs no database reads. Built from the database on first
+    use. Writes call invalidate_goal()
+    (next to the read cache invalidation) and the goal is re-read before
+    the next search, so the index only sees this process's writes; it is
+    meant for single-process test and offline deployments. A new database
+    client (another event loop or test database) triggers a rebuild.
+    """
+
+    TASK_FIELDS = {field: 1 for field in TaskSearchView.model_fields if field != "id"}
+    GOAL_FIELDS = {field: 1 for field in GoalSummary.model_fields if field != "id"}
+
+    def __init__(self):
+        self.tasks = InvertedIndex()
+        self.goals = InvertedIndex()
+        self._client = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._dirty: Set[ObjectId] = set()
+        self._goal_ids: Dict[ObjectId, ObjectId] = {}
+        self._stats = {"builds": 0, "last_build_ms": None, "goal_syncs": 0}
+
+    async def ensure_ready(self):
+        """Build the index on first use and re-read goals changed since the last search"""
+        await db_manager.connect()
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._client is not db_manager.client:
+                await self._build()
+            if self._dirty:
+                await self._sync()
+
+    def invalidate_goal(self, goal_id: Any):
+        """Re-index a goal and its tasks before the next search"""
+        if self._client is not None:
+            self._dirty.add(ObjectId(str(goal_id)))
+
+    def reset(self):
+        """Empty the index and bind it to the current database client"""
+        self.tasks, self.goals = InvertedIndex(), InvertedIndex()
+        self._goal_ids = {}
+        self._dirty = set()
+        self._client = db_manager.client
+
+    async def _build(self):
+        started = time.perf_counter()
+        self.reset()
+        await self._load({})
+        self._stats["builds"] += 1
+        self._stats["last_build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    async def _sync(self):
+        goal_ids, self._dirty = list(self._dirty), set()
+        for goal_id in goal_ids:
+            self.goals.remove_group(goal_id)
+            self.tasks.remove_group(goal_id)
+        await self._load({"$in": goal_ids})
+        self._stats["goal_syncs"] += len(goal_ids)
+
+    async def _load(self, condition: Dict[str, Any]):
+        """Index the goals whose _id matches condition ({} = all) and their tasks"""
+        goal_query = {"_id": condition} if condition else {}
+        async for doc in Goal.get_motor_collection().find(goal_query, self.GOAL_FIELDS):
+            self.index_goal(doc)
+
+        task_query = {"goal_id": condition} if condition else {}
+        async for doc in Task.get_motor_collection().find(task_query, self.TASK_FIELDS).batch_size(5000):
+            self.index_task(doc)
+
+    def index_goal(self, doc: Dict[str, Any]):
+        """Add a goal document (with at least the GoalSummary fields)"""
+        goal_id = self._goal_ids.setdefault(doc["_id"], doc["_id"])
+        self.goals.add(goal_id, goal_id, doc, goal_to_dict(GoalSummary.model_validate(doc)))
+
+    def index_task(self, doc: Dict[str, Any]):
+        """Add a task document (with at least the TaskSearchView fields)"""
+        # Goal ids, enum values and months are shared between tasks
+        goal_id = self._goal_ids.setdefault(doc["goal_id"], doc["goal_id"])
+        start = doc.get("start_date")
+        self.tasks.add(doc["_id"], goal_id, doc, IndexedTask(
+            goal_id=goal_id,
+            status=TaskStatus(doc.get("status") or TaskStatus.PENDING).value,
+            priority=TaskPriority(doc.get("priority") or TaskPriority.MEDIUM).value,
+            start_date=start,
+            end_date=doc.get("end_date"),
+            month=sys.intern(start.strftime("%Y-%m")) if start else None,
+            title=doc["title"],
+            description=doc["description"],
+            estimated_hours=doc.get("estimated_hours"),
+        ))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "built": self._client is not None,
+            "pending_goals": len(self._dirty),
+            "tasks": self.tasks.stats(),
+            "goals": self.goals.stats(),
+        }
+
+
+# Create singleton instance
+search_index = SearchIndex()
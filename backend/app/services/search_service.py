@@ -0,0 +1,311 @@
+"""
+Full-text search across goals and tasks
+
+Against MongoDB one aggregation runs the $text query on the tasks text
+index, sorts by relevance and, on the first page, computes the facets
+(status, priority, goal, start month) and the total in the same $facet
+stage. Deployments without $text (mongomock) use the in-process
+SearchIndex instead; SEARCH_BACKEND=mongo|memory forces either one.
+
+Pages are keyset-paginated on (score, _id), and the page's titles and
+descriptions get highlight offsets for the matched words.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import hashlib
+import heapq
+import os
+
+from beanie import PydanticObjectId
+
+from app.database import db_manager
+from app.instrumentation import span
+from app.models import Goal, GoalSummary, Task, TaskPriority, TaskSearchView, TaskStatus
+from app.serialization import dumps, goal_to_dict
+from app.services.pagination import decode_cursor, encode_cursor, keyset_filter
+from app.services.search_index import ParsedQuery, highlight, search_index
+
+
+class SearchService:
+    """Search goals and tasks through Mongo text indexes or the in-process index"""
+
+    def __init__(self):
+        self.backend_setting = os.getenv("SEARCH_BACKEND", "auto").lower()
+        self.goal_hits = int(os.getenv("SEARCH_GOAL_HITS", "5"))
+        self.facet_limit = int(os.getenv("SEARCH_FACET_LIMIT", "10"))
+        self.snippet_chars = int(os.getenv("SEARCH_SNIPPET_CHARS", "160"))
+        self._probed = (None, None)  # (client, backend) for SEARCH_BACKEND=auto
+
+    async def backend(self) -> str:
+        """
+        "mongo" or "memory"
+
+        With SEARCH_BACKEND=auto, one $text query per database client
+        decides: mongomock raises NotImplementedError for it.
+        """
+        if self.backend_setting in ("mongo", "memory"):
+            return self.backend_setting
+
+        await db_manager.connect()
+        client, backend = self._probed
+        if client is not db_manager.client:
+            try:
+                await Task.get_motor_collection().find({"$text": {"$search": "probe"}}, {"_id": 1}).limit(1).to_list(1)
+                backend = "mongo"
+            except NotImplementedError:
+                backend = "memory"
+            self._probed = (db_manager.client, backend)
+        return backend
+
+    async def search(
+        self,
+        query: str,
+        status: Optional[List[TaskStatus]] = None,
+        priority: Optional[List[TaskPriority]] = None,
+        goal_id: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of tasks matching a query, best matches first
+
+        Args:
+            query: Words, "quoted phrases" and -excluded words (Mongo
+                $search syntax)
+            status: Only tasks with one of these statuses
+            priority: Only tasks with one of these priorities
+            goal_id: Only tasks (and goals) of this goal
+            date_from: Only tasks scheduled to end on or after this
+            date_to: Only tasks scheduled to start before this
+            limit: Page size
+            cursor: next_cursor from the previous page
+
+        Returns:
+            Dict with "tasks" (hits with score and highlights) and
+            "next_cursor"; the first page also has "goals" (the best
+            matching goals), "facets" and "total"
+
+        Raises:
+            ValueError: On an invalid goal id or a cursor from another search
+        """
+        goal_oid = None
+        if goal_id:
+            try:
+                goal_oid = PydanticObjectId(goal_id)
+            except Exception:
+                raise ValueError(f"Invalid goal id: {goal_id}")
+
+        # Cursors are only valid for the search that issued them
+        fingerprint = hashlib.sha1(dumps([
+            query, sorted(status or []), sorted(priority or []), goal_id, date_from, date_to
+        ])).hexdigest()[:12]
+        sort = f"search:{fingerprint}"
+        after = decode_cursor(cursor, sort) if cursor else None
+
+        filters = {
+            "status": {value.value for value in status} if status else None,
+            "priority": {value.value for value in priority} if priority else None,
+            "goal_id": goal_oid,
+            "date_from": date_from,
+            "date_to": date_to,
+        }
+        parsed = ParsedQuery(query)
+        backend = await self.backend()
+        with span("search.query", backend=backend):
+            if backend == "mongo":
+                page = await self._search_mongo(query, filters, limit, after)
+            else:
+                page = await self._search_memory(parsed, filters, limit, after)
+
+        stems = parsed.stems
+        hits = page["hits"]
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            next_cursor = encode_cursor(sort, hits[-1]["score"], hits[-1]["id"])
+        result = {
+            "backend": backend,
+            "tasks": [self._highlight(hit, stems) for hit in hits],
+            "next_cursor": next_cursor,
+        }
+        if after is None:
+            result["goals"] = [self._highlight(hit, stems) for hit in page["goals"]]
+            result["facets"] = await self._facet_titles(page["facets"], page.get("goal_titles"))
+            result["total"] = page["total"]
+        return result
+
+    async def _search_mongo(self, query: str, filters: Dict[str, Any], limit: int, after) -> Dict[str, Any]:
+        match: Dict[str, Any] = {"$text": {"$search": query}}
+        if filters["status"]:
+            match["status"] = {"$in": sorted(filters["status"])}
+        if filters["priority"]:
+            match["priority"] = {"$in": sorted(filters["priority"])}
+        if filters["goal_id"]:
+            match["goal_id"] = filters["goal_id"]
+        if filters["date_to"]:
+            match["start_date"] = {"$lt": filters["date_to"]}
+        if filters["date_from"]:
+            match["end_date"] = {"$gte": filters["date_from"]}
+
+        hits_pipeline = [
+            {"$sort": {"score": -1, "_id": -1}},
+            {"$limit": limit + 1},
+            {"$project": {**{field: 1 for field in TaskSearchView.model_fields if field != "id"}, "score": 1}},
+        ]
+        if after:
+            hits_pipeline.insert(0, {"$match": keyset_filter("score", True, *after)})
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": match},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+        ]
+        tasks = Task.get_motor_collection()
+
+        if after:
+            docs = await tasks.aggregate(pipeline + hits_pipeline).to_list(None)
+            return {"hits": [self._task_hit(doc) for doc in docs]}
+
+        def counts(expression) -> List[Dict[str, Any]]:
+            return [{"$group": {"_id": expression, "count": {"$sum": 1}}}]
+
+        # First page: facets and total come from the same pass as the hits
+        pipeline.append({"$facet": {
+            "hits": hits_pipeline,
+            "status": counts("$status"),
+            "priority": counts("$priority"),
+            "goal": counts("$goal_id") + [{"$sort": {"count": -1, "_id": 1}}, {"$limit": self.facet_limit}],
+            "month": counts({"$dateToString": {"format": "%Y-%m", "date": "$start_date"}}),
+            "total": [{"$count": "count"}],
+        }})
+        (faceted,) = await tasks.aggregate(pipeline).to_list(None)
+
+        goal_query: Dict[str, Any] = {"$text": {"$search": query}}
+        if filters["goal_id"]:
+            goal_query["_id"] = filters["goal_id"]
+        goals = await Goal.get_motor_collection().find(
+            goal_query,
+            {**{field: 1 for field in GoalSummary.model_fields if field != "id"}, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"})]).limit(self.goal_hits).to_list(None)
+
+        return {
+            "hits": [self._task_hit(doc) for doc in faceted["hits"]],
+            "goals": [self._goal_hit(doc) for doc in goals],
+            "facets": {
+                name: {row["_id"]: row["count"] for row in faceted[name]}
+                for name in ("status", "priority", "goal", "month")
+            },
+            "total": faceted["total"][0]["count"] if faceted["total"] else 0,
+        }
+
+    async def _search_memory(self, query: ParsedQuery, filters: Dict[str, Any], limit: int, after) -> Dict[str, Any]:
+        await search_index.ensure_ready()
+        keys, tasks = search_index.tasks.keys, search_index.tasks.values
+        statuses, priorities = filters["status"], filters["priority"]
+        goal_id, date_from, date_to = filters["goal_id"], filters["date_from"], filters["date_to"]
+
+        matches = []
+        for doc, score in search_index.tasks.search(query).items():
+            task = tasks[doc]
+            if statuses and task.status not in statuses:
+                continue
+            if priorities and task.priority not in priorities:
+                continue
+            if goal_id and task.goal_id != goal_id:
+                continue
+            if date_to and (task.start_date is None or task.start_date >= date_to):
+                continue
+            if date_from and (task.end_date is None or task.end_date < date_from):
+                continue
+            matches.append((score, keys[doc], task))
+
+        candidates = matches
+        if after:
+            value, last_id = after
+            candidates = [match for match in matches if match[0] < value or (match[0] == value and match[1] < last_id)]
+        top = heapq.nlargest(limit + 1, candidates, key=lambda match: (match[0], match[1]))
+        hits = [{**self._task_dict(key, task), "score": score} for score, key, task in top]
+        if after:
+            return {"hits": hits}
+
+        facets = {"status": {}, "priority": {}, "goal": {}, "month": {}}
+        for _, _, task in matches:
+            for name, value in (("status", task.status), ("priority", task.priority), ("goal", task.goal_id), ("month", task.month)):
+                facets[name][value] = facets[name].get(value, 0) + 1
+        facets["goal"] = dict(sorted(facets["goal"].items(), key=lambda item: (-item[1], str(item[0])))[:self.facet_limit])
+
+        goal_keys, goal_values = search_index.goals.keys, search_index.goals.values
+        ranked = heapq.nlargest(
+            self.goal_hits,
+            ((score, doc) for doc, score in search_index.goals.search(query).items() if not goal_id or goal_keys[doc] == goal_id)
+        )
+        titles = {goal["id"]: goal["title"] for goal in goal_values if goal["id"] in facets["goal"]} if facets["goal"] else {}
+
+        return {
+            "hits": hits,
+            "goals": [{**goal_values[doc], "score": score} for score, doc in ranked],
+            "facets": facets,
+            "goal_titles": titles,
+            "total": len(matches),
+        }
+
+    async def _facet_titles(self, facets: Dict[str, Dict[Any, int]], titles: Optional[Dict[Any, str]] = None) -> Dict[str, Any]:
+        """Shape raw facet counts for the response, with goal titles (looked up unless given)"""
+        goal_counts = facets["goal"]
+        if titles is None:
+            titles = {
+                goal.id: goal.title
+                for goal in await Goal.find({"_id": {"$in": list(goal_counts)}}).project(GoalSummary).to_list()
+            } if goal_counts else {}
+        return {
+            "status": {status.value: facets["status"].get(status.value, 0) for status in TaskStatus},
+            "priority": {priority.value: facets["priority"].get(priority.value, 0) for priority in TaskPriority},
+            "goal": [
+                {"goal_id": goal_id, "title": titles.get(goal_id), "count": count}
+                for goal_id, count in sorted(goal_counts.items(), key=lambda item: (-item[1], str(item[0])))
+            ],
+            # null month = unscheduled tasks
+            "month": [
+                {"month": month, "count": count}
+                for month, count in sorted(facets["month"].items(), key=lambda item: item[0] or "")
+            ],
+        }
+
+    def _task_hit(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        task = TaskSearchView.model_validate(doc)
+        return {**self._task_dict(task.id, task), "score": doc["score"]}
+
+    def _goal_hit(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        return {**goal_to_dict(GoalSummary.model_validate(doc)), "score": doc["score"]}
+
+    def _task_dict(self, task_id: Any, task: Any) -> Dict[str, Any]:
+        """Hit fields of a TaskSearchView or IndexedTask"""
+        return {
+            "id": task_id,
+            "goal_id": task.goal_id,
+            "title": task.title,
+            "description": task.description,
+            "status": task.status,
+            "priority": task.priority,
+            "estimated_hours": task.estimated_hours,
+            "start_date": task.start_date,
+            "end_date": task.end_date,
+        }
+
+    def _highlight(self, hit: Dict[str, Any], stems) -> Dict[str, Any]:
+        """Add highlight offsets for the matched words in title and description"""
+        highlights = {}
+        title = highlight(hit["title"], stems)
+        if title:
+            highlights["title"] = title
+        description = highlight(hit["description"], stems, self.snippet_chars)
+        if description:
+            highlights["description"] = description
+        return {**hit, "highlights": highlights}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend_setting": self.backend_setting, "probed": self._probed[1], "index": search_index.stats()}
+
+
+# Create singleton instance
+search_service = SearchService()
@@ -1,13 +1,117 @@
-from typing import List, Dict, Any
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Any, Optional
+from contextlib import aclosing
 from datetime import datetime
-from app.models import Goal, Task, TaskDependency, TaskPriority, TaskStatus
-from app.services.gemini_service import gemini_service
+import asyncio
+import logging
+import os
+from beanie import PydanticObjectId
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from app.database import db_manager
+from app.instrumentation import span
+from app.models import Goal, GoalProgress, GoalSummary, Task, TaskDependency, TaskPlanningView, TaskPriority, TaskStatus, TaskStatusView, TaskSummary
+from app.services.llm_provider import llm
+from app.services.breakdown_cache import breakdown_cache
+from app.services.response_parser import TaskStreamParser
+from app.services.dependency_graph import DependencyGraph, graph_cache
+from app.services.event_hub import event_hub
+from app.services.idempotency import IdempotencyClaimLostError, IdempotencyConflictError, IdempotencyKeyReuseError, idempotency_store
+from app.services.read_cache import read_cache
+from app.services.search_index import search_index
+from app.services.scheduler import PRIORITY_RANK, Scheduler
+from app.services.pagination import decode_cursor, encode_cursor, keyset_filter, keyset_sort
+from app.services.single_flight import SingleFlight
+from app.serialization import goal_to_dict, task_to_dict
+
+
+logger = logging.getLogger(__name__)
+
+
+class VersionConflictError(ValueError):
+    """Raised when a write's expected version no longer matches the document"""
 
 
 class TaskService:
     """Service for managing task generation and operations"""
     
-    async def create_goal_with_tasks(self, title: str, description: str, deadline: str = None) -> Dict[str, Any]:
+    # How many tasks GoalProgress.next_actionable keeps
+    NEXT_ACTIONABLE_LIMIT = 5
+    
+    def __init__(self):
+        # Recompute dates from dependencies on creation, and after status
+        # changes on the goal's next detail read
+        self.auto_reschedule = os.getenv("AUTO_RESCHEDULE", "true").lower() == "true"
+        # Identical breakdowns requested at the same time share one model call,
+        # and duplicate submissions of one Idempotency-Key share one creation
+        self.generation_flights = SingleFlight()
+        self.creation_flights = SingleFlight()
+    
+    async def create_goal_idempotent(self, title: str, description: str, deadline: str = None, idempotency_key: str = None) -> Dict[str, Any]:
+        """
+        Create a goal once per Idempotency-Key
+        
+        Without a key this is create_goal_with_tasks. With one, concurrent
+        duplicates in this process await the same creation, and retries
+        (from any process) get the stored goal back instead of a new one.
+        
+        Args:
+            title: Goal title
+            description: Goal description
+            deadline: Optional deadline string
+            idempotency_key: Optional client-supplied key
+            
+        Returns:
+            Dict with goal, tasks, ai_insights and whether it was replayed
+            
+        Raises:
+            IdempotencyKeyReuseError: The key was used for a different request
+            IdempotencyConflictError: The original request is still running
+        """
+        if not idempotency_key:
+            result = await self.create_goal_with_tasks(title, description, deadline)
+            return {**result, "replayed": False}
+        
+        fingerprint = idempotency_store.fingerprint(title, description, deadline)
+        return await self.creation_flights.do(
+            f"{idempotency_key}\x1f{fingerprint}",
+            lambda: self._create_goal_once(idempotency_key, fingerprint, title, description, deadline)
+        )
+    
+    async def _create_goal_once(self, key: str, fingerprint: str, title: str, description: str, deadline: str = None) -> Dict[str, Any]:
+        while True:
+            claim = await idempotency_store.acquire(key, fingerprint)
+            if claim.status == "completed":
+                return await self._replay_goal(claim)
+            
+            try:
+                result = await self.create_goal_with_tasks(
+                    title, description, deadline,
+                    before_persist=lambda: idempotency_store.renew(key, claim.owner)
+                )
+            except IdempotencyClaimLostError:
+                # Our lock ran out mid-generation and another request took
+                # the key over; nothing was written, so wait for its result
+                continue
+            except BaseException:
+                await idempotency_store.release(key, claim.owner)
+                raise
+            if await idempotency_store.complete(key, claim.owner, result["goal"].id, result["ai_insights"]):
+                return {**result, "replayed": False}
+            # Lost the claim between persisting and completing: the new
+            # owner's goal is the one the key maps to, so drop ours
+            await self._discard_goal(result["goal"].id)
+    
+    async def _replay_goal(self, record) -> Dict[str, Any]:
+        detail = await self.get_goal_with_tasks(str(record.goal_id))
+        return {**detail, "ai_insights": record.ai_insights, "replayed": True}
+    
+    async def create_goal_with_tasks(
+        self,
+        title: str,
+        description: str,
+        deadline: str = None,
+        goal_id: PydanticObjectId = None,
+        before_persist: Optional[Callable[[], Awaitable[bool]]] = None
+    ) -> Dict[str, Any]:
         """
         Create a goal and generate tasks using AI
         
@@ -15,6 +119,11 @@ class TaskService:
             title: Goal title
             description: Goal description
             deadline: Optional deadline string
+            goal_id: Optional pre-assigned goal id (background jobs reserve
+                one so a retried job can't create the goal twice)
+            before_persist: Optional check run after generation; if it
+                returns False nothing is written and
+                IdempotencyClaimLostError is raised
             
         Returns:
             Dict with goal and generated tasks
@@ -26,36 +135,221 @@ class TaskService:
             try:
                 deadline_dt = datetime.fromisoformat(deadline.replace('Z', '+00:00'))
             except Exception as e:
-                print(f"Failed to parse deadline: {e}")
+                logger.warning("Failed to parse deadline %r: %s", deadline, e)
         
-        # Create the goal in database
+        # Build the goal with a client-side id; nothing is written until the
+        # AI response is in, so a failed generation leaves no orphan goal
         goal = Goal(
+            id=goal_id or PydanticObjectId(),
             title=title,
             description=description,
             deadline=deadline_dt
         )
-        await goal.insert()
         
         # Generate tasks using Gemini AI
         try:
-            ai_response = await gemini_service.generate_task_breakdown(
-                goal_title=title,
-                goal_description=description,
-                deadline=deadline
-            )
+            cache_key = breakdown_cache.make_key(title, description, deadline_dt)
+            ai_response = await breakdown_cache.get(cache_key)
+            if ai_response is None:
+                ai_response = await self.generation_flights.do(
+                    cache_key,
+                    lambda: self._generate_breakdown(cache_key, title, description, deadline)
+                )
             
             # Update goal with total estimated hours
             if "total_estimated_hours" in ai_response:
                 goal.total_estimated_hours = ai_response["total_estimated_hours"]
-                await goal.save()
             
-            # Create tasks in database
-            tasks = await self._create_tasks_from_ai_response(
-                goal_id=str(goal.id),
+            # Build tasks with dependencies resolved in memory
+            tasks = self._build_tasks_from_ai_response(
+                goal_id=goal.id,
                 ai_response=ai_response
             )
+            self._apply_schedule(tasks, deadline_dt)
+            goal.progress = self._compute_progress(tasks)
+            
+        except Exception as e:
+            raise Exception(f"Failed to generate tasks: {str(e)}")
+        
+        if before_persist is not None and not await before_persist():
+            raise IdempotencyClaimLostError(f"Lost the claim on goal {goal.id} before it was saved")
+        
+        await self._persist_plan(goal, tasks)
+        read_cache.invalidate_goal(str(goal.id))
+        search_index.invalidate_goal(str(goal.id))
+        event_hub.publish("goals", {"type": "goal_created", "goal": goal_to_dict(goal)})
+        
+        return {
+            "goal": goal,
+            "tasks": tasks,
+            "ai_insights": {
+                "total_estimated_hours": ai_response.get("total_estimated_hours", 0),
+                "suggested_timeline": ai_response.get("suggested_timeline", "")
+            }
+        }
+    
+    async def _generate_breakdown(self, cache_key: str, title: str, description: str, deadline: str = None) -> Dict[str, Any]:
+        with span("llm.generate", provider=llm.name):
+            ai_response = await llm.provider.generate_task_breakdown(
+                goal_title=title,
+                goal_description=description,
+                deadline=deadline
+            )
+        await breakdown_cache.set(cache_key, ai_response)
+        return ai_response
+    
+    async def stream_goal_with_tasks(self, title: str, description: str, deadline: str = None, idempotency_key: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a goal creation once per Idempotency-Key
+        
+        Without a key every call creates a goal. With one, a retry gets the
+        stored goal replayed as the same event sequence, and a duplicate
+        sent while the original is running waits for it first.
+        
+        Args:
+            title: Goal title
+            description: Goal description
+            deadline: Optional deadline string
+            idempotency_key: Optional client-supplied key
+            
+        Yields:
+            Event dicts as from _stream_new_goal
+        """
+        if not idempotency_key:
+            async with aclosing(self._stream_new_goal(title, description, deadline)) as events:
+                async for event in events:
+                    yield event
+            return
+        
+        try:
+            record = await idempotency_store.acquire(
+                idempotency_key,
+                idempotency_store.fingerprint(title, description, deadline)
+            )
+        except (IdempotencyConflictError, IdempotencyKeyReuseError) as e:
+            yield {"type": "error", "detail": str(e)}
+            return
+        
+        if record.status == "completed":
+            replay = await self._replay_goal(record)
+            yield {"type": "goal", "goal": replay["goal"]}
+            for task in replay["tasks"]:
+                yield {"type": "task", "task": task}
+            yield {"type": "complete", **replay}
+            return
+        
+        completed = False
+        try:
+            async with aclosing(self._stream_new_goal(title, description, deadline)) as events:
+                async for event in events:
+                    if event["type"] == "complete":
+                        completed = await idempotency_store.complete(
+                            idempotency_key, record.owner, event["goal"].id, event["ai_insights"]
+                        )
+                        if not completed:
+                            # Another request took the key over while we
+                            # streamed; its goal wins, ours is a duplicate
+                            await self._discard_goal(event["goal"].id)
+                            yield {"type": "error", "detail": "Idempotency key was taken over by another request; retry to get its result"}
+                            return
+                    yield event
+        finally:
+            if not completed:
+                await idempotency_store.release(idempotency_key, record.owner)
+    
+    async def _stream_new_goal(self, title: str, description: str, deadline: str = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Create a goal and yield its tasks as Gemini generates them
+        
+        Each task is persisted as soon as it parses; dependencies and the
+        computed schedule are written in one bulk update once the stream
+        ends. If generation fails, or the consumer goes away (client
+        disconnect) before the "complete" event, the partial goal and tasks
+        are removed.
+        
+        Args:
+            title: Goal title
+            description: Goal description
+            deadline: Optional deadline string
+            
+        Yields:
+            Event dicts: "goal", then one "task" per task, then "complete"
+            (or "error")
+        """
+        
+        deadline_dt = self._parse_date(deadline)
+        
+        goal = Goal(title=title, description=description, deadline=deadline_dt)
+        await goal.insert()
+        
+        tasks: List[Task] = []
+        tasks_data: List[Dict[str, Any]] = []
+        completed = False
+        try:
+            yield {"type": "goal", "goal": goal}
             
-            return {
+            cache_key = breakdown_cache.make_key(title, description, deadline_dt)
+            ai_response = await breakdown_cache.get(cache_key)
+            
+            if ai_response is not None:
+                for task_data in ai_response.get("tasks", []):
+                    task = self._build_task(goal.id, task_data)
+                    await task.insert()
+                    tasks.append(task)
+                    tasks_data.append(task_data)
+                    self._publish_patch(goal.id, [task_to_dict(task)])
+                    yield {"type": "task", "task": task}
+            else:
+                parser = TaskStreamParser()
+                async for chunk in llm.provider.stream_task_breakdown(
+                    goal_title=title,
+                    goal_description=description,
+                    deadline=deadline
+                ):
+                    for task_data in parser.feed(chunk):
+                        task = self._build_task(goal.id, task_data)
+                        await task.insert()
+                        tasks.append(task)
+                        tasks_data.append(task_data)
+                        self._publish_patch(goal.id, [task_to_dict(task)])
+                        yield {"type": "task", "task": task}
+                
+                ai_response = parser.finish()
+                await breakdown_cache.set(cache_key, ai_response)
+            
+            self._resolve_dependencies(tasks, tasks_data)
+            self._apply_schedule(tasks, deadline_dt)
+            if tasks:
+                await Task.get_motor_collection().bulk_write([
+                    UpdateOne(
+                        {"_id": task.id},
+                        {
+                            "$set": {
+                                "dependencies": [dep.model_dump() for dep in task.dependencies],
+                                "start_date": task.start_date,
+                                "end_date": task.end_date
+                            },
+                            "$inc": {"version": 1}
+                        }
+                    )
+                    for task in tasks
+                ])
+            
+            if "total_estimated_hours" in ai_response:
+                goal.total_estimated_hours = ai_response["total_estimated_hours"]
+            goal.progress = self._compute_progress(tasks)
+            goal.version += 1
+            goal.updated_at = datetime.utcnow()
+            await goal.save()
+            read_cache.invalidate_goal(str(goal.id))
+            search_index.invalidate_goal(str(goal.id))
+            # Dependencies and dates were only known once the stream ended
+            self._publish_patch(goal.id, [task_to_dict(task) for task in tasks], goal.progress)
+            event_hub.publish("goals", {"type": "goal_created", "goal": goal_to_dict(goal)})
+            
+            completed = True
+            yield {
+                "type": "complete",
                 "goal": goal,
                 "tasks": tasks,
                 "ai_insights": {
@@ -65,79 +359,253 @@ class TaskService:
             }
             
         except Exception as e:
-            # If AI generation fails, delete the goal and raise error
+            yield {"type": "error", "detail": f"Failed to generate tasks: {str(e)}"}
+        finally:
+            # Also runs on GeneratorExit/CancelledError when the client
+            # disconnects; shielded so a cancelled request still cleans up
+            if not completed:
+                await asyncio.shield(self._discard_goal(goal.id))
+    
+    async def _discard_goal(self, goal_id: PydanticObjectId):
+        """Delete a partially created goal and its tasks"""
+        await Task.get_motor_collection().delete_many({"goal_id": goal_id})
+        await Goal.get_motor_collection().delete_one({"_id": goal_id})
+        graph_cache.invalidate(str(goal_id))
+        read_cache.invalidate_goal(str(goal_id))
+        search_index.invalidate_goal(str(goal_id))
+    
+    async def _persist_plan(self, goal: Goal, tasks: List[Task]):
+        """
+        Write a goal and its tasks in two round-trips
+        
+        The goal insert and the task insert_many run inside a transaction
+        when the deployment supports one, so a plan is never half-written.
+        
+        Args:
+            goal: Goal with a pre-assigned id
+            tasks: Tasks with pre-assigned ids and resolved dependencies
+        """
+        
+        if await db_manager.supports_transactions():
+            async with await db_manager.client.start_session() as session:
+                async with session.start_transaction():
+                    await goal.insert(session=session)
+                    if tasks:
+                        await Task.insert_many(tasks, session=session)
+            return
+        
+        await goal.insert()
+        try:
+            if tasks:
+                await Task.insert_many(tasks)
+        except Exception:
+            # Best-effort rollback without transactions
+            await Task.find(Task.goal_id == goal.id).delete()
             await goal.delete()
-            raise Exception(f"Failed to generate tasks: {str(e)}")
+            raise
     
-    async def _create_tasks_from_ai_response(self, goal_id: str, ai_response: Dict[str, Any]) -> List[Task]:
+    def _build_tasks_from_ai_response(self, goal_id: PydanticObjectId, ai_response: Dict[str, Any]) -> List[Task]:
         """
-        Create Task documents from AI response
+        Build Task documents from AI response without touching the database
+        
+        Ids are assigned client-side so title and index dependencies can be
+        resolved before anything is written.
         
         Args:
             goal_id: ID of the parent goal
             ai_response: Response from Gemini AI
             
         Returns:
-            List of created Task documents
+            List of unsaved Task documents
         """
         
         tasks_data = ai_response.get("tasks", [])
-        created_tasks = []
-        task_title_to_id = {}  # Map task titles to IDs for dependency resolution
-        
-        # First pass: Create all tasks without dependencies
-        for task_data in tasks_data:
-            task = Task(
-                goal_id=goal_id,
-                title=task_data.get("title", "Untitled Task"),
-                description=task_data.get("description", ""),
-                estimated_hours=task_data.get("estimated_hours"),
-                priority=self._parse_priority(task_data.get("priority", "medium")),
-                status=TaskStatus.PENDING,
-                start_date=self._parse_date(task_data.get("start_date")),
-                end_date=self._parse_date(task_data.get("end_date")),
-                dependencies=[]
-            )
+        created_tasks = [self._build_task(goal_id, task_data) for task_data in tasks_data]
+        self._resolve_dependencies(created_tasks, tasks_data)
+        return created_tasks
+    
+    def _build_task(self, goal_id: PydanticObjectId, task_data: Dict[str, Any]) -> Task:
+        """Build a single unsaved Task (without dependencies) from AI task data"""
+        return Task(
+            id=PydanticObjectId(),
+            goal_id=goal_id,
+            title=task_data.get("title", "Untitled Task"),
+            description=task_data.get("description", ""),
+            estimated_hours=task_data.get("estimated_hours"),
+            priority=self._parse_priority(task_data.get("priority", "medium")),
+            status=TaskStatus.PENDING,
+            start_date=self._parse_date(task_data.get("start_date")),
+            end_date=self._parse_date(task_data.get("end_date")),
+            dependencies=[]
+        )
+    
+    def _resolve_dependencies(self, tasks: List[Task], tasks_data: List[Dict[str, Any]]) -> List[Task]:
+        """
+        Fill in Task.dependencies from the AI's title or index references
+        
+        References to the task itself, out-of-range indices and unknown
+        titles are ignored.
+        
+        Args:
+            tasks: Tasks built from tasks_data, in the same order
+            tasks_data: Raw task dicts from the AI response
             
-            await task.insert()
-            created_tasks.append(task)
-            task_title_to_id[task.title] = str(task.id)
+        Returns:
+            The tasks whose dependencies were set
+        """
+        
+        task_title_to_id = {task.title: str(task.id) for task in tasks}
+        updated = []
         
-        # Second pass: Update dependencies
-        for i, task_data in enumerate(tasks_data):
+        for task, task_data in zip(tasks, tasks_data):
             dependencies_list = task_data.get("dependencies", [])
             
             if dependencies_list:
-                task = created_tasks[i]
                 task_dependencies = []
                 
                 for dep in dependencies_list:
                     # Dependencies can be task titles or indices
                     if isinstance(dep, str):
                         # It's a task title
-                        if dep in task_title_to_id:
+                        if dep in task_title_to_id and task_title_to_id[dep] != str(task.id):
                             task_dependencies.append(TaskDependency(
                                 task_id=task_title_to_id[dep],
                                 task_title=dep
                             ))
                     elif isinstance(dep, int):
                         # It's an index
-                        if 0 <= dep < len(created_tasks):
-                            dep_task = created_tasks[dep]
+                        if 0 <= dep < len(tasks) and tasks[dep] is not task:
+                            dep_task = tasks[dep]
                             task_dependencies.append(TaskDependency(
                                 task_id=str(dep_task.id),
                                 task_title=dep_task.title
                             ))
                 
                 task.dependencies = task_dependencies
-                await task.save()
+                updated.append(task)
         
-        return created_tasks
+        return updated
+    
+    # Sort options for list_goals: name -> (field, descending)
+    GOAL_SORTS = {
+        "newest": ("created_at", True),
+        "oldest": ("created_at", False),
+        "deadline": ("deadline", False),
+        "deadline_desc": ("deadline", True),
+    }
+    
+    async def list_goals(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        sort: str = "newest",
+        deadline_after: Optional[datetime] = None,
+        deadline_before: Optional[datetime] = None,
+        has_overdue_tasks: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        One page of goals using keyset pagination on (sort field, _id)
+        
+        Only limit + 1 goals are read per call, so memory stays constant
+        regardless of collection size. Deadline sorts only include goals
+        that have a deadline.
+        
+        Args:
+            limit: Page size
+            cursor: next_cursor from the previous page
+            sort: One of GOAL_SORTS
+            deadline_after: Only goals with deadline >= this
+            deadline_before: Only goals with deadline < this
+            has_overdue_tasks: Only goals with (True) or without (False)
+                unfinished tasks past their end_date
+            
+        Returns:
+            Dict with "goals" (GoalSummary list) and "next_cursor"
+        """
+        
+        if sort not in self.GOAL_SORTS:
+            raise ValueError(f"Invalid sort. Must be one of: {', '.join(self.GOAL_SORTS)}")
+        field, descending = self.GOAL_SORTS[sort]
+        
+        conditions = []
+        deadline_range = {}
+        if deadline_after:
+            deadline_range["$gte"] = deadline_after
+        if deadline_before:
+            deadline_range["$lt"] = deadline_before
+        if field == "deadline":
+            deadline_range["$ne"] = None
+        if deadline_range:
+            conditions.append({"deadline": deadline_range})
+        if cursor:
+            conditions.append(keyset_filter(field, descending, *decode_cursor(cursor, sort)))
+        query = {"$and": conditions} if conditions else {}
+        
+        order = keyset_sort(field, descending)
+        if has_overdue_tasks is None:
+            goals = await Goal.find(query).sort(order).limit(limit + 1).project(GoalSummary).to_list()
+        else:
+            goals = await self._filter_goals_by_overdue(query, order, limit + 1, has_overdue_tasks)
+        
+        next_cursor = None
+        if len(goals) > limit:
+            goals = goals[:limit]
+            last = goals[-1]
+            next_cursor = encode_cursor(sort, getattr(last, field), last.id)
+        
+        return {"goals": goals, "next_cursor": next_cursor}
+    
+    async def _filter_goals_by_overdue(self, query: Dict[str, Any], order, wanted: int, overdue: bool) -> List[GoalSummary]:
+        """
+        Walk goals in page order, keeping those with (or without) overdue tasks
+        
+        Goals are read in fixed-size batches and each batch is probed with
+        one distinct() over the (goal_id, status) index, so memory is bounded
+        by the batch size rather than the number of matching goals.
+        """
+        
+        batch_size = max(wanted * 2, 50)
+        now = datetime.utcnow()
+        matched: List[GoalSummary] = []
+        skip = 0
+        
+        while len(matched) < wanted:
+            batch = await Goal.find(query).sort(order).skip(skip).limit(batch_size) \
+                .project(GoalSummary).to_list()
+            if not batch:
+                break
+            skip += len(batch)
+            
+            overdue_ids = set(await Task.get_motor_collection().distinct("goal_id", {
+                "goal_id": {"$in": [goal.id for goal in batch]},
+                "status": {"$ne": TaskStatus.COMPLETED.value},
+                "end_date": {"$lt": now}
+            }))
+            matched.extend(goal for goal in batch if (goal.id in overdue_ids) == overdue)
+            
+            if len(batch) < batch_size:
+                break
+        
+        return matched[:wanted]
+    
+    async def goal_exists(self, goal_id: str) -> bool:
+        """Whether a goal with this id exists (unparseable ids don't)"""
+        try:
+            object_id = self._object_id(goal_id)
+        except ValueError:
+            return False
+        return bool(await Goal.get_motor_collection().count_documents({"_id": object_id}, limit=1))
     
     async def get_goal_with_tasks(self, goal_id: str) -> Dict[str, Any]:
         """
         Retrieve a goal with all its tasks
         
+        Goal and tasks come back from a single $lookup aggregation. Nothing
+        is written: goals written before progress rollups existed, or still
+        flagged needs_refresh (their post-write refresh didn't run), get
+        their progress filled in from the tasks already in hand for this
+        response only.
+        
         Args:
             goal_id: ID of the goal
             
@@ -145,28 +613,765 @@ class TaskService:
             Dict with goal and tasks
         """
         
-        goal = await Goal.get(goal_id)
-        if not goal:
+        docs = await Goal.aggregate([
+            {"$match": {"_id": self._object_id(goal_id)}},
+            {"$lookup": {
+                "from": Task.get_settings().name,
+                "localField": "_id",
+                "foreignField": "goal_id",
+                "as": "tasks"
+            }},
+            {"$project": {"tasks.goal_id": 0, "tasks.created_at": 0, "tasks.updated_at": 0}}
+        ]).to_list()
+        if not docs:
             raise ValueError(f"Goal not found: {goal_id}")
         
-        tasks = await Task.find(Task.goal_id == goal_id).to_list()
+        tasks = [TaskSummary.model_validate(task) for task in docs[0].pop("tasks")]
+        goal = Goal.model_validate(docs[0])
+        
+        if goal.progress is None:
+            goal.progress = self._compute_progress(tasks)
+        elif goal.needs_refresh:
+            goal.progress.next_actionable = self._next_actionable(tasks)
         
         return {
             "goal": goal,
             "tasks": tasks
         }
     
-    async def update_task_status(self, task_id: str, status: TaskStatus) -> Task:
-        """Update task status"""
-        task = await Task.get(task_id)
-        if not task:
+    async def get_goal_graph(self, goal_id: str) -> Dict[str, Any]:
+        """
+        Dependency analysis for a goal's tasks, cached per goal
+        
+        Args:
+            goal_id: ID of the goal
+            
+        Returns:
+            DependencyGraph.analyze() result
+        """
+        
+        # Same key the write paths invalidate, however the URL spelled the id
+        cache_key = str(self._object_id(goal_id))
+        cached = graph_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        goal = await Goal.get(PydanticObjectId(cache_key))
+        if not goal:
+            raise ValueError(f"Goal not found: {goal_id}")
+        
+        tasks = await Task.find(Task.goal_id == goal.id).project(TaskPlanningView).to_list()
+        analysis = DependencyGraph.from_tasks(tasks).analyze()
+        graph_cache.set(cache_key, analysis)
+        return analysis
+    
+    async def update_task_status(self, task_id: str, status: TaskStatus, expected_version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Update task status and the goal's progress rollups
+        
+        The task is changed in a single find_one_and_update that returns
+        its previous state, so concurrent updates each see the exact status
+        they replaced and none are lost; then one goal update $incs the
+        status counts, completed hours and version and flags needs_refresh.
+        next_actionable, which needs all of the goal's tasks, follows right
+        after from one read of them (see _refresh_after_status_change).
+        Task dates are not touched, so the returned task version stays
+        current; POST /goals/{id}/schedule recomputes them. Cached reads of
+        the goal are dropped.
+        
+        Args:
+            task_id: ID of the task
+            status: New status
+            expected_version: If given, only update when the task is still
+                at this version
+            
+        Returns:
+            Dict with the updated task (TaskStatusView) and the goal's
+            refreshed progress
+            
+        Raises:
+            ValueError: If the task does not exist
+            VersionConflictError: If expected_version is stale
+        """
+        try:
+            object_id = PydanticObjectId(task_id)
+        except Exception:
             raise ValueError(f"Task not found: {task_id}")
         
-        task.status = status
-        task.updated_at = datetime.utcnow()
-        await task.save()
+        query: Dict[str, Any] = {"_id": object_id}
+        if expected_version is not None:
+            query["version"] = expected_version
+        now = datetime.utcnow()
+        
+        tasks_collection = Task.get_motor_collection()
+        before = await tasks_collection.find_one_and_update(
+            query,
+            {"$set": {"status": status.value, "updated_at": now}, "$inc": {"version": 1}},
+            projection={name: 1 for name in ("goal_id", "title", "status", "estimated_hours", "version", "updated_at")},
+            return_document=ReturnDocument.BEFORE
+        )
+        if before is None:
+            if expected_version is not None and await tasks_collection.count_documents({"_id": object_id}, limit=1):
+                raise VersionConflictError(f"Task {task_id} was modified (expected version {expected_version})")
+            raise ValueError(f"Task not found: {task_id}")
+        
+        previous = TaskStatus(before["status"])
+        task = TaskStatusView.model_validate({
+            **before,
+            "status": status,
+            "version": before.get("version", 0) + 1,
+            "updated_at": now
+        })
+        graph_cache.invalidate(str(task.goal_id))
+        
+        inc: Dict[str, Any] = {"version": 1}
+        self._add_progress_inc(inc, previous, status, task.estimated_hours)
+        
+        goals = Goal.get_motor_collection()
+        goal_doc = await goals.find_one_and_update(
+            {"_id": task.goal_id, "progress": {"$type": "object"}},
+            {"$inc": inc, "$set": {"needs_refresh": True, "updated_at": task.updated_at}},
+            projection={"_id": 1}
+        )
+        if goal_doc is None:
+            # No rollups yet (the refresh backfills them); just bump the version
+            await goals.update_one(
+                {"_id": task.goal_id},
+                {"$inc": {"version": 1}, "$set": {"needs_refresh": True, "updated_at": task.updated_at}}
+            )
+        progress = await self._refresh_after_status_change(task.goal_id)
+        read_cache.invalidate_goal(str(task.goal_id))
+        search_index.invalidate_goal(str(task.goal_id))
+        
+        self._publish_patch(task.goal_id, [{
+            "id": task.id,
+            "status": task.status,
+            "version": task.version,
+            "updated_at": task.updated_at
+        }], progress)
+        
+        return {
+            "task": task,
+            "progress": progress
+        }
+    
+    async def bulk_update_status(self, changes: Dict[str, TaskStatus], cascade: bool = True) -> Dict[str, Any]:
+        """
+        Apply many status changes at once
+        
+        The affected goals' tasks are read once. Each requested change is
+        written as an update conditional on the status that was read, so a
+        task changed by someone else in between is left alone and reported
+        in "conflicts". Then, with cascade, the dependency graph is used in
+        memory, from the changes that were actually applied, to:
+        - unblock (back to pending) blocked dependents whose dependencies
+          are all completed after a prerequisite was completed
+        - block pending/in-progress dependents of a prerequisite that went
+          from completed back to unfinished
+        and those cascaded changes are written the same way in a second
+        pass. Goal rollups are $inc'ed once per goal from everything that
+        was applied, and each goal is then refreshed like in
+        update_task_status.
+        
+        Args:
+            changes: task id -> new status
+            cascade: Also update dependents as described above
+            
+        Returns:
+            Dict with "changes" (every task whose status changed, including
+            cascaded ones), "conflicts" (ids of tasks skipped because they
+            changed concurrently) and "goals" (goal id -> refreshed progress)
+        """
+        
+        ids = []
+        for task_id in changes:
+            try:
+                ids.append(PydanticObjectId(task_id))
+            except Exception:
+                raise ValueError(f"Task not found: {task_id}")
+        
+        task_collection = Task.get_motor_collection()
+        goal_ids = await task_collection.distinct("goal_id", {"_id": {"$in": ids}})
+        tasks = await Task.find({"goal_id": {"$in": goal_ids}}).project(TaskPlanningView).to_list()
+        by_id = {str(task.id): task for task in tasks}
+        missing = [task_id for task_id in changes if str(PydanticObjectId(task_id)) not in by_id]
+        if missing:
+            raise ValueError(f"Task not found: {', '.join(missing)}")
+        
+        # Apply the requested changes in memory: task id -> (previous, cascaded)
+        applied: Dict[str, tuple] = {}
+        for task_id, status in changes.items():
+            task = by_id[str(PydanticObjectId(task_id))]
+            if task.status != status:
+                applied[str(task.id)] = (task.status, False)
+                task.status = status
+        
+        now = datetime.utcnow()
+        conflicts = await self._write_status_changes(by_id, applied, now)
+        
+        # Cascade only from what was written, so a prerequisite that lost a
+        # race doesn't drag its dependents along
+        if cascade and applied:
+            explicit = set(applied)
+            self._cascade_status(tasks, applied)
+            cascaded = {task_id: change for task_id, change in applied.items() if task_id not in explicit}
+            cascade_conflicts = await self._write_status_changes(by_id, cascaded, now)
+            for task_id in cascade_conflicts:
+                del applied[task_id]
+            conflicts += cascade_conflicts
+        
+        # Rollup deltas from the writes that matched
+        incs: Dict[PydanticObjectId, Dict[str, Any]] = {}
+        for task_id, (previous, _) in applied.items():
+            task = by_id[task_id]
+            self._add_progress_inc(incs.setdefault(task.goal_id, {"version": 1}), previous, task.status, task.estimated_hours)
+        
+        goals = Goal.get_motor_collection()
+        goal_docs = await asyncio.gather(*(
+            goals.find_one_and_update(
+                {"_id": goal_id, "progress": {"$type": "object"}},
+                {"$inc": inc, "$set": {"needs_refresh": True, "updated_at": now}},
+                projection={"_id": 1}
+            )
+            for goal_id, inc in incs.items()
+        ))
+        for goal_id, goal_doc in zip(incs, goal_docs):
+            if goal_doc is None:
+                # No rollups yet (the refresh backfills them); just bump the version
+                await goals.update_one(
+                    {"_id": goal_id},
+                    {"$inc": {"version": 1}, "$set": {"needs_refresh": True, "updated_at": now}}
+                )
+        refreshed = await asyncio.gather(*(self._refresh_after_status_change(goal_id) for goal_id in incs))
+        progress_by_goal = {str(goal_id): progress for goal_id, progress in zip(incs, refreshed)}
+        
+        for goal_id, progress in progress_by_goal.items():
+            graph_cache.invalidate(goal_id)
+            read_cache.invalidate_goal(goal_id)
+            search_index.invalidate_goal(goal_id)
+            self._publish_patch(goal_id, [
+                {"id": by_id[task_id].id, "status": by_id[task_id].status, "updated_at": now}
+                for task_id in applied if str(by_id[task_id].goal_id) == goal_id
+            ], progress)
+        
+        return {
+            "changes": [
+                {
+                    "task_id": task_id,
+                    "goal_id": str(by_id[task_id].goal_id),
+                    "previous_status": previous,
+                    "status": by_id[task_id].status,
+                    "cascaded": cascaded
+                }
+                for task_id, (previous, cascaded) in applied.items()
+            ],
+            "conflicts": conflicts,
+            "goals": progress_by_goal
+        }
+    
+    async def _write_status_changes(self, by_id: Dict[str, TaskPlanningView], changes: Dict[str, tuple], now: datetime) -> List[str]:
+        """
+        Write in-memory status changes, each conditional on its previous status
+        
+        One find_one_and_update per task, run concurrently: bulk_write only
+        reports an aggregate matched_count, which can't say which tasks
+        were changed underneath us, and the rollup $incs must count exactly
+        the writes that landed. Tasks that didn't match are removed from
+        changes and have their in-memory status put back.
+        
+        Args:
+            by_id: task id -> planning view holding the new status
+            changes: task id -> (previous status, cascaded)
+            now: updated_at to stamp
+            
+        Returns:
+            Ids of the tasks that didn't match (changed concurrently)
+        """
+        task_ids = list(changes)
+        written = await asyncio.gather(*(
+            Task.get_motor_collection().find_one_and_update(
+                {"_id": by_id[task_id].id, "status": changes[task_id][0].value},
+                {"$set": {"status": by_id[task_id].status.value, "updated_at": now}, "$inc": {"version": 1}},
+                projection={"_id": 1}
+            )
+            for task_id in task_ids
+        ))
+        conflicts = [task_id for task_id, before in zip(task_ids, written) if before is None]
+        for task_id in conflicts:
+            by_id[task_id].status = changes.pop(task_id)[0]
+        return conflicts
+    
+    def _cascade_status(self, tasks: List[TaskPlanningView], applied: Dict[str, tuple]):
+        """
+        Unblock/block direct dependents of the explicitly changed tasks
+        
+        Cascaded changes only ever move tasks to pending or blocked, so they
+        never trigger further cascades. Updates tasks and applied in place.
+        """
+        graph = DependencyGraph.from_tasks(tasks)
+        completed_now, regressed = set(), set()
+        for task_id, (previous, _) in applied.items():
+            i = graph.index[task_id]
+            status = tasks[i].status
+            if status == TaskStatus.COMPLETED:
+                completed_now.add(i)
+            elif previous == TaskStatus.COMPLETED:
+                regressed.add(i)
+        
+        dependents = sorted({j for i in completed_now | regressed for j in graph.successors[i]})
+        for j in dependents:
+            task = tasks[j]
+            if str(task.id) in applied:
+                continue
+            preds = graph.predecessors[j]
+            if any(i in regressed for i in preds) and task.status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS):
+                new_status = TaskStatus.BLOCKED
+            elif task.status == TaskStatus.BLOCKED and all(tasks[i].status == TaskStatus.COMPLETED for i in preds):
+                new_status = TaskStatus.PENDING
+            else:
+                continue
+            applied[str(task.id)] = (task.status, True)
+            task.status = new_status
+    
+    def _add_progress_inc(self, inc: Dict[str, Any], previous: TaskStatus, status: TaskStatus, hours: Optional[float]):
+        """Accumulate the GoalProgress $inc for one status change into inc"""
+        if previous == status:
+            return
+        for key, delta in ((f"progress.{previous.value}", -1), (f"progress.{status.value}", 1)):
+            inc[key] = inc.get(key, 0) + delta
+        if TaskStatus.COMPLETED in (previous, status):
+            sign = 1 if status == TaskStatus.COMPLETED else -1
+            inc["progress.completed_hours"] = inc.get("progress.completed_hours", 0) + sign * (hours or 0)
+    
+    # Task fields a refinement may change, compared when diffing
+    REFINE_FIELDS = ("title", "description", "estimated_hours", "priority", "dependencies", "start_date", "end_date")
+    
+    async def refine_goal(self, goal_id: str, task_ids: List[str], instruction: str, include_dependents: bool = False) -> Dict[str, Any]:
+        """
+        Regenerate some of a goal's tasks from an instruction
+        
+        Only the selected tasks (with include_dependents, also everything
+        downstream of them) go to the model in full; their direct
+        prerequisites and dependents go as one-line context. The response
+        is diffed against the stored tasks: revised tasks keep their id and
+        status and only changed fields are written, tasks the model left
+        out are deleted and new ones inserted, all in one bulk write.
+        Dependencies that pointed at a deleted task are re-linked to the
+        refined tasks nothing else depends on, and dependency titles follow
+        renamed tasks. With auto-rescheduling, changed dates go in the same
+        bulk write.
+        
+        Args:
+            goal_id: ID of the goal
+            task_ids: Tasks to regenerate
+            instruction: What to change
+            include_dependents: Also regenerate every task downstream of them
+            
+        Returns:
+            Dict with the goal, all of its tasks afterwards, and the
+            inserted/updated/deleted task ids
+            
+        Raises:
+            ValueError: If the goal or one of the tasks does not exist
+            NotImplementedError: If the LLM provider cannot refine plans
+        """
+        
+        goal = await Goal.get(self._object_id(goal_id))
+        if not goal:
+            raise ValueError(f"Goal not found: {goal_id}")
+        
+        stored = await Task.find(Task.goal_id == goal.id).to_list()
+        original = {str(task.id): task for task in stored}
+        selected = set()
+        for task_id in task_ids:
+            try:
+                key = str(PydanticObjectId(task_id))
+            except Exception:
+                key = None
+            if key not in original:
+                raise ValueError(f"Task not found in goal {goal_id}: {task_id}")
+            selected.add(key)
+        
+        if include_dependents:
+            graph = DependencyGraph.from_tasks(stored)
+            pending = [graph.index[task_id] for task_id in selected]
+            while pending:
+                for j in graph.successors[pending.pop()]:
+                    if graph.ids[j] not in selected:
+                        selected.add(graph.ids[j])
+                        pending.append(j)
         
-        return task
+        # Short refs keep the prompt small: s<i> for refined tasks, c<i> for context
+        subgraph = [task for task in stored if str(task.id) in selected]
+        refs = {str(task.id): f"s{i}" for i, task in enumerate(subgraph)}
+        context = []
+        for task in stored:
+            task_id = str(task.id)
+            if task_id in selected:
+                continue
+            if any(dep.task_id in selected for dep in task.dependencies):
+                relation = "dependent"
+            elif any(task_id == dep.task_id for chosen in subgraph for dep in chosen.dependencies):
+                relation = "prerequisite"
+            else:
+                continue
+            refs[task_id] = f"c{len(context)}"
+            context.append({"ref": refs[task_id], "title": task.title, "relation": relation})
+        by_ref = {ref: task_id for task_id, ref in refs.items()}
+        
+        try:
+            with span("llm.refine", provider=llm.name):
+                response = await llm.provider.refine_task_breakdown(
+                    goal_title=goal.title,
+                    goal_description=goal.description,
+                    instruction=instruction,
+                    tasks=[
+                        {
+                            "ref": refs[str(task.id)],
+                            "title": task.title,
+                            "description": task.description,
+                            "estimated_hours": task.estimated_hours,
+                            "priority": task.priority.value,
+                            "dependencies": [refs[dep.task_id] for dep in task.dependencies if dep.task_id in refs]
+                        }
+                        for task in subgraph
+                    ],
+                    context=context,
+                    deadline=goal.deadline.date().isoformat() if goal.deadline else None
+                )
+        except NotImplementedError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to refine tasks: {str(e)}")
+        
+        # Work on copies so the stored versions stay available for the diff
+        final = {task_id: task.model_copy(deep=True) for task_id, task in original.items() if task_id not in selected}
+        refined: List[Task] = []
+        inserted: List[Task] = []
+        by_position: Dict[int, Task] = {}
+        for position, task_data in enumerate(response["tasks"]):
+            task_id = by_ref.get(task_data["ref"])
+            if task_data["ref"] is not None and task_id not in selected:
+                # Context tasks (c<i>) and made-up refs are not the model's to rewrite
+                logger.warning("Refine of goal %s: ignoring task with ref %r", goal.id, task_data["ref"])
+                continue
+            if task_id is not None and task_id not in final:
+                task = original[task_id].model_copy(deep=True)
+                task.title = task_data["title"]
+                task.description = task_data["description"]
+                task.estimated_hours = task_data["estimated_hours"]
+                task.priority = self._parse_priority(task_data["priority"])
+            else:
+                task = self._build_task(goal.id, task_data)
+                inserted.append(task)
+            final[str(task.id)] = task
+            refined.append(task)
+            by_position[position] = task
+        
+        for position, task in by_position.items():
+            task.dependencies = []
+            for ref in response["tasks"][position]["dependencies"]:
+                if ref.startswith("n") and ref[1:].isdigit():
+                    target = by_position.get(int(ref[1:]))
+                else:
+                    target = final.get(by_ref.get(ref))
+                if target is not None and target is not task and all(dep.task_id != str(target.id) for dep in task.dependencies):
+                    task.dependencies.append(TaskDependency(task_id=str(target.id), task_title=target.title))
+        
+        # Re-link the rest of the plan: deleted prerequisites are replaced by
+        # the refined tasks nothing else depends on, titles follow renames
+        deleted = [task_id for task_id in original if task_id in selected and task_id not in final]
+        depended_on = {dep.task_id for task in refined for dep in task.dependencies}
+        sinks = [TaskDependency(task_id=str(task.id), task_title=task.title) for task in refined if str(task.id) not in depended_on]
+        inserted_ids = {str(task.id) for task in inserted}
+        for task_id, task in final.items():
+            if task_id in selected or task_id in inserted_ids:
+                continue
+            relinked = []
+            for dep in task.dependencies:
+                if dep.task_id in selected and dep.task_id not in final:
+                    relinked.extend(sinks)
+                elif dep.task_id in final:
+                    relinked.append(TaskDependency(task_id=dep.task_id, task_title=final[dep.task_id].title))
+                else:
+                    relinked.append(dep)
+            task.dependencies = list({dep.task_id: dep for dep in relinked}.values())
+        
+        # Stored order, new tasks last
+        tasks = [final[task_id] for task_id in original if task_id in final] + inserted
+        self._apply_schedule(tasks, goal.deadline)
+        
+        now = datetime.utcnow()
+        operations = [InsertOne(task.model_dump(by_alias=True)) for task in inserted]
+        updated: Dict[str, Dict[str, Any]] = {}
+        for task in tasks:
+            before = original.get(str(task.id))
+            if before is None:
+                continue
+            changed = {field: getattr(task, field) for field in self.REFINE_FIELDS if getattr(task, field) != getattr(before, field)}
+            if not changed:
+                continue
+            task.version += 1
+            task.updated_at = now
+            updated[str(task.id)] = changed
+            operations.append(UpdateOne(
+                {"_id": task.id},
+                {
+                    "$set": {
+                        **{field: self._to_mongo(value) for field, value in changed.items()},
+                        "updated_at": now
+                    },
+                    "$inc": {"version": 1}
+                }
+            ))
+        operations.extend(DeleteOne({"_id": original[task_id].id}) for task_id in deleted)
+        
+        old_hours = sum(original[task_id].estimated_hours or 0 for task_id in selected)
+        new_hours = sum(task.estimated_hours or 0 for task in refined)
+        goal.total_estimated_hours = max(0, (goal.total_estimated_hours or old_hours) - old_hours + new_hours)
+        goal.progress = self._compute_progress(tasks)
+        goal.version += 1
+        goal.updated_at = now
+        goal_update = {
+            "$set": {
+                "total_estimated_hours": goal.total_estimated_hours,
+                "progress": goal.progress.model_dump(),
+                "updated_at": now
+            },
+            "$inc": {"version": 1}
+        }
+        
+        if await db_manager.supports_transactions():
+            async with await db_manager.client.start_session() as session:
+                async with session.start_transaction():
+                    if operations:
+                        await Task.get_motor_collection().bulk_write(operations, session=session)
+                    await Goal.get_motor_collection().update_one({"_id": goal.id}, goal_update, session=session)
+        else:
+            if operations:
+                await Task.get_motor_collection().bulk_write(operations)
+            await Goal.get_motor_collection().update_one({"_id": goal.id}, goal_update)
+        
+        graph_cache.invalidate(str(goal.id))
+        read_cache.invalidate_goal(str(goal.id))
+        search_index.invalidate_goal(str(goal.id))
+        self._publish_patch(
+            goal.id,
+            [task_to_dict(task) for task in inserted] + [{"id": task_id, **changed} for task_id, changed in updated.items()],
+            goal.progress,
+            removed=deleted
+        )
+        
+        return {
+            "goal": goal,
+            "tasks": tasks,
+            "changes": {
+                "inserted": [str(task.id) for task in inserted],
+                "updated": list(updated),
+                "deleted": deleted
+            }
+        }
+    
+    def _to_mongo(self, value: Any) -> Any:
+        """Field value as stored by a raw update"""
+        if isinstance(value, TaskPriority):
+            return value.value
+        if isinstance(value, list):
+            return [item.model_dump() for item in value]
+        return value
+    
+    async def reschedule_goal(self, goal_id: str, max_parallel: int = None) -> Dict[str, Any]:
+        """
+        Recompute start/end dates for a goal's unfinished tasks
+        
+        Only tasks whose dates actually change are written, in one bulk write.
+        Also brings next_actionable up to date (see _refresh_goal).
+        
+        Args:
+            goal_id: ID of the goal
+            max_parallel: Optional cap on concurrently scheduled tasks
+            
+        Returns:
+            Schedule summary (makespan, finish date, deadline fit, counts)
+        """
+        
+        goal = await Goal.get(self._object_id(goal_id))
+        if not goal:
+            raise ValueError(f"Goal not found: {goal_id}")
+        
+        tasks = await Task.find(Task.goal_id == goal.id).project(TaskPlanningView).to_list()
+        return await self._refresh_goal(goal, tasks, reschedule=True, max_parallel=max_parallel)
+    
+    async def _refresh_after_status_change(self, goal_id: PydanticObjectId) -> Optional[GoalProgress]:
+        """
+        Refresh a goal's next_actionable right after a status change was $inc'ed into it
+        
+        The goal and its tasks are read after the change's version bump, so
+        whichever change bumped the version last refreshes from tasks that
+        include every earlier change; refreshes that lose that race are
+        no-ops (see _refresh_goal).
+        
+        Args:
+            goal_id: Goal whose task statuses changed
+            
+        Returns:
+            The goal's progress as refreshed (None if the goal is gone)
+        """
+        goal = await Goal.get(goal_id)
+        if not goal:
+            return None
+        tasks = await Task.find(Task.goal_id == goal.id).project(TaskPlanningView).to_list()
+        await self._refresh_goal(goal, tasks, reschedule=False)
+        return goal.progress
+    
+    async def _refresh_goal(self, goal: Goal, tasks: List[Any], reschedule: bool, max_parallel: int = None) -> Optional[Dict[str, Any]]:
+        """
+        Recompute what status changes leave stale, from already-fetched tasks
+        
+        Sets progress.next_actionable (the whole rollup for goals written
+        before rollups existed) and clears needs_refresh with a write
+        conditional on the goal's version, so a status change that lands in
+        between leaves the flag set for its own refresh. With reschedule,
+        task dates are recomputed too and the goal's version is bumped if
+        any changed. goal and tasks are updated in place.
+        
+        Args:
+            goal: The goal, as read
+            tasks: All of its tasks (TaskSummary or TaskPlanningView)
+            reschedule: Also recompute task dates
+            max_parallel: Optional cap on concurrently scheduled tasks
+            
+        Returns:
+            The schedule summary with reschedule, else None
+        """
+        summary = None
+        if reschedule:
+            summary = await self._reschedule_tasks(goal.id, tasks, goal.deadline, max_parallel)
+        
+        now = datetime.utcnow()
+        next_actionable = self._next_actionable(tasks)
+        update: Dict[str, Any] = {"$set": {"needs_refresh": False}}
+        backfill = self._compute_progress(tasks) if goal.progress is None else None
+        if backfill is not None:
+            update["$set"]["progress"] = backfill.model_dump()
+        else:
+            update["$set"]["progress.next_actionable"] = [dep.model_dump() for dep in next_actionable]
+        dates_changed = bool(summary and summary["updated_tasks"])
+        if dates_changed:
+            update["$set"]["updated_at"] = now
+            update["$inc"] = {"version": 1}
+        
+        result = await Goal.get_motor_collection().update_one({"_id": goal.id, "version": goal.version}, update)
+        if result.modified_count:
+            goal.needs_refresh = False
+            if backfill is not None:
+                goal.progress = backfill
+            else:
+                goal.progress.next_actionable = next_actionable
+            if dates_changed:
+                goal.version += 1
+                goal.updated_at = now
+        if dates_changed:
+            read_cache.invalidate_goal(str(goal.id))
+            search_index.invalidate_goal(str(goal.id))
+        return summary
+    
+    async def _reschedule_tasks(self, goal_id: PydanticObjectId, tasks: List[Any], deadline: datetime = None, max_parallel: int = None) -> Dict[str, Any]:
+        """Schedule already-fetched tasks and bulk-write the dates that changed"""
+        result = Scheduler.from_env(max_parallel).schedule(tasks, deadline=deadline)
+        
+        updates = []
+        patches = []
+        for task in tasks:
+            dates = result["dates"].get(str(task.id))
+            if dates and (task.start_date, task.end_date) != dates:
+                task.start_date, task.end_date = dates
+                patches.append({"id": task.id, "start_date": task.start_date, "end_date": task.end_date})
+                updates.append(UpdateOne(
+                    {"_id": task.id},
+                    {"$set": {"start_date": task.start_date, "end_date": task.end_date}, "$inc": {"version": 1}}
+                ))
+        if updates:
+            await Task.get_motor_collection().bulk_write(updates, ordered=False)
+            self._publish_patch(goal_id, patches)
+        
+        return {
+            "makespan_hours": result["makespan_hours"],
+            "finish_date": result["finish_date"],
+            "fits_deadline": result["fits_deadline"],
+            "unscheduled": result["unscheduled"],
+            "updated_tasks": len(updates)
+        }
+    
+    def _publish_patch(self, goal_id: Any, tasks: List[Dict[str, Any]], progress: Optional[GoalProgress] = None, removed: List[str] = None):
+        """
+        Push changed task fields (and new progress) to the goal's live subscribers
+        
+        Args:
+            goal_id: Goal the tasks belong to
+            tasks: Partial task dicts, each with "id" and the fields that changed
+            progress: The goal's new rollups, if they changed
+            removed: Ids of tasks that were deleted
+        """
+        event_hub.publish(str(goal_id), {
+            "type": "patch",
+            "goal_id": goal_id,
+            "tasks": tasks,
+            "removed": removed or [],
+            "progress": progress
+        })
+    
+    def _apply_schedule(self, tasks: List[Task], deadline: datetime = None):
+        """Replace AI-suggested dates with a dependency-feasible schedule (in memory)"""
+        if not self.auto_reschedule or not tasks:
+            return
+        
+        result = Scheduler.from_env().schedule(tasks, deadline=deadline)
+        for task in tasks:
+            dates = result["dates"].get(str(task.id))
+            if dates:
+                task.start_date, task.end_date = dates
+    
+    def _compute_progress(self, tasks: List[Any]) -> GoalProgress:
+        """Full progress rollup for a goal's tasks (creation and backfill)"""
+        progress = GoalProgress(total_tasks=len(tasks), next_actionable=self._next_actionable(tasks))
+        for task in tasks:
+            setattr(progress, task.status.value, getattr(progress, task.status.value) + 1)
+            hours = task.estimated_hours or 0
+            progress.total_hours += hours
+            if task.status == TaskStatus.COMPLETED:
+                progress.completed_hours += hours
+        return progress
+    
+    def _next_actionable(self, tasks: List[Any]) -> List[TaskDependency]:
+        """
+        Unfinished, unblocked tasks whose dependencies are all completed
+        
+        In-progress work comes first, then priority, then scheduled start.
+        """
+        completed = {str(task.id) for task in tasks if task.status == TaskStatus.COMPLETED}
+        ready = [
+            (i, task) for i, task in enumerate(tasks)
+            if task.status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
+            and all(dep.task_id in completed for dep in task.dependencies)
+        ]
+        ready.sort(key=lambda item: (
+            item[1].status != TaskStatus.IN_PROGRESS,
+            PRIORITY_RANK.get(item[1].priority, 2),
+            item[1].start_date or datetime.max,
+            item[0]
+        ))
+        return [
+            TaskDependency(task_id=str(task.id), task_title=task.title)
+            for _, task in ready[:self.NEXT_ACTIONABLE_LIMIT]
+        ]
+    
+    def _object_id(self, goal_id: str) -> PydanticObjectId:
+        """Parse a goal id from a URL, treating malformed ids as not found"""
+        try:
+            return PydanticObjectId(goal_id)
+        except Exception:
+            raise ValueError(f"Goal not found: {goal_id}")
     
     def _parse_priority(self, priority_str: str) -> TaskPriority:
         """Parse priority string to enum"""
@@ -186,7 +1391,7 @@ class TaskService:
         try:
             return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
         except Exception as e:
-            print(f"Failed to parse date {date_str}: {e}")
+            logger.warning("Failed to parse date %r: %s", date_str, e)
             return None
 
 
@@ -0,0 +1,43 @@
+from typing import Any, Dict
+import os
+import time
+
+from app.database import db_manager
+from app.services.llm_provider import llm
+
+
+async def warm_up() -> Dict[str, Any]:
+    """
+    Do the first-request work ahead of time
+
+    Connects to MongoDB (client, pool and Beanie init) and builds the LLM
+    provider, which is when the Gemini SDK is imported and configured.
+    Both normally happen lazily on the first request that needs them.
+    Failures are reported, not raised, so a missing API key never stops
+    the app from starting.
+
+    Returns:
+        Milliseconds spent per step, or the error for steps that failed
+    """
+    timings: Dict[str, Any] = {}
+
+    started = time.perf_counter()
+    try:
+        await db_manager.connect()
+        timings["database_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    except Exception as e:
+        timings["database_error"] = str(e)
+
+    started = time.perf_counter()
+    try:
+        llm.provider
+        timings["llm_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    except Exception as e:
+        timings["llm_error"] = str(e)
+
+    return {"provider": llm.name, **timings}
+
+
+def warm_up_on_startup() -> bool:
+    """WARMUP_ON_STARTUP=true: run warm_up() when a long-lived server starts"""
+    return os.getenv("WARMUP_ON_STARTUP", "false").lower() == "true"
@@ -0,0 +1,39 @@
+"""
+Standalone background job worker
+
+Claims goal generation jobs queued through POST /api/jobs. Run one or more
+of these next to the API when JOB_WORKER_MODE=external (e.g. when the API
+is deployed serverless).
+
+Usage (from backend/):
+    python -m app.worker
+"""
+import asyncio
+import logging
+import signal
+
+from app.database import db_manager
+from app.services.job_queue import job_worker
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    await db_manager.connect()
+    job_worker.start()
+    logger.info("Job worker %s started (%d slots)", job_worker.owner, job_worker.concurrency)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info("Stopping job worker, waiting for jobs in flight...")
+    await job_worker.stop()
+    await db_manager.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+"""
+Cold-start benchmark: import cost and time to first response
+
+Each run starts a fresh interpreter that imports app.main, answers
+GET /health, then (against mongod or mongomock) GET /api/goals/, which is
+the first request to create the database client and initialize Beanie.
+Reported per run and as medians:
+- import_ms: `import app.main`
+- first_response_ms: import plus the first /health response
+- first_db_response_ms: the first /api/goals/ (client setup included)
+- warm_db_response_ms: the same request again
+- process_ms: interpreter spawn to exit, as seen by this script
+
+One extra interpreter runs with `python -X importtime` to attribute the
+import time to packages. The run fails if a module that must stay lazy
+(the Gemini SDK and its gRPC stack) was imported by startup, /health or a
+read-only route, or if a budget given with --max-import-ms /
+--max-first-response-ms is exceeded. Results are written as JSON tagged
+with the git commit; --compare flags regressions against an earlier file.
+
+Usage (from backend/):
+    python -m benchmarks.bench_cold_start [--runs 7] [--max-first-response-ms 1500]
+    python -m benchmarks.bench_cold_start --compare benchmarks/results/cold-start-<commit>.json --max-regression 0.2
+"""
+from datetime import datetime
+from pathlib import Path
+from statistics import median
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.support import git_commit
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Heavy modules only the live LLM provider needs
+LAZY_MODULES = ("google.generativeai", "google.ai.generativelanguage", "google.api_core", "grpc")
+
+METRICS = ("import_ms", "first_response_ms", "first_db_response_ms", "warm_db_response_ms", "process_ms")
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+import asyncio
+from httpx import ASGITransport, AsyncClient
+
+async def main():
+    async with AsyncClient(transport=ASGITransport(app=app.main.app), base_url="http://cold") as client:
+        response = await client.get("/health")
+        first = time.perf_counter()
+        assert response.status_code == 200, response.text
+
+        from benchmarks.support import use_backend
+        backend = use_backend()
+        db_started = time.perf_counter()
+        response = await client.get("/api/goals/")
+        db_first = time.perf_counter()
+        assert response.status_code == 200, response.text
+        await client.get("/api/goals/")
+        db_warm = time.perf_counter()
+
+    print(json.dumps({
+        "backend": backend,
+        "import_ms": (imported - started) * 1000,
+        "first_response_ms": (first - started) * 1000,
+        "first_db_response_ms": (db_first - db_started) * 1000,
+        "warm_db_response_ms": (db_warm - db_first) * 1000,
+        "lazy_loaded": [name for name in LAZY if name in sys.modules],
+    }))
+
+asyncio.run(main())
+"""
+
+
+def child_env() -> dict:
+    env = dict(os.environ)
+    # Sampled request logs would mix with the JSON line the child prints
+    env.setdefault("METRICS_LOG_SAMPLE_RATE", "0")
+    env.setdefault("METRICS_SLOW_REQUEST_MS", "1000000")
+    return env
+
+
+def run_once() -> dict:
+    code = f"LAZY = {LAZY_MODULES!r}\n{CHILD}"
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=child_env(),
+                               capture_output=True, text=True)
+    process_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"cold start run failed:\n{completed.stderr}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["process_ms"] = process_ms
+    return result
+
+
+def import_profile(top: int) -> list:
+    """Self import time of `import app.main` summed by top-level package"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                               cwd=BACKEND_DIR, env=child_env(), capture_output=True, text=True)
+    by_package = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        by_package[package] = by_package.get(package, 0) + int(self_us)
+    ranked = sorted(by_package.items(), key=lambda item: -item[1])
+    return [{"package": package, "self_ms": round(us / 1000, 1)} for package, us in ranked[:top]]
+
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> list:
+    """Print median deltas against an earlier results file; return regressions"""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nvs {baseline_path} (commit {baseline['meta'].get('commit')})")
+    regressions = []
+    for name in METRICS:
+        old, new = baseline["median"].get(name), results["median"][name]
+        if not old:
+            continue
+        change = new / old - 1
+        print(f"{name:<22} {old:>9.1f} -> {new:>9.1f} {change:>+5.0%}")
+        if change > max_regression:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=12, help="packages listed in the import profile")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-first-response-ms", type=float)
+    parser.add_argument("--output", help="results file (default benchmarks/results/cold-start-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    medians = {name: round(median(run[name] for run in runs), 1) for name in METRICS}
+    profile = import_profile(args.top)
+
+    meta = {
+        **git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "backend": runs[0]["backend"],
+        "python": platform.python_version(),
+        "args": vars(args),
+    }
+    results = {"meta": meta, "median": medians, "runs": runs, "import_profile": profile}
+
+    print(f"backend: {meta['backend']}, {args.runs} fresh interpreters")
+    for name in METRICS:
+        values = [run[name] for run in runs]
+        print(f"{name:<22} median {medians[name]:>8.1f} ms   min {min(values):>8.1f}   max {max(values):>8.1f}")
+    print("\nimport app.main, self time by package:")
+    for entry in profile:
+        print(f"  {entry['package']:<24} {entry['self_ms']:>7.1f} ms")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"cold-start-{meta['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"results written to {output}")
+
+    problems = []
+    loaded = sorted({name for run in runs for name in run["lazy_loaded"]})
+    if loaded:
+        problems.append(f"imported before any LLM call: {', '.join(loaded)}")
+    if args.max_import_ms and medians["import_ms"] > args.max_import_ms:
+        problems.append(f"import {medians['import_ms']} ms > {args.max_import_ms} ms")
+    if args.max_first_response_ms and medians["first_response_ms"] > args.max_first_response_ms:
+        problems.append(f"first response {medians['first_response_ms']} ms > {args.max_first_response_ms} ms")
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        if regressions:
+            problems.append(f"regressed beyond {args.max_regression:.0%}: {', '.join(regressions)}")
+    if problems:
+        print("FAILED: " + "; ".join(problems))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Dependency graph analysis on large synthetic plans
+
+Usage (from backend/):
+    python -m benchmarks.bench_dependency_graph
+"""
+import random
+import time
+
+from app.services.dependency_graph import DependencyGraph
+
+SIZES = [1_000, 10_000, 50_000, 100_000]
+MAX_DEPENDENCIES = 3
+SEED = 11
+
+
+def synthetic_plan(size: int, rng: random.Random, cycles: int = 0) -> dict:
+    """Random DAG where each task depends on up to MAX_DEPENDENCIES earlier tasks"""
+    ids = [f"t{i}" for i in range(size)]
+    dependencies = [
+        [ids[rng.randrange(i)] for _ in range(rng.randint(0, min(i, MAX_DEPENDENCIES)))] if i else []
+        for i in range(size)
+    ]
+    for _ in range(cycles):
+        # Make two tasks depend on each other
+        a, b = rng.sample(range(size), 2)
+        dependencies[a].append(ids[b])
+        dependencies[b].append(ids[a])
+    return {
+        "ids": ids,
+        "titles": [f"Task {i}" for i in range(size)],
+        "hours": [rng.randint(1, 16) for _ in range(size)],
+        "dependencies": dependencies,
+    }
+
+
+def main():
+    rng = random.Random(SEED)
+    print(f"{'tasks':>8} {'edges':>8} {'cycles':>7} {'build ms':>9} {'analyze ms':>11} {'critical len':>13}")
+    for size in SIZES:
+        for cycles in (0, 5):
+            plan = synthetic_plan(size, rng, cycles)
+            started = time.perf_counter()
+            graph = DependencyGraph(**plan)
+            built = time.perf_counter()
+            analysis = graph.analyze()
+            done = time.perf_counter()
+            edges = sum(len(preds) for preds in graph.predecessors)
+            print(
+                f"{size:>8} {edges:>8} {len(analysis['cycles']):>7} "
+                f"{(built - started) * 1000:>9.1f} {(done - built) * 1000:>11.1f} "
+                f"{len(analysis['critical_path']):>13}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Background job queue: throughput, retries, dead-lettering and leases
+
+Queues --jobs goal generations against a fake Gemini that fails a fraction
+of calls, plus one job claimed by a "crashed" worker that never finishes
+it. A JobWorker pool then drains the queue. Reports:
+- how long enqueueing takes (what POST /api/jobs costs the client) against
+  the generation latency the synchronous POST /api/goals holds open
+- succeeded / retried / dead counts
+- the peak number of concurrent generations (must not exceed --concurrency)
+- that the crashed job was picked up again once its lease ran out
+- that no goal was created twice
+
+Usage (from backend/):
+    python -m benchmarks.bench_job_queue [--jobs 40] [--concurrency 4] [--fail-rate 0.3]
+"""
+from datetime import timedelta
+import argparse
+import asyncio
+import statistics
+import sys
+
+from benchmarks.fakes import FakeGeminiModel
+from benchmarks.support import Stopwatch, use_backend
+
+from app.database import db_manager
+from app.models import GenerationJob, Goal, JobStatus, Task
+from app.services.breakdown_cache import breakdown_cache
+from app.services.gemini_service import GeminiService
+from app.services.llm_provider import llm
+from app.services.job_queue import JobQueue, JobWorker
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fail-rate", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    backend = use_backend()
+    await db_manager.connect()
+    for model in (GenerationJob, Goal, Task):
+        await model.get_motor_collection().delete_many({})
+
+    model = FakeGeminiModel(latency=args.latency, task_count=5, fail_rate=args.fail_rate, seed=3)
+    provider = GeminiService()
+    provider.model = model
+    llm.use(provider)
+    breakdown_cache.enabled = False
+
+    queue = JobQueue()
+    queue.retry_base = 0.05
+    queue.lease = timedelta(seconds=0.5)
+    worker = JobWorker(queue, concurrency=args.concurrency, poll_interval=0.05)
+
+    enqueue_ms = []
+    for i in range(args.jobs):
+        with Stopwatch() as sw:
+            await queue.enqueue(title=f"Goal {i}", description=f"Benchmark goal number {i}")
+        enqueue_ms.append(sw.ms)
+
+    crashed = await queue.claim("crashed-worker")
+
+    with Stopwatch() as total:
+        await worker.drain()
+
+    jobs = await GenerationJob.find_all().to_list()
+    by_status = {status: sum(job.status == status for job in jobs) for status in JobStatus}
+    goals = await Goal.find_all().to_list()
+    crashed = await GenerationJob.get(crashed.id)
+
+    print(f"backend: {backend}, {args.jobs} jobs, concurrency {args.concurrency}, fail rate {args.fail_rate:.0%}")
+    print(f"enqueue p50 {statistics.median(enqueue_ms):.2f} ms vs {args.latency * 1000:.0f} ms+ per synchronous generation")
+    print(f"drained in {total.ms:.0f} ms: {by_status[JobStatus.SUCCEEDED]} succeeded, "
+          f"{by_status[JobStatus.DEAD]} dead, {worker.stats['retried']} retries, {model.failures} generation failures")
+    print(f"peak concurrent generations: {model.max_in_flight}")
+    print(f"crashed job: {crashed.status.value} after {crashed.attempts} attempts")
+
+    problems = []
+    if model.max_in_flight > args.concurrency:
+        problems.append("concurrency cap exceeded")
+    if by_status[JobStatus.QUEUED] or by_status[JobStatus.RUNNING]:
+        problems.append("jobs left unfinished")
+    if len(goals) != by_status[JobStatus.SUCCEEDED] or len({goal.id for goal in goals}) != len(goals):
+        problems.append("goal count does not match succeeded jobs")
+    if crashed.attempts < 2:
+        problems.append("crashed job was not re-claimed after its lease expired")
+    if problems:
+        print("FAILED: " + "; ".join(problems))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
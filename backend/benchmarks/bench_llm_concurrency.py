@@ -0,0 +1,84 @@
+"""
+Read-path latency while many goal generations are in flight
+
+Fires 50 concurrent POST /api/goals against a fake model with multi-second
+latency and samples /health and GET /api/goals in the meantime. With the
+LLM call off the event loop, the probe latency stays at its idle baseline.
+
+Usage (from backend/):
+    python -m benchmarks.bench_llm_concurrency
+"""
+import asyncio
+import statistics
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.fakes import FakeGeminiModel
+from benchmarks.support import Stopwatch, use_backend
+
+CONCURRENT_POSTS = 50
+LLM_LATENCY = 2.0
+PROBE_INTERVAL = 0.05
+
+
+async def probe(client: AsyncClient, path: str, samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        with Stopwatch() as sw:
+            await client.get(path)
+        samples.append(sw.ms)
+        await asyncio.sleep(PROBE_INTERVAL)
+
+
+def summarize(samples: list) -> str:
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return f"n={len(samples):>4} p50={statistics.median(samples):7.2f}ms p99={p99:7.2f}ms"
+
+
+async def sample_paths(client: AsyncClient, seconds: float) -> dict:
+    stop = asyncio.Event()
+    samples = {"/health": [], "/api/goals/": []}
+    probes = [asyncio.create_task(probe(client, path, samples[path], stop)) for path in samples]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*probes)
+    return samples
+
+
+async def main():
+    use_backend()
+
+    from app.main import app
+    from app.services.gemini_service import GeminiService
+    from app.services.llm_provider import llm
+
+    provider = GeminiService()
+    provider.model = FakeGeminiModel(latency=LLM_LATENCY)
+    llm.use(provider)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        idle = await sample_paths(client, 1.0)
+
+        # Distinct titles: identical requests would share one generation
+        posts = [
+            asyncio.create_task(client.post("/api/goals/", json={
+                "title": f"Learn React in 2 weeks ({i})",
+                "description": "Hooks, routing, testing"
+            }))
+            for i in range(CONCURRENT_POSTS)
+        ]
+        await asyncio.sleep(0.1)
+        loaded = await sample_paths(client, LLM_LATENCY * 2)
+
+        with Stopwatch() as sw:
+            responses = await asyncio.gather(*posts)
+
+    ok = sum(1 for r in responses if r.status_code == 200)
+    print(f"{ok}/{CONCURRENT_POSTS} goal creations succeeded, last finished {sw.ms:.0f}ms after sampling")
+    for path in idle:
+        print(f"{path:<12} idle   {summarize(idle[path])}")
+        print(f"{path:<12} loaded {summarize(loaded[path])}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,287 @@
+"""
+End-to-end load benchmark of the FastAPI app
+
+Drives app.main.app through httpx (in-process ASGI transport, or a local
+uvicorn server with --transport uvicorn) against mongod or mongomock, with
+the deterministic stub LLM provider. Scenarios:
+- goal_create: POST /api/goals/ with distinct goals (stub LLM latency
+  --llm-latency)
+- goal_list: GET /api/goals/ paging through --goals seeded goals with
+  every sort order
+- goal_detail: GET /api/goals/{id} for a goal with --detail-tasks tasks,
+  read cache off
+- goal_detail_cached: the same with the read cache on
+- status_storm: PATCH /api/tasks/{id}/status with random statuses over
+  the tasks of one goal
+
+Each scenario runs --requests requests from --concurrency closed-loop
+clients and reports throughput, p50/p95/p99 latency, errors and DB
+commands per request. Results are written as JSON (tagged with the git
+commit) so runs can be compared: pass an earlier file with --compare and
+--max-regression to fail on slowdowns.
+
+Usage (from backend/):
+    python -m benchmarks.bench_load [--requests 300] [--concurrency 16] [--scenarios goal_list,status_storm]
+    python -m benchmarks.bench_load --compare benchmarks/results/load-<commit>.json --max-regression 0.2
+"""
+from datetime import datetime
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import platform
+import random
+import socket
+import sys
+import time
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.support import git_commit, op_counter, simulate_latency, use_backend
+
+SCENARIOS = ("goal_create", "goal_list", "goal_detail", "goal_detail_cached", "status_storm")
+RESULTS_DIR = Path(__file__).parent / "results"
+SEED = 20
+
+
+def percentile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def seed(goals: int, detail_tasks: int, storm_tasks: int) -> dict:
+    from beanie import PydanticObjectId
+
+    from app.models import Goal, Task, TaskDependency
+    from app.services.task_service import task_service
+
+    await Goal.get_motor_collection().delete_many({})
+    await Task.get_motor_collection().delete_many({})
+
+    rng = random.Random(SEED)
+
+    async def goal_with_tasks(title: str, count: int) -> tuple:
+        goal = Goal(id=PydanticObjectId(), title=title, description="Load benchmark goal")
+        tasks = []
+        for i in range(count):
+            deps = rng.sample(tasks[-5:], min(len(tasks[-5:]), rng.randint(0, 2)))
+            tasks.append(Task(
+                id=PydanticObjectId(), goal_id=goal.id, title=f"{title} task {i}",
+                description="Synthetic task " * 5, estimated_hours=rng.choice((1, 2, 4, 8)),
+                dependencies=[TaskDependency(task_id=str(dep.id), task_title=dep.title) for dep in deps]
+            ))
+        goal.progress = task_service._compute_progress(tasks)
+        await goal.insert()
+        if tasks:
+            await Task.insert_many(tasks)
+        return goal, tasks
+
+    detail_goal, _ = await goal_with_tasks("Large goal", detail_tasks)
+    _, storm_tasks = await goal_with_tasks("Storm goal", storm_tasks)
+
+    empty_progress = task_service._compute_progress([]).model_dump()
+    now = datetime.utcnow()
+    await Goal.get_motor_collection().insert_many([
+        {"title": f"Listed goal {i}", "description": "Load benchmark goal", "status": "active",
+         "total_estimated_hours": 0, "progress": empty_progress, "version": 0,
+         "deadline": now.replace(day=1, month=1 + i % 12), "created_at": now, "updated_at": now}
+        for i in range(goals)
+    ])
+    return {"detail_goal_id": str(detail_goal.id), "storm_task_ids": [str(task.id) for task in storm_tasks]}
+
+
+def make_requests(scenario: str, fixtures: dict):
+    """Return an async callable issuing the scenario's next request"""
+    rng = random.Random(SEED)
+    counter = iter(range(10 ** 9))
+    pages = {"cursor": None}
+
+    async def goal_create(client):
+        i = next(counter)
+        return await client.post("/api/goals/", json={
+            "title": f"Load goal {i} {rng.random():.6f}",
+            "description": "Plan generated during the load benchmark"
+        })
+
+    async def goal_list(client):
+        sort = rng.choice(("newest", "oldest", "deadline", "deadline_desc"))
+        params = {"limit": 20, "sort": sort}
+        if pages["cursor"] and pages["sort"] == sort:
+            params["cursor"] = pages["cursor"]
+        response = await client.get("/api/goals/", params=params)
+        if response.status_code == 200:
+            pages.update(cursor=response.json().get("next_cursor"), sort=sort)
+        return response
+
+    async def goal_detail(client):
+        return await client.get(f"/api/goals/{fixtures['detail_goal_id']}")
+
+    async def status_storm(client):
+        return await client.patch(
+            f"/api/tasks/{rng.choice(fixtures['storm_task_ids'])}/status",
+            json={"status": rng.choice(("pending", "in_progress", "completed", "blocked"))}
+        )
+
+    return {
+        "goal_create": goal_create,
+        "goal_list": goal_list,
+        "goal_detail": goal_detail,
+        "goal_detail_cached": goal_detail,
+        "status_storm": status_storm,
+    }[scenario]
+
+
+async def run_scenario(client: AsyncClient, scenario: str, fixtures: dict, requests: int, concurrency: int) -> dict:
+    from app.services.read_cache import read_cache
+
+    read_cache.clear()
+    read_cache.enabled = scenario == "goal_detail_cached"
+    request = make_requests(scenario, fixtures)
+    latencies = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await request(client)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append((time.perf_counter() - started) * 1000)
+            errors += failed
+
+    op_counter.reset()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2),
+        "db_ops_per_request": round(op_counter.total / requests, 2),
+    }
+
+
+async def uvicorn_client(app) -> tuple:
+    """Serve app on a free local port; returns (client, server task, server)"""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=None), task, server
+
+
+def compare(results: dict, baseline_path: str, max_regression: float) -> list:
+    """Print deltas against an earlier results file; return regressions"""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nvs {baseline_path} (commit {baseline['meta'].get('commit')})")
+    print(f"{'scenario':<20} {'rps':>18} {'p95 ms':>22}")
+    regressions = []
+    for name, result in results["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            continue
+        rps_change = result["throughput_rps"] / old["throughput_rps"] - 1
+        p95_change = result["p95_ms"] / old["p95_ms"] - 1 if old["p95_ms"] else 0
+        print(f"{name:<20} {old['throughput_rps']:>7.1f} -> {result['throughput_rps']:>7.1f} {rps_change:>+5.0%}"
+              f" {old['p95_ms']:>8.2f} -> {result['p95_ms']:>8.2f} {p95_change:>+5.0%}")
+        if rps_change < -max_regression or p95_change > max_regression:
+            regressions.append(name)
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--goals", type=int, default=2000, help="goals seeded for goal_list")
+    parser.add_argument("--detail-tasks", type=int, default=500)
+    parser.add_argument("--storm-tasks", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--rtt-ms", type=float, default=0.0, help="simulated DB round-trip (mongomock only)")
+    parser.add_argument("--output", help="results file (default benchmarks/results/load-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    backend = use_backend()
+    simulate_latency(args.rtt_ms)
+
+    from app.database import db_manager
+    from app.main import app
+    from app.services.breakdown_cache import breakdown_cache
+    from app.services.llm_provider import StubProvider, llm
+
+    llm.use(StubProvider(latency=args.llm_latency))
+    breakdown_cache.enabled = False
+    await db_manager.connect()
+    fixtures = await seed(args.goals, args.detail_tasks, args.storm_tasks)
+
+    if args.transport == "uvicorn":
+        client, server_task, server = await uvicorn_client(app)
+    else:
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench", timeout=None)
+
+    meta = {
+        **git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "backend": backend,
+        "transport": args.transport,
+        "python": platform.python_version(),
+        "args": vars(args),
+    }
+    results = {"meta": meta, "scenarios": {}}
+
+    print(f"backend: {backend}, transport: {args.transport}, {args.requests} requests x {args.concurrency} clients")
+    print(f"{'scenario':<20} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6} {'db ops/req':>10}")
+    try:
+        async with client:
+            for name in scenarios:
+                result = await run_scenario(client, name, fixtures, args.requests, args.concurrency)
+                results["scenarios"][name] = result
+                print(f"{name:<20} {result['throughput_rps']:>8.1f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                      f"{result['p99_ms']:>8.2f} {result['errors']:>6} {result['db_ops_per_request']:>10.2f}")
+    finally:
+        if args.transport == "uvicorn":
+            server.should_exit = True
+            await server_task
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load-{meta['commit'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"results written to {output}")
+
+    problems = [f"errors in {name}" for name, result in results["scenarios"].items() if result["errors"]]
+    if args.compare:
+        regressions = compare(results, args.compare, args.max_regression)
+        if regressions:
+            problems.append(f"regressed beyond {args.max_regression:.0%}: {', '.join(regressions)}")
+    if problems:
+        print("FAILED: " + "; ".join(problems))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Round-trips and wall time for persisting an AI-generated plan
+
+Compares the previous per-task insert()/save() loop against the batched
+TaskService path (client-side ids + insert_many).
+
+Usage (from backend/):
+    python -m benchmarks.bench_plan_persistence
+    MONGODB_URL=mongodb://localhost:27017 python -m benchmarks.bench_plan_persistence
+"""
+import asyncio
+
+from beanie import PydanticObjectId
+
+from benchmarks.support import Stopwatch, op_counter, use_backend
+
+from app.database import db_manager
+from app.models import Goal, Task, TaskDependency
+from app.services.task_service import task_service
+
+PLAN_SIZES = [5, 15, 50, 200]
+REPEATS = 5
+
+
+def make_ai_response(size: int) -> dict:
+    """Synthetic plan where every task after the first depends on its predecessor"""
+    return {
+        "tasks": [
+            {
+                "title": f"Task {i}",
+                "description": f"Description for task {i}",
+                "estimated_hours": 4,
+                "priority": "medium",
+                "dependencies": [f"Task {i - 1}"] if i else [],
+                "start_date": "2025-10-16",
+                "end_date": "2025-10-18",
+            }
+            for i in range(size)
+        ],
+        "total_estimated_hours": size * 4,
+    }
+
+
+async def legacy_persist(ai_response: dict):
+    """The pre-batching write pattern: one insert per task, one save per dependent task"""
+    goal = Goal(title="bench", description="bench")
+    await goal.insert()
+    goal.total_estimated_hours = ai_response["total_estimated_hours"]
+    await goal.save()
+
+    tasks = []
+    title_to_id = {}
+    for data in ai_response["tasks"]:
+        task = Task(goal_id=goal.id, title=data["title"], description=data["description"])
+        await task.insert()
+        tasks.append(task)
+        title_to_id[task.title] = str(task.id)
+
+    for task, data in zip(tasks, ai_response["tasks"]):
+        if data["dependencies"]:
+            task.dependencies = [
+                TaskDependency(task_id=title_to_id[dep], task_title=dep)
+                for dep in data["dependencies"]
+            ]
+            await task.save()
+
+
+async def batched_persist(ai_response: dict):
+    goal = Goal(id=PydanticObjectId(), title="bench", description="bench")
+    goal.total_estimated_hours = ai_response["total_estimated_hours"]
+    tasks = task_service._build_tasks_from_ai_response(goal.id, ai_response)
+    await task_service._persist_plan(goal, tasks)
+
+
+async def measure(fn, ai_response: dict):
+    ops, wall = [], []
+    for _ in range(REPEATS):
+        op_counter.reset()
+        with Stopwatch() as sw:
+            await fn(ai_response)
+        ops.append(op_counter.total)
+        wall.append(sw.ms)
+    return ops[-1], sum(wall) / len(wall)
+
+
+async def main():
+    backend = use_backend()
+    await db_manager.connect()
+    print(f"backend: {backend}, transactions: {await db_manager.supports_transactions()}")
+    print(f"{'tasks':>6} {'legacy ops':>11} {'legacy ms':>10} {'batched ops':>12} {'batched ms':>11}")
+
+    for size in PLAN_SIZES:
+        ai_response = make_ai_response(size)
+        legacy_ops, legacy_ms = await measure(legacy_persist, ai_response)
+        batched_ops, batched_ms = await measure(batched_persist, ai_response)
+        print(f"{size:>6} {legacy_ops:>11} {legacy_ms:>10.2f} {batched_ops:>12} {batched_ms:>11.2f}")
+
+    await db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Prompt and response size: verbose format vs the compact schema
+
+Replays the recorded Gemini breakdowns in data/recorded_breakdowns.jsonl.
+Each one is rewritten into the compact format (short keys, index
+dependencies, day offsets, no indentation) with the same titles,
+descriptions and estimates, so the difference is purely the format.
+Reports estimated input/output tokens per plan, the generation time that
+output length implies at --tokens-per-second, and the cost of 1000 plans.
+
+It also parses both versions with parse_task_breakdown and checks that the
+compact one expands to the same tasks: titles, hours, priorities,
+dependencies and dates.
+
+Token counts come from benchmarks.support.estimate_tokens (no network).
+
+Usage (from backend/):
+    python -m benchmarks.bench_prompt_tokens [--tokens-per-second 200]
+"""
+from datetime import date
+from pathlib import Path
+import argparse
+import json
+import sys
+
+from benchmarks.support import estimate_tokens
+
+from app.services.prompt_schema import build_compact_prompt, build_verbose_prompt
+from app.services.response_parser import parse_task_breakdown
+
+CORPUS = Path(__file__).parent / "data" / "recorded_breakdowns.jsonl"
+INPUT_USD_PER_MTOK = 0.30
+OUTPUT_USD_PER_MTOK = 2.50
+
+
+def to_compact(response: dict, recorded_on: date) -> str:
+    """Rewrite a verbose breakdown the way the compact schema returns it"""
+    index = {task["title"]: i for i, task in enumerate(response["tasks"])}
+
+    def offset(value: str) -> int:
+        return (date.fromisoformat(value) - recorded_on).days
+
+    return json.dumps({
+        "tasks": [
+            {
+                "t": task["title"],
+                "d": task["description"],
+                "h": task["estimated_hours"],
+                "p": task["priority"],
+                "dep": [index[dep] for dep in task["dependencies"]],
+                "s": offset(task["start_date"]),
+                "e": offset(task["end_date"]),
+            }
+            for task in response["tasks"]
+        ],
+        "h": response["total_estimated_hours"],
+        "tl": response["suggested_timeline"],
+    }, separators=(",", ":"))
+
+
+def normalized(result: dict, anchor: date) -> list:
+    """Comparable view of parsed tasks: dependencies by title, dates as offsets"""
+    titles = [task["title"] for task in result["tasks"]]
+    return [
+        (
+            task["title"],
+            task["description"],
+            task["estimated_hours"],
+            task["priority"],
+            sorted(titles[dep] if isinstance(dep, int) else dep for dep in task["dependencies"]),
+            (date.fromisoformat(task["start_date"]) - anchor).days,
+            (date.fromisoformat(task["end_date"]) - anchor).days,
+        )
+        for task in result["tasks"]
+    ] + [result["total_estimated_hours"], result.get("suggested_timeline")]
+
+
+def cost(input_tokens: float, output_tokens: float) -> float:
+    return (input_tokens * INPUT_USD_PER_MTOK + output_tokens * OUTPUT_USD_PER_MTOK) / 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    args = parser.parse_args()
+
+    records = [json.loads(line) for line in CORPUS.read_text().splitlines() if line.strip()]
+    totals = {"verbose": [0, 0], "compact": [0, 0]}
+    mismatches = []
+
+    print(f"{'plan':<12} {'format':<8} {'in tok':>7} {'out tok':>8} {'out chars':>9} {'gen s':>6}")
+    for record in records:
+        recorded_on = date.fromisoformat(record["recorded_on"])
+        goal = record["goal"]
+        verbose_text = record["text"]
+        verbose = parse_task_breakdown(verbose_text)
+        compact_text = to_compact(verbose, recorded_on)
+
+        prompts = {
+            "verbose": build_verbose_prompt(goal["title"], goal["description"], goal.get("deadline")),
+            "compact": build_compact_prompt(goal["title"], goal["description"], goal.get("deadline"), today=recorded_on),
+        }
+        outputs = {"verbose": verbose_text, "compact": compact_text}
+        for name in ("verbose", "compact"):
+            input_tokens = estimate_tokens(prompts[name])
+            output_tokens = estimate_tokens(outputs[name])
+            totals[name][0] += input_tokens
+            totals[name][1] += output_tokens
+            print(f"{record['name']:<12} {name:<8} {input_tokens:>7} {output_tokens:>8} "
+                  f"{len(outputs[name]):>9} {output_tokens / args.tokens_per_second:>6.1f}")
+
+        # Compact offsets count from the day of parsing
+        if normalized(parse_task_breakdown(compact_text), date.today()) != normalized(verbose, recorded_on):
+            mismatches.append(record["name"])
+
+    n = len(records)
+    (v_in, v_out), (c_in, c_out) = totals["verbose"], totals["compact"]
+    print()
+    print(f"mean per plan: input {v_in / n:.0f} -> {c_in / n:.0f} tokens ({1 - c_in / v_in:.0%} fewer), "
+          f"output {v_out / n:.0f} -> {c_out / n:.0f} tokens ({1 - c_out / v_out:.0%} fewer)")
+    print(f"generation time at {args.tokens_per_second:.0f} tok/s: "
+          f"{v_out / n / args.tokens_per_second:.1f}s -> {c_out / n / args.tokens_per_second:.1f}s per plan")
+    print(f"cost per 1000 plans: ${cost(v_in, v_out) / n * 1000:.2f} -> ${cost(c_in, c_out) / n * 1000:.2f}")
+
+    if mismatches:
+        print("FAILED: compact responses did not expand to the same tasks: " + ", ".join(mismatches))
+        sys.exit(1)
+    print(f"compact responses expand to identical tasks for all {n} plans")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Goal list / goal detail query latency and index usage at scale
+
+Seeds --tasks tasks spread over --goals goals, then times the list and
+detail queries with and without projections. Against a real mongod it
+also runs explain() and fails if a hot query falls back to COLLSCAN.
+mongomock has no query planner, so there only timings are reported (and
+the default size is smaller).
+
+Usage (from backend/):
+    MONGODB_URL=mongodb://localhost:27017 DATABASE_NAME=bench python -m benchmarks.bench_queries --tasks 1000000
+    python -m benchmarks.bench_queries
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+
+from bson import ObjectId
+
+from benchmarks.support import Stopwatch, use_backend
+
+from app.database import db_manager
+from app.models import Goal, GoalSummary, Task, TaskStatus, TaskSummary
+
+SAMPLES = 50
+BATCH_SIZE = 10_000
+
+
+async def seed(db, goals: int, tasks: int):
+    await db["goals"].delete_many({})
+    await db["tasks"].delete_many({})
+
+    now = datetime.utcnow()
+    goal_ids = [ObjectId() for _ in range(goals)]
+    await db["goals"].insert_many([
+        {"_id": goal_id, "title": f"Goal {i}", "description": "Synthetic goal " * 10,
+         "created_at": now - timedelta(minutes=i), "updated_at": now}
+        for i, goal_id in enumerate(goal_ids)
+    ])
+
+    statuses = [status.value for status in TaskStatus]
+    for offset in range(0, tasks, BATCH_SIZE):
+        await db["tasks"].insert_many([
+            {"goal_id": goal_ids[i % goals], "title": f"Task {i}", "description": "Synthetic task " * 20,
+             "status": random.choice(statuses), "priority": "medium", "estimated_hours": 4,
+             "dependencies": [], "created_at": now, "updated_at": now}
+            for i in range(offset, min(offset + BATCH_SIZE, tasks))
+        ])
+    return goal_ids
+
+
+async def time_query(make_query) -> str:
+    samples = []
+    for _ in range(SAMPLES):
+        with Stopwatch() as sw:
+            await make_query()
+        samples.append(sw.ms)
+    samples.sort()
+    return f"p50={statistics.median(samples):8.2f}ms p95={samples[int(len(samples) * 0.95)]:8.2f}ms"
+
+
+def winning_stage(plan: dict) -> str:
+    stage = plan["queryPlanner"]["winningPlan"]
+    stages = []
+    while stage:
+        stages.append(stage.get("stage", "?"))
+        stage = stage.get("inputStage") or stage.get("queryPlan")
+    return " <- ".join(stages)
+
+
+async def check_plans(db, goal_id) -> bool:
+    """explain() the hot queries; returns False if any scans the collection"""
+    queries = {
+        "tasks by goal": (db["tasks"], {"goal_id": goal_id}, None),
+        "tasks by goal+status": (db["tasks"], {"goal_id": goal_id, "status": "pending"}, None),
+        "goals newest first": (db["goals"], {}, [("created_at", -1)]),
+    }
+    ok = True
+    for name, (collection, query, sort) in queries.items():
+        cursor = collection.find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = winning_stage(await cursor.explain())
+        if "COLLSCAN" in stages:
+            ok = False
+        print(f"  explain {name:<22} {stages}")
+    return ok
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int)
+    parser.add_argument("--goals", type=int, default=10_000)
+    args = parser.parse_args()
+
+    backend = use_backend()
+    tasks = args.tasks or (1_000_000 if backend == "mongod" else 50_000)
+    goals = min(args.goals, tasks)
+    db = await db_manager.connect()
+
+    print(f"backend: {backend}, seeding {tasks} tasks over {goals} goals")
+    # delete_many in seed() keeps the indexes Beanie created on connect
+    goal_ids = await seed(db, goals, tasks)
+
+    goal_id = random.choice(goal_ids)
+    print("goal detail, full documents  ", await time_query(lambda: Task.find(Task.goal_id == goal_id).to_list()))
+    print("goal detail, TaskSummary     ", await time_query(
+        lambda: Task.find(Task.goal_id == goal_id).project(TaskSummary).to_list()))
+    print("goal list, full documents    ", await time_query(lambda: Goal.find_all().to_list()))
+    print("goal list, GoalSummary       ", await time_query(
+        lambda: Goal.find_all().sort(-Goal.created_at).project(GoalSummary).to_list()))
+
+    ok = True
+    if backend == "mongod":
+        ok = await check_plans(db, goal_id)
+
+    await db_manager.close()
+    if not ok:
+        print("COLLSCAN found in a hot query plan")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Plan edits: refining one task vs regenerating the whole plan
+
+Before /refine, the only way to change a plan was to create it again:
+one LLM call for every task and every task document written anew. For
+--goals plans of --tasks tasks (stub LLM provider, offline) this compares
+that against TaskService.refine_goal on one task in the middle of the
+plan:
+- estimated input and output tokens (benchmarks.support.estimate_tokens)
+- wall time, with the stub's latency scaled by output size
+- database commands and task documents written
+
+After every refinement it checks that no dependency points at a task
+that no longer exists and that the plan is still acyclic.
+
+Usage (from backend/):
+    python -m benchmarks.bench_refine [--goals 5] [--tasks 20] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+
+from benchmarks.support import Stopwatch, estimate_tokens, op_counter, use_backend
+
+from app.database import db_manager
+from app.models import Task
+from app.services.dependency_graph import DependencyGraph
+from app.services.llm_provider import StubProvider, llm
+from app.services.prompt_schema import build_compact_prompt, build_refine_prompt
+from app.services.task_service import task_service
+
+SEED = 5
+INSTRUCTION = "Split this into smaller, separately reviewable steps"
+
+
+class MeasuredStub(StubProvider):
+    """Stub provider that keeps the token estimates of its last call"""
+
+    async def generate_task_breakdown(self, goal_title, goal_description, deadline=None):
+        self.tokens = (
+            estimate_tokens(build_compact_prompt(goal_title, goal_description, deadline)),
+            estimate_tokens(self.render(goal_title, goal_description, deadline))
+        )
+        return await super().generate_task_breakdown(goal_title, goal_description, deadline)
+
+    async def refine_task_breakdown(self, goal_title, goal_description, instruction, tasks, context, deadline=None):
+        self.tokens = (
+            estimate_tokens(build_refine_prompt(goal_title, goal_description, instruction, tasks, context, deadline)),
+            estimate_tokens(self.render_refinement(instruction, tasks))
+        )
+        return await super().refine_task_breakdown(goal_title, goal_description, instruction, tasks, context, deadline)
+
+
+async def check_plan(goal_id: str):
+    tasks = await Task.find(Task.goal_id == task_service._object_id(goal_id)).to_list()
+    analysis = DependencyGraph.from_tasks(tasks).analyze()
+    if analysis["dangling_dependencies"]:
+        raise AssertionError(f"goal {goal_id}: dangling dependencies {analysis['dangling_dependencies']}")
+    if not analysis["is_acyclic"]:
+        raise AssertionError(f"goal {goal_id}: refinement introduced a cycle")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--goals", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub seconds for a full plan")
+    args = parser.parse_args()
+
+    backend = use_backend()
+    await db_manager.connect()
+    stub = MeasuredStub(latency=args.latency, task_count=args.tasks)
+    llm.use(stub)
+    rng = random.Random(SEED)
+
+    rows = {"regenerate": [], "refine": []}
+    for i in range(args.goals):
+        op_counter.reset()
+        with Stopwatch() as sw:
+            result = await task_service.create_goal_with_tasks(f"Refine benchmark {i}", "Plan to edit afterwards")
+        rows["regenerate"].append((*stub.tokens, sw.ms, op_counter.total, len(result["tasks"])))
+
+        goal_id = str(result["goal"].id)
+        task = result["tasks"][rng.randrange(len(result["tasks"]) // 4, len(result["tasks"]) * 3 // 4)]
+        op_counter.reset()
+        with Stopwatch() as sw:
+            refined = await task_service.refine_goal(goal_id, [str(task.id)], INSTRUCTION)
+        rows["refine"].append((*stub.tokens, sw.ms, op_counter.total, sum(len(ids) for ids in refined["changes"].values())))
+        await check_plan(goal_id)
+
+    print(f"backend: {backend}, {args.goals} plans of {args.tasks} tasks, stub latency {args.latency}s per plan (medians)")
+    print(f"{'path':<11} {'in tokens':>9} {'out tokens':>10} {'ms':>8} {'db ops':>7} {'tasks written':>13}")
+    medians = {}
+    for name, samples in rows.items():
+        medians[name] = [statistics.median(column) for column in zip(*samples)]
+        input_tokens, output_tokens, ms, ops, written = medians[name]
+        print(f"{name:<11} {input_tokens:>9.0f} {output_tokens:>10.0f} {ms:>8.1f} {ops:>7.0f} {written:>13.0f}")
+    print("tasks written by refine include date changes from auto-rescheduling")
+
+    if medians["refine"][1] >= medians["regenerate"][1]:
+        print("refinement did not reduce output tokens")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,134 @@
+"""
+Recovery rate and throughput of the tolerant response parser
+
+Runs the recorded corpus in data/broken_responses.jsonl plus a seeded fuzz
+set (random truncation, fences, prose, trailing commas) through both the
+previous strip-fences-and-json.loads parser and parse_task_breakdown.
+
+Usage (from backend/):
+    python -m benchmarks.bench_response_parser
+"""
+from pathlib import Path
+import json
+import random
+import time
+
+from app.services.response_parser import parse_task_breakdown
+
+CORPUS = Path(__file__).parent / "data" / "broken_responses.jsonl"
+FUZZ_CASES = 2000
+SEED = 7
+
+
+def legacy_parse(response_text: str) -> dict:
+    """The parser this module replaced"""
+    cleaned = response_text.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned[7:]
+    if cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+    result = json.loads(cleaned.strip())
+    if "tasks" not in result:
+        raise ValueError("Response missing 'tasks' field")
+    return result
+
+
+def make_plan(rng: random.Random) -> tuple:
+    """Serialized plan plus the end offset of each task object"""
+    size = rng.randint(5, 15)
+    tasks = [
+        {
+            "title": f"Task {i}",
+            "description": "Detailed description " * rng.randint(1, 6),
+            "estimated_hours": rng.randint(1, 12),
+            "priority": rng.choice(["low", "medium", "high", "critical"]),
+            "dependencies": [f"Task {i - 1}"] if i else [],
+            "start_date": "2025-10-16",
+            "end_date": "2025-10-18",
+        }
+        for i in range(size)
+    ]
+    head = '{"tasks": ['
+    parts, ends, offset = [], [], len(head)
+    for i, task in enumerate(tasks):
+        encoded = (", " if i else "") + json.dumps(task)
+        parts.append(encoded)
+        offset += len(encoded)
+        ends.append(offset)
+    text = head + "".join(parts) + '], "total_estimated_hours": 40, "suggested_timeline": "Two weeks"}'
+    return text, ends
+
+
+def fuzz_case(rng: random.Random) -> tuple:
+    """A mutated plan and the number of tasks that should be recoverable"""
+    text, ends = make_plan(rng)
+    expected = len(ends)
+    mutation = rng.choice(["truncate", "fence", "prose", "trailing_comma", "combo"])
+
+    if mutation in ("truncate", "combo"):
+        cut = rng.randint(ends[0], len(text) - 1)
+        text = text[:cut]
+        expected = sum(1 for end in ends if end <= cut)
+    if mutation in ("trailing_comma", "combo"):
+        text = text.replace('"end_date": "2025-10-18"}', '"end_date": "2025-10-18",}')
+    if mutation in ("fence", "combo"):
+        text = "```json\n" + text + ("\n```" if mutation == "fence" else "")
+    if mutation == "prose":
+        text = "Here is the plan you asked for:\n" + text + "\nHope this helps!"
+    return text, expected
+
+
+def run(parser, cases: list) -> dict:
+    recovered = expected_total = 0
+    total_bytes = 0
+    started = time.perf_counter()
+    for text, expected in cases:
+        total_bytes += len(text)
+        expected_total += expected
+        try:
+            result = parser(text)
+            recovered += min(expected, len(result.get("tasks", [])))
+        except Exception:
+            pass
+    elapsed = time.perf_counter() - started
+    return {
+        "recovery_rate": recovered / expected_total if expected_total else 0.0,
+        "mb_per_s": total_bytes / elapsed / 1e6,
+    }
+
+
+def main():
+    corpus = [
+        (case["text"], case["expected_tasks"])
+        for case in map(json.loads, CORPUS.read_text().splitlines())
+    ]
+    rng = random.Random(SEED)
+    fuzz = [fuzz_case(rng) for _ in range(FUZZ_CASES)]
+    clean = [make_plan(rng)[0] for _ in range(500)]
+    clean = [(text, text.count('"title"')) for text in clean]
+
+    print(f"{'set':<8} {'parser':<8} {'recovery':>9} {'MB/s':>8}")
+    for name, cases in (("corpus", corpus), ("fuzz", fuzz), ("clean", clean)):
+        for parser_name, parser in (("legacy", legacy_parse), ("tolerant", parse_task_breakdown)):
+            stats = run(parser, cases)
+            print(f"{name:<8} {parser_name:<8} {stats['recovery_rate']:>8.1%} {stats['mb_per_s']:>8.2f}")
+
+    failures = [
+        case["name"] for case in map(json.loads, CORPUS.read_text().splitlines())
+        if _recovered(case) != case["expected_tasks"]
+    ]
+    if failures:
+        print(f"corpus cases not fully recovered: {', '.join(failures)}")
+
+
+def _recovered(case: dict) -> int:
+    try:
+        return len(parse_task_breakdown(case["text"])["tasks"])
+    except ValueError:
+        return 0
+
+
+if __name__ == "__main__":
+    main()
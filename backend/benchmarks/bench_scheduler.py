@@ -0,0 +1,56 @@
+"""
+Scheduler run time on large goals
+
+Re-scheduling runs on every status change, so it has to stay fast for goals
+with thousands of tasks. Tasks are lightweight stand-ins with the fields
+the scheduler reads.
+
+Usage (from backend/):
+    python -m benchmarks.bench_scheduler
+"""
+from datetime import datetime
+from types import SimpleNamespace
+import random
+import time
+
+from app.models import TaskPriority, TaskStatus
+from app.services.scheduler import Scheduler, WorkCalendar
+
+SIZES = [100, 1_000, 10_000, 50_000]
+CAPACITIES = [None, 4, 1]
+COMPLETED_FRACTION = 0.3
+SEED = 5
+
+
+def synthetic_tasks(size: int, rng: random.Random) -> list:
+    tasks = []
+    for i in range(size):
+        deps = [rng.randrange(i) for _ in range(rng.randint(0, min(i, 3)))] if i else []
+        tasks.append(SimpleNamespace(
+            id=f"t{i}",
+            title=f"Task {i}",
+            estimated_hours=rng.choice([1, 2, 4, 8, 16]),
+            priority=rng.choice(list(TaskPriority)),
+            status=TaskStatus.COMPLETED if i < size * COMPLETED_FRACTION else TaskStatus.PENDING,
+            dependencies=[SimpleNamespace(task_id=f"t{d}") for d in set(deps)],
+        ))
+    return tasks
+
+
+def main():
+    rng = random.Random(SEED)
+    calendar = WorkCalendar()
+    start = datetime(2025, 10, 20, 9)
+    print(f"{'tasks':>7} {'parallel':>9} {'ms':>9} {'makespan h':>11}")
+    for size in SIZES:
+        tasks = synthetic_tasks(size, rng)
+        for capacity in CAPACITIES:
+            scheduler = Scheduler(calendar=calendar, max_parallel=capacity)
+            started = time.perf_counter()
+            result = scheduler.schedule(tasks, start=start)
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{size:>7} {str(capacity or 'inf'):>9} {elapsed:>9.1f} {result['makespan_hours']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Search at scale: GET /api/search over --tasks synthetic tasks
+
+Seeds --tasks tasks (default 1M, --tasks-per-goal per goal) whose titles
+and descriptions draw words from a Zipf-distributed vocabulary, so there
+are very common, middling and rare terms. Then, through SearchService:
+- against mongod: the $text aggregation on the text indexes
+- against mongomock: the in-process inverted index. mongomock's cursors
+  re-slice their results on every document, so reading 1M documents back
+  is quadratic; the generated documents are indexed as they are inserted
+  instead, and that build time is reported separately
+
+For each query shape it reports the first page (hits, facets and total in
+one pass) and the following pages (keyset cursor, hits only), checking
+that pages are in score order and never repeat a task. A $regex scan
+over titles and descriptions, what finding a task took before the index,
+is timed once for comparison (--no-baseline skips it).
+
+Usage (from backend/):
+    python -m benchmarks.bench_search [--tasks 1000000] [--tasks-per-goal 20] [--runs 5] [--pages 5]
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import random
+import resource
+import statistics
+import sys
+
+from bson import ObjectId
+
+from benchmarks.support import Stopwatch, use_backend
+
+from app.database import db_manager
+from app.models import Goal, Task, TaskPriority, TaskStatus
+from app.services.search_index import STOP_WORDS, search_index, stem
+from app.services.search_service import search_service
+
+SEED = 25
+VOCABULARY = 5000
+BATCH = 10000
+SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "so", "da", "fu", "gri", "bel", "mon", "tor")
+
+
+def vocabulary(rng: random.Random) -> list:
+    """Pseudo-words that the stemmer leaves alone, most frequent first"""
+    words = []
+    seen = set()
+    while len(words) < VOCABULARY:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + rng.choice("bkmnrt")
+        if word not in seen and word not in STOP_WORDS and stem(word) == word:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+async def seed(task_count: int, per_goal: int, words: list, rng: random.Random, index: Stopwatch = None):
+    """Insert the synthetic plan; with index, also add it to search_index, timed in index.ms"""
+    await Goal.get_motor_collection().delete_many({})
+    await Task.get_motor_collection().delete_many({})
+
+    cum_weights = []
+    total = 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1 / rank
+        cum_weights.append(total)
+
+    def text(count: int) -> str:
+        return " ".join(rng.choices(words, cum_weights=cum_weights, k=count))
+
+    statuses = [status.value for status in TaskStatus]
+    priorities = [priority.value for priority in TaskPriority]
+    start = datetime(2026, 1, 5, 9)
+    goals, tasks = [], []
+    for i in range(task_count):
+        if i % per_goal == 0:
+            goal_id = ObjectId()
+            goals.append({"_id": goal_id, "title": text(4), "description": text(15), "version": 0,
+                          "created_at": start, "updated_at": start})
+        day = start + timedelta(days=rng.randrange(365))
+        tasks.append({
+            "_id": ObjectId(),
+            "goal_id": goal_id,
+            "title": text(rng.randint(4, 7)),
+            "description": text(rng.randint(12, 24)),
+            "status": rng.choice(statuses),
+            "priority": rng.choice(priorities),
+            "estimated_hours": rng.choice((1, 2, 4, 8)),
+            "start_date": day,
+            "end_date": day + timedelta(days=rng.randint(0, 5)),
+            "dependencies": [],
+            "version": 0,
+            "created_at": start,
+            "updated_at": start,
+        })
+        if len(tasks) == BATCH or i == task_count - 1:
+            await Task.get_motor_collection().insert_many(tasks)
+            if index:
+                with Stopwatch() as sw:
+                    for task in tasks:
+                        search_index.index_task(task)
+                index.ms += sw.ms
+            tasks = []
+    await Goal.get_motor_collection().insert_many(goals)
+    if index:
+        with Stopwatch() as sw:
+            for goal in goals:
+                search_index.index_goal(goal)
+        index.ms += sw.ms
+    return [goal["_id"] for goal in goals]
+
+
+async def run_query(name: str, params: dict, runs: int, pages: int) -> dict:
+    first, later = [], []
+    for _ in range(runs):
+        with Stopwatch() as sw:
+            page = await search_service.search(**params)
+        first.append(sw.ms)
+        total = page["total"]
+
+    seen = [hit["id"] for hit in page["tasks"]]
+    scores = [hit["score"] for hit in page["tasks"]]
+    cursor = page["next_cursor"]
+    for _ in range(pages - 1):
+        if not cursor:
+            break
+        with Stopwatch() as sw:
+            page = await search_service.search(**params, cursor=cursor)
+        later.append(sw.ms)
+        seen += [hit["id"] for hit in page["tasks"]]
+        scores += [hit["score"] for hit in page["tasks"]]
+        cursor = page["next_cursor"]
+
+    if len(seen) != len(set(seen)):
+        raise AssertionError(f"{name}: a task appeared on two pages")
+    if scores != sorted(scores, reverse=True):
+        raise AssertionError(f"{name}: pages are not in score order")
+    return {
+        "name": name,
+        "total": total,
+        "first_p50": statistics.median(first),
+        "first_max": max(first),
+        "next_p50": statistics.median(later) if later else None,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--tasks-per-goal", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--no-baseline", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(SEED)
+    backend = use_backend()
+    await db_manager.connect()
+    words = vocabulary(rng)
+
+    search_backend = await search_service.backend()
+    index = None
+    if search_backend == "memory":
+        search_index.reset()
+        index = Stopwatch()
+        index.ms = 0.0
+    with Stopwatch() as sw:
+        goal_ids = await seed(args.tasks, args.tasks_per_goal, words, rng, index)
+    print(f"backend: {backend}, seeded {args.tasks} tasks in {len(goal_ids)} goals in {sw.ms / 1000:.1f}s")
+    if index:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"in-process index: built in {index.ms / 1000:.1f}s, peak RSS {rss:.0f} MB (with mongomock's copy), "
+              f"{search_index.stats()['tasks']}")
+
+    common, middling, rare = words[0], words[50], words[2000]
+    shapes = [
+        ("common word", {"query": common}),
+        ("middling word", {"query": middling}),
+        ("rare word", {"query": rare}),
+        ("two words", {"query": f"{middling} {rare}"}),
+        ("phrase", {"query": f'"{words[1]} {words[2]}"'}),
+        ("word -word", {"query": f"{middling} -{words[3]}"}),
+        ("+ status, priority", {"query": middling, "status": [TaskStatus.PENDING], "priority": [TaskPriority.HIGH]}),
+        ("+ goal", {"query": common, "goal_id": str(goal_ids[len(goal_ids) // 2])}),
+        ("+ date range", {"query": middling, "date_from": datetime(2026, 3, 1), "date_to": datetime(2026, 4, 1)}),
+    ]
+
+    print(f"\nsearch backend: {search_backend}, limit {args.limit}, {args.runs} runs; first page includes facets and total")
+    print(f"{'query':<20} {'matches':>9} {'first p50 ms':>13} {'first max':>10} {'next p50 ms':>12}")
+    for name, params in shapes:
+        result = await run_query(name, {**params, "limit": args.limit}, args.runs, args.pages)
+        next_p50 = f"{result['next_p50']:.1f}" if result["next_p50"] is not None else "-"
+        print(f"{name:<20} {result['total']:>9} {result['first_p50']:>13.1f} {result['first_max']:>10.1f} {next_p50:>12}")
+
+    if not args.no_baseline:
+        pattern = {"$regex": rf"\b{middling}\b", "$options": "i"}
+        with Stopwatch() as sw:
+            count = await Task.get_motor_collection().count_documents({"$or": [{"title": pattern}, {"description": pattern}]})
+        print(f"\n$regex scan for one word: {count} matches in {sw.ms:.0f} ms (no ranking, facets or highlights)")
+
+    if search_backend == "memory" and search_index.stats()["tasks"]["documents"] != args.tasks:
+        print("index does not cover every task")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
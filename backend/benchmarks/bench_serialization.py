@@ -0,0 +1,169 @@
+"""
+Response serialization cost for a goal detail with 500 tasks
+
+Compares the previous hand-built dicts (per-field str()/isoformat(),
+returned from a response_model=dict route) against app.serialization:
+plain dicts encoded to bytes in one pass and returned as FastJSONResponse.
+"encode only" times building the body (legacy: dicts + JSONResponse's
+json.dumps); "full request" goes through a FastAPI app, including its
+response_model handling. No database is involved.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--tasks 500] [--rounds 200]
+"""
+from datetime import datetime, timedelta
+import argparse
+import asyncio
+import json
+import time
+
+from beanie import PydanticObjectId
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.models import GoalProgress, GoalSummary, TaskDependency, TaskPriority, TaskStatus, TaskSummary
+from app.serialization import FastJSONResponse, dumps, goal_to_dict, orjson, task_to_dict
+
+
+def legacy_goal_to_dict(goal) -> dict:
+    """The route helpers this module replaced"""
+    return {
+        "id": str(goal.id),
+        "title": goal.title,
+        "description": goal.description,
+        "deadline": goal.deadline.isoformat() if goal.deadline else None,
+        "total_estimated_hours": goal.total_estimated_hours,
+        "progress": goal.progress.model_dump() if goal.progress else None,
+        "created_at": goal.created_at.isoformat()
+    }
+
+
+def legacy_task_to_dict(task) -> dict:
+    return {
+        "id": str(task.id),
+        "title": task.title,
+        "description": task.description,
+        "status": task.status.value,
+        "priority": task.priority.value,
+        "estimated_hours": task.estimated_hours,
+        "start_date": task.start_date.isoformat() if task.start_date else None,
+        "end_date": task.end_date.isoformat() if task.end_date else None,
+        "dependencies": [
+            {"task_id": dep.task_id, "task_title": dep.task_title}
+            for dep in task.dependencies
+        ]
+    }
+
+
+def legacy_render(goal, tasks) -> bytes:
+    """Hand-built dicts rendered by the stock JSONResponse"""
+    content = {
+        "success": True,
+        "goal": legacy_goal_to_dict(goal),
+        "tasks": [legacy_task_to_dict(task) for task in tasks]
+    }
+    return JSONResponse(content).body
+
+
+def fast_render(goal, tasks) -> bytes:
+    return dumps({
+        "success": True,
+        "goal": goal_to_dict(goal),
+        "tasks": [task_to_dict(task) for task in tasks]
+    })
+
+
+def make_goal(task_count: int):
+    start = datetime(2026, 1, 5, 9)
+    goal = GoalSummary(
+        _id=PydanticObjectId(),
+        title="Launch the mobile app",
+        description="Ship v1 to both app stores with onboarding and payments",
+        deadline=start + timedelta(days=90),
+        total_estimated_hours=task_count * 4.0,
+        progress=GoalProgress(total_tasks=task_count, pending=task_count, total_hours=task_count * 4.0),
+        created_at=start - timedelta(days=1)
+    )
+    tasks = []
+    for i in range(task_count):
+        deps = [
+            TaskDependency(task_id=str(tasks[j].id), task_title=tasks[j].title)
+            for j in (i - 1, i - 7) if j >= 0
+        ]
+        tasks.append(TaskSummary(
+            _id=PydanticObjectId(),
+            title=f"Task {i}: implement part of the feature",
+            description="Detailed description of the work involved. " * 3,
+            status=list(TaskStatus)[i % 4],
+            priority=list(TaskPriority)[i % 4],
+            estimated_hours=4.0,
+            start_date=start + timedelta(hours=i),
+            end_date=start + timedelta(hours=i + 4),
+            dependencies=deps
+        ))
+    return goal, tasks
+
+
+def time_encode(render, goal, tasks, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        render(goal, tasks)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+async def time_requests(goal, tasks, rounds: int) -> dict:
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=dict)
+    async def legacy():
+        return {
+            "success": True,
+            "goal": legacy_goal_to_dict(goal),
+            "tasks": [legacy_task_to_dict(task) for task in tasks]
+        }
+
+    @app.get("/fast")
+    async def fast():
+        return FastJSONResponse({
+            "success": True,
+            "goal": goal_to_dict(goal),
+            "tasks": [task_to_dict(task) for task in tasks]
+        })
+
+    results = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        bodies = {path: (await client.get(path)).json() for path in ("/legacy", "/fast")}
+        if bodies["/legacy"] != bodies["/fast"]:
+            raise SystemExit("legacy and fast responses differ")
+        for path in ("/legacy", "/fast"):
+            started = time.perf_counter()
+            for _ in range(rounds):
+                await client.get(path)
+            results[path] = (time.perf_counter() - started) / rounds * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    goal, tasks = make_goal(args.tasks)
+    body = fast_render(goal, tasks)
+    if json.loads(legacy_render(goal, tasks)) != json.loads(body):
+        raise SystemExit("legacy and fast encodings differ")
+
+    print(f"goal with {args.tasks} tasks, {len(body) / 1024:.0f} KiB, encoder: {'orjson' if orjson else 'json'}")
+    legacy_ms = time_encode(legacy_render, goal, tasks, args.rounds)
+    fast_ms = time_encode(fast_render, goal, tasks, args.rounds)
+    print(f"{'encode only':<14} legacy {legacy_ms:>7.2f} ms   fast {fast_ms:>7.2f} ms   {legacy_ms / fast_ms:>5.1f}x")
+
+    requests = asyncio.run(time_requests(goal, tasks, args.rounds))
+    legacy_ms, fast_ms = requests["/legacy"], requests["/fast"]
+    print(f"{'full request':<14} legacy {legacy_ms:>7.2f} ms   fast {fast_ms:>7.2f} ms   {legacy_ms / fast_ms:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Concurrent task status updates: lost writes and latency
+
+Fires --updates status changes at once over the tasks of one goal, first
+through the previous read-modify-write path (Task.get, mutate, save) and
+then through TaskService.update_task_status (a find_one_and_update on the
+task and one $inc on the goal; rescheduling is deferred to the next read).
+After each run it checks that:
+- every update bumped its task's version (a lost write leaves the counter
+  short)
+- the goal's progress rollup still matches a recount of its tasks
+
+Against mongomock each call is delayed by --rtt-ms to model the network;
+without it mongomock never interleaves concurrent requests.
+
+Usage (from backend/):
+    python -m benchmarks.bench_status_updates [--updates 400] [--tasks 20] [--rtt-ms 1]
+"""
+from datetime import datetime
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+
+from benchmarks.support import Stopwatch, op_counter, simulate_latency, use_backend
+
+from app.database import db_manager
+from app.models import Goal, Task, TaskPlanningView, TaskStatus
+from app.services.task_service import task_service
+
+SEED = 11
+
+
+async def legacy_update(task_id: str, status: TaskStatus):
+    """The read-modify-write path update_task_status replaced"""
+    task = await Task.get(task_id)
+    previous = task.status
+    task.status = status
+    task.version += 1
+    task.updated_at = datetime.utcnow()
+    await task.save()
+
+    tasks = await Task.find(Task.goal_id == task.goal_id).project(TaskPlanningView).to_list()
+    inc = {"version": 1}
+    task_service._add_progress_inc(inc, previous, status, task.estimated_hours)
+    await Goal.get_motor_collection().find_one_and_update(
+        {"_id": task.goal_id, "progress": {"$type": "object"}},
+        {"$inc": inc, "$set": {
+            "progress.next_actionable": [dep.model_dump() for dep in task_service._next_actionable(tasks)],
+            "updated_at": task.updated_at
+        }},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def atomic_update(task_id: str, status: TaskStatus):
+    await task_service.update_task_status(task_id, status)
+
+
+async def seed(task_count: int) -> list:
+    await Goal.get_motor_collection().delete_many({})
+    await Task.get_motor_collection().delete_many({})
+
+    goal = Goal(id=PydanticObjectId(), title="Concurrency", description="Status update benchmark")
+    tasks = [
+        Task(id=PydanticObjectId(), goal_id=goal.id, title=f"Task {i}", description="", estimated_hours=2)
+        for i in range(task_count)
+    ]
+    goal.progress = task_service._compute_progress(tasks)
+    await goal.insert()
+    await Task.insert_many(tasks)
+    return [str(task.id) for task in tasks]
+
+
+async def run(name: str, update, task_ids: list, updates: int) -> dict:
+    rng = random.Random(SEED)
+    statuses = list(TaskStatus)
+    plan = [(rng.choice(task_ids), rng.choice(statuses)) for _ in range(updates)]
+    latencies = []
+
+    async def timed(task_id, status):
+        with Stopwatch() as sw:
+            await update(task_id, status)
+        latencies.append(sw.ms)
+
+    op_counter.reset()
+    with Stopwatch() as total:
+        await asyncio.gather(*(timed(task_id, status) for task_id, status in plan))
+
+    tasks = await Task.find_all().to_list()
+    goal = await Goal.find_one({})
+    recount = task_service._compute_progress(tasks)
+    latencies.sort()
+    return {
+        "name": name,
+        "lost_writes": updates - sum(task.version for task in tasks),
+        "rollup_drift": sum(
+            abs(getattr(goal.progress, status.value) - getattr(recount, status.value)) for status in statuses
+        ),
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95)],
+        "total": total.ms,
+        "ops": op_counter.total / updates,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--updates", type=int, default=400)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    backend = use_backend()
+    simulate_latency(args.rtt_ms)
+    await db_manager.connect()
+    print(f"backend: {backend}, {args.updates} concurrent updates over {args.tasks} tasks")
+    print(f"{'path':<8} {'lost writes':>11} {'rollup drift':>12} {'p50 ms':>8} {'p95 ms':>8} {'total ms':>9} {'ops/update':>10}")
+
+    results = []
+    for name, update in (("legacy", legacy_update), ("atomic", atomic_update)):
+        task_ids = await seed(args.tasks)
+        result = await run(name, update, task_ids, args.updates)
+        results.append(result)
+        print(f"{name:<8} {result['lost_writes']:>11} {result['rollup_drift']:>12} {result['p50']:>8.2f} "
+              f"{result['p95']:>8.2f} {result['total']:>9.1f} {result['ops']:>10.1f}")
+
+    atomic = results[-1]
+    if atomic["lost_writes"] or atomic["rollup_drift"]:
+        print("atomic path lost updates")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
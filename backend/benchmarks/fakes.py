@@ -0,0 +1,106 @@
+"""
+Offline stand-ins for the Gemini model used by the benchmarks
+"""
+from types import SimpleNamespace
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.support import estimate_tokens
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt: str = None):
+        self.text = text
+        # Final responses carry (estimated) token counts like the SDK's
+        self.usage_metadata = None if prompt is None else SimpleNamespace(
+            prompt_token_count=estimate_tokens(prompt),
+            candidates_token_count=estimate_tokens(text)
+        )
+
+
+class FakeGeminiModel:
+    """
+    Mimics genai.GenerativeModel with a fixed latency and a synthetic plan
+
+    The plan uses the compact format when the call passes a response_schema
+    in generation_config, and the verbose one otherwise.
+
+    Args:
+        latency: Seconds each generation takes
+        task_count: Number of tasks in every generated plan
+        fail_rate: Fraction of async generations that raise a
+            (non-transient) RuntimeError after the latency
+        seed: Seed for the failure draws
+    """
+
+    def __init__(self, latency: float = 2.0, task_count: int = 10, fail_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.task_count = task_count
+        self.fail_rate = fail_rate
+        self.calls = 0
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._rng = random.Random(seed)
+
+    def _plan(self, generation_config: dict = None) -> str:
+        if generation_config and generation_config.get("response_schema"):
+            return json.dumps({
+                "tasks": [
+                    {"t": f"Task {i}", "d": f"Synthetic task {i}", "h": 3, "p": "medium",
+                     "dep": [i - 1] if i else [], "s": i, "e": i + 2}
+                    for i in range(self.task_count)
+                ],
+                "h": 3 * self.task_count,
+                "tl": "Synthetic timeline",
+            })
+        tasks = [
+            {
+                "title": f"Task {i}",
+                "description": f"Synthetic task {i}",
+                "estimated_hours": 3,
+                "priority": "medium",
+                "dependencies": [f"Task {i - 1}"] if i else [],
+                "start_date": "2025-10-16",
+                "end_date": "2025-10-18",
+            }
+            for i in range(self.task_count)
+        ]
+        return json.dumps({
+            "tasks": tasks,
+            "total_estimated_hours": 3 * self.task_count,
+            "suggested_timeline": "Synthetic timeline",
+        })
+
+    async def generate_content_async(self, prompt: str, generation_config: dict = None, stream: bool = False):
+        self.calls += 1
+        if stream:
+            return self._stream(self._plan(generation_config), prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if self._rng.random() < self.fail_rate:
+            self.failures += 1
+            raise RuntimeError("Synthetic generation failure")
+        return FakeResponse(self._plan(generation_config), prompt)
+
+    async def _stream(self, text: str, prompt: str, chunk_size: int = 64):
+        """Spread the latency evenly across fixed-size chunks"""
+        chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+        for i, chunk in enumerate(chunks):
+            await asyncio.sleep(self.latency / len(chunks))
+            response = FakeResponse(chunk)
+            if i == len(chunks) - 1:
+                # Like the SDK, the last chunk reports the whole call's usage
+                response.usage_metadata = FakeResponse(text, prompt).usage_metadata
+            yield response
+
+    def generate_content(self, prompt: str, generation_config: dict = None) -> FakeResponse:
+        self.calls += 1
+        time.sleep(self.latency)
+        return FakeResponse(self._plan(generation_config), prompt)
@@ -0,0 +1,162 @@
+"""
+Shared helpers for the benchmark scripts
+
+Benchmarks run against a real mongod when MONGODB_URL is set, otherwise
+against mongomock-motor so they work on a laptop with no services.
+"""
+from typing import Dict
+import math
+import os
+import re
+import subprocess
+import time
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-placeholder")
+
+from pymongo import monitoring
+
+import app.database as database
+
+
+class OpCounter(monitoring.CommandListener):
+    """Count database commands (round-trips) by name"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {}
+
+    def started(self, event):
+        self.counts[event.command_name] = self.counts.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self):
+        self.counts = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+op_counter = OpCounter()
+
+_MOCK_METHODS = {
+    "insert_one": "insert", "insert_many": "insert", "replace_one": "update",
+    "update_one": "update", "update_many": "update", "bulk_write": "update",
+    "find_one_and_update": "findAndModify", "delete_one": "delete",
+    "delete_many": "delete", "find": "find", "find_one": "find",
+    "aggregate": "aggregate", "count_documents": "aggregate",
+}
+
+
+def _instrument_mongomock():
+    """Wrap mongomock collection methods so op_counter sees them too"""
+    import mongomock
+
+    _depth = [0]
+    for method, command_name in _MOCK_METHODS.items():
+        original = getattr(mongomock.Collection, method)
+
+        def wrapper(self, *args, _original=original, _name=command_name, **kwargs):
+            # mongomock calls its own public methods internally; count only the outermost
+            if _depth[0] == 0:
+                op_counter.counts[_name] = op_counter.counts.get(_name, 0) + 1
+            _depth[0] += 1
+            try:
+                return _original(self, *args, **kwargs)
+            finally:
+                _depth[0] -= 1
+
+        setattr(mongomock.Collection, method, wrapper)
+
+
+def use_backend() -> str:
+    """Point the app's DatabaseManager at mongod or mongomock"""
+    if os.getenv("MONGODB_URL"):
+        monitoring.register(op_counter)
+        return "mongod"
+
+    import mongomock_motor
+
+    os.environ["MONGODB_URL"] = "mongodb://mongomock"
+    os.environ.setdefault("DATABASE_NAME", "benchmark")
+    database.AsyncIOMotorClient = lambda url, **kwargs: mongomock_motor.AsyncMongoMockClient()
+    _instrument_mongomock()
+    return "mongomock"
+
+
+def simulate_latency(ms: float):
+    """
+    Delay every mongomock-motor call by ms milliseconds
+
+    mongomock answers synchronously, so concurrent coroutines never
+    interleave between round-trips the way they do against a real server.
+    A small delay models the network so races (and the cost of extra
+    round-trips) show up. No effect against mongod.
+    """
+    if ms <= 0 or os.getenv("MONGODB_URL") != "mongodb://mongomock":
+        return
+
+    import asyncio
+    import inspect
+    import mongomock_motor
+
+    delay = ms / 1000
+    targets = [
+        (mongomock_motor.AsyncMongoMockCollection, None),
+        (mongomock_motor.AsyncCursor, ("to_list", "next")),
+        (mongomock_motor.AsyncCommandCursor, ("to_list", "next")),
+    ]
+    for cls, names in targets:
+        # The exported classes wrap the implementations; patch where methods live
+        owner = next(klass for klass in cls.__mro__ if "__init__" in vars(klass) and klass.__module__ == "mongomock_motor")
+        for name, method in list(vars(owner).items()):
+            if not inspect.iscoroutinefunction(method) or (names and name not in names):
+                continue
+
+            async def delayed(self, *args, _method=method, **kwargs):
+                await asyncio.sleep(delay)
+                return await _method(self, *args, **kwargs)
+
+            setattr(owner, name, delayed)
+
+
+def git_commit() -> dict:
+    """Current commit and whether the tree has local changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+class Stopwatch:
+    """Context manager measuring wall time in milliseconds"""
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ms = (time.perf_counter() - self._started) * 1000
+
+
+_TOKEN_PIECES = re.compile(r"[A-Za-z]+|\d|\s{2,}|[^\sA-Za-z\d]{1,2}")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough offline token count for Gemini-style tokenizers
+
+    About four letters per token, one token per digit, per run of
+    indentation and per punctuation pair. Good for comparing prompt and
+    response formats, not for billing.
+    """
+    return sum(
+        math.ceil(len(piece) / 4) if piece[0].isalpha() else 1
+        for piece in _TOKEN_PIECES.findall(text)
+    )
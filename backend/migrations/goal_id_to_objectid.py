@@ -0,0 +1,81 @@
+"""
+Convert tasks.goal_id from string to ObjectId
+
+Task.goal_id is now declared as an ObjectId so the goal_id indexes match
+the type stored in goals._id. Tasks written by older versions store the
+id as a hex string; queries by ObjectId do not match them until this
+migration has run. Safe to re-run: only string values are touched.
+Strings that are not valid ObjectIds are left as they are and listed
+at the end.
+
+Usage (from backend/, with MONGODB_URL set):
+    python -m migrations.goal_id_to_objectid
+"""
+from dotenv import load_dotenv
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+import asyncio
+
+load_dotenv()
+
+from app.database import db_manager
+
+BATCH_SIZE = 1000
+# Only these strings convert; $toObjectId and ObjectId() both reject anything else
+OBJECT_ID_PATTERN = "^[0-9a-fA-F]{24}$"
+
+
+async def migrate() -> dict:
+    """
+    Convert every string goal_id that is a valid ObjectId
+    
+    Returns:
+        {"converted": count, "skipped": [task ids whose goal_id is not a valid ObjectId]}
+        Skipped tasks are left untouched so they can be fixed by hand.
+    """
+    db = await db_manager.connect()
+    tasks = db["tasks"]
+    query = {"goal_id": {"$type": "string"}}
+    
+    converted = None
+    try:
+        # Server-side conversion in a single command (MongoDB 4.2+)
+        result = await tasks.update_many(
+            {"goal_id": {"$type": "string", "$regex": OBJECT_ID_PATTERN}},
+            [{"$set": {"goal_id": {"$toObjectId": "$goal_id"}}}]
+        )
+        converted = result.modified_count
+    except (OperationFailure, NotImplementedError, TypeError) as e:
+        print(f"Pipeline update unavailable ({e}), converting in batches")
+    
+    if converted is None:
+        converted = 0
+        batch = []
+        async for doc in tasks.find(query, {"goal_id": 1}):
+            if not ObjectId.is_valid(doc["goal_id"]):
+                continue
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"goal_id": ObjectId(doc["goal_id"])}}))
+            if len(batch) >= BATCH_SIZE:
+                converted += (await tasks.bulk_write(batch, ordered=False)).modified_count
+                batch = []
+        if batch:
+            converted += (await tasks.bulk_write(batch, ordered=False)).modified_count
+    
+    # Whatever is still a string could not be converted
+    skipped = [str(doc["_id"]) async for doc in tasks.find(query, {"_id": 1})]
+    return {"converted": converted, "skipped": skipped}
+
+
+async def main():
+    result = await migrate()
+    print(f"Converted goal_id on {result['converted']} tasks")
+    if result["skipped"]:
+        print(f"Skipped {len(result['skipped'])} tasks with an invalid goal_id:")
+        for task_id in result["skipped"]:
+            print(f"  {task_id}")
+    await db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
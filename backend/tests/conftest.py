@@ -0,0 +1,149 @@
+"""
+Shared fixtures
+
+Tests run against mongomock-motor with a fresh in-memory database per
+test, so they need no services. Async tests use the anyio pytest plugin
+(@pytest.mark.anyio).
+"""
+import asyncio
+import inspect
+import json
+import os
+
+os.environ.setdefault("GEMINI_API_KEY", "test-placeholder")
+
+import mongomock_motor
+import pytest
+from beanie import PydanticObjectId
+
+import app.database as database
+from app.database import db_manager
+from app.models import Goal, Task, TaskDependency
+from app.services.breakdown_cache import breakdown_cache
+from app.services.dependency_graph import graph_cache
+from app.services.llm_provider import LLMProvider, llm
+from app.services.read_cache import read_cache
+from app.services.response_parser import parse_refinement, parse_task_breakdown
+from app.services.task_service import task_service
+
+# The second task has no title and is dropped; the third depended on it
+PLAN = json.dumps({"tasks": [
+    {"t": "A", "d": "first", "h": 2, "p": "high", "dep": []},
+    {"t": "", "d": "invalid", "h": 1, "p": "low", "dep": [0]},
+    {"t": "C", "d": "third", "h": 3, "p": "medium", "dep": [1]},
+    {"t": "D", "d": "fourth", "h": 1, "p": "medium", "dep": [0, 2, 3]},
+], "h": 6})
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db(monkeypatch):
+    """The app's database, backed by a new mongomock client"""
+    monkeypatch.setenv("MONGODB_URL", "mongodb://mongomock")
+    monkeypatch.setenv("DATABASE_NAME", "test")
+    monkeypatch.setattr(database, "AsyncIOMotorClient", lambda url, **kwargs: mongomock_motor.AsyncMongoMockClient())
+    await db_manager.close()
+    read_cache.clear()
+    breakdown_cache.clear()
+    graph_cache.clear()
+    handle = await db_manager.connect()
+    yield handle
+    await db_manager.close()
+
+
+@pytest.fixture
+def seed_goal(db):
+    """
+    Insert a goal with a chain of tasks ("Task 0" <- "Task 1" <- ...)
+
+    Task i is estimated at i + 1 hours. Returns (goal, tasks).
+    """
+    async def seed(task_count: int = 8, progress: bool = True) -> tuple:
+        goal = Goal(id=PydanticObjectId(), title="Goal", description="")
+        tasks = []
+        for i in range(task_count):
+            task = Task(id=PydanticObjectId(), goal_id=goal.id, title=f"Task {i}", description="", estimated_hours=i + 1)
+            if tasks:
+                task.dependencies = [TaskDependency(task_id=str(tasks[-1].id), task_title=tasks[-1].title)]
+            tasks.append(task)
+        if progress:
+            goal.progress = task_service._compute_progress(tasks)
+        await goal.insert()
+        await Task.insert_many(tasks)
+        return goal, tasks
+    return seed
+
+
+@pytest.fixture
+def use_llm():
+    """Swap in an LLM provider for the test, restoring the previous one after"""
+    previous = (llm._provider, llm.name)
+    yield llm.use
+    llm._provider, llm.name = previous
+
+
+class ScriptedProvider(LLMProvider):
+    """Answers every breakdown or refine request with the same response text"""
+
+    name = "scripted"
+
+    def __init__(self, text: str, chunk_size: int = 16):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.refine_requests = []
+
+    async def generate_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None):
+        return parse_task_breakdown(self.text)
+
+    async def stream_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None):
+        for i in range(0, len(self.text), self.chunk_size):
+            yield self.text[i:i + self.chunk_size]
+
+    async def refine_task_breakdown(self, goal_title: str, goal_description: str, instruction: str, tasks, context, deadline: str = None):
+        self.refine_requests.append({"tasks": tasks, "context": context})
+        return parse_refinement(self.text)
+
+
+@pytest.fixture
+def scripted_llm(use_llm):
+    """Make the LLM answer with the given response text"""
+    def script(text: str) -> ScriptedProvider:
+        provider = ScriptedProvider(text)
+        use_llm(provider)
+        return provider
+    return script
+
+
+@pytest.fixture
+def interleave(monkeypatch):
+    """
+    Yield to the event loop before every mongomock-motor call
+
+    mongomock answers synchronously, so without this concurrent coroutines
+    never interleave between round-trips the way they do against a server.
+    Returns a dict counting calls by method name.
+    """
+    calls = {}
+    targets = [
+        (mongomock_motor.AsyncMongoMockCollection, None),
+        (mongomock_motor.AsyncCursor, ("to_list", "next")),
+        (mongomock_motor.AsyncCommandCursor, ("to_list", "next")),
+    ]
+    for cls, names in targets:
+        # The exported classes wrap the implementations; patch where methods live
+        owner = next(klass for klass in cls.__mro__ if "__init__" in vars(klass) and klass.__module__ == "mongomock_motor")
+        for name, method in list(vars(owner).items()):
+            if not inspect.iscoroutinefunction(method) or (names and name not in names):
+                continue
+
+            async def yielding(self, *args, _method=method, _name=name, **kwargs):
+                calls[_name] = calls.get(_name, 0) + 1
+                await asyncio.sleep(0)
+                return await _method(self, *args, **kwargs)
+
+            monkeypatch.setattr(owner, name, yielding)
+    return calls
@@ -0,0 +1,98 @@
+import asyncio
+import random
+
+import pytest
+
+from app.models import Goal, Task, TaskStatus
+from app.services.task_service import task_service
+
+pytestmark = pytest.mark.anyio
+
+
+async def assert_rollups_match(goal_id):
+    stored = await Task.find(Task.goal_id == goal_id).to_list()
+    goal = await Goal.get(goal_id)
+    recount = task_service._compute_progress(stored)
+    for status in TaskStatus:
+        assert getattr(goal.progress, status.value) == getattr(recount, status.value), status
+    assert goal.progress.completed_hours == recount.completed_hours
+    return stored
+
+
+async def test_completing_a_prerequisite_unblocks_dependents(db, seed_goal):
+    goal, tasks = await seed_goal(3)
+    await task_service.bulk_update_status({str(tasks[1].id): TaskStatus.BLOCKED})
+
+    result = await task_service.bulk_update_status({str(tasks[0].id): TaskStatus.COMPLETED})
+
+    assert [(change["task_id"], change["status"], change["cascaded"]) for change in result["changes"]] == [
+        (str(tasks[0].id), TaskStatus.COMPLETED, False),
+        (str(tasks[1].id), TaskStatus.PENDING, True),
+    ]
+    assert result["conflicts"] == []
+    assert result["goals"][str(goal.id)].completed == 1
+    await assert_rollups_match(goal.id)
+
+
+async def test_reopening_a_prerequisite_blocks_dependents(db, seed_goal):
+    goal, tasks = await seed_goal(3)
+    await task_service.bulk_update_status({str(tasks[0].id): TaskStatus.COMPLETED})
+
+    result = await task_service.bulk_update_status({str(tasks[0].id): TaskStatus.IN_PROGRESS})
+
+    assert {change["task_id"]: change["status"] for change in result["changes"]} == {
+        str(tasks[0].id): TaskStatus.IN_PROGRESS,
+        str(tasks[1].id): TaskStatus.BLOCKED,
+    }
+    await assert_rollups_match(goal.id)
+
+
+async def test_conflicted_prerequisite_does_not_cascade(db, seed_goal, monkeypatch):
+    goal, tasks = await seed_goal(3)
+    await task_service.bulk_update_status({str(tasks[1].id): TaskStatus.BLOCKED})
+    write = task_service._write_status_changes
+
+    async def raced_write(by_id, changes, now):
+        # Someone else moves the prerequisite between the read and the write
+        if str(tasks[0].id) in changes:
+            await task_service.update_task_status(str(tasks[0].id), TaskStatus.IN_PROGRESS)
+        return await write(by_id, changes, now)
+
+    monkeypatch.setattr(task_service, "_write_status_changes", raced_write)
+    result = await task_service.bulk_update_status({str(tasks[0].id): TaskStatus.COMPLETED})
+
+    assert result["changes"] == []
+    assert result["conflicts"] == [str(tasks[0].id)]
+    assert (await Task.get(tasks[1].id)).status == TaskStatus.BLOCKED
+    await assert_rollups_match(goal.id)
+
+
+async def test_unknown_task_is_rejected_before_any_write(db, seed_goal):
+    goal, tasks = await seed_goal(2)
+
+    with pytest.raises(ValueError):
+        await task_service.bulk_update_status({str(tasks[0].id): TaskStatus.COMPLETED, "0" * 24: TaskStatus.COMPLETED})
+
+    assert (await Task.get(tasks[0].id)).status == TaskStatus.PENDING
+
+
+async def test_concurrent_bulk_and_single_updates_keep_rollups_exact(db, interleave, seed_goal):
+    goal, tasks = await seed_goal(10)
+    rng = random.Random(3)
+    statuses = list(TaskStatus)
+
+    def bulk():
+        return task_service.bulk_update_status(
+            {str(task.id): rng.choice(statuses) for task in rng.sample(tasks, 6)},
+            cascade=rng.random() < 0.5
+        )
+
+    results = await asyncio.gather(
+        *(bulk() for _ in range(20)),
+        *(task_service.update_task_status(str(rng.choice(tasks).id), rng.choice(statuses)) for _ in range(40))
+    )
+
+    stored = await assert_rollups_match(goal.id)
+    applied = sum(len(result["changes"]) for result in results[:20]) + 40
+    assert sum(task.version for task in stored) == applied
+    assert any(result["conflicts"] for result in results[:20])
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Run in a fresh interpreter: the test session has already imported everything
+PROBE = """
+import json, sys
+import pymongo.mongo_client
+
+clients = []
+init = pymongo.mongo_client.MongoClient.__init__
+
+def counting_init(self, *args, **kwargs):
+    clients.append(args)
+    init(self, *args, **kwargs)
+
+pymongo.mongo_client.MongoClient.__init__ = counting_init
+
+import app.main
+from app.database import db_manager
+
+print(json.dumps({
+    "gemini_modules": sorted(name for name in sys.modules if name.startswith(("google.generativeai", "grpc"))),
+    "mongo_clients": len(clients),
+    "connected": db_manager.client is not None,
+}))
+"""
+
+
+def test_importing_the_app_defers_the_gemini_sdk():
+    """
+    app.main must not import the Gemini SDK (or gRPC) or build a MongoDB client
+
+    Only the SDK import and client construction are deferred: motor, beanie
+    and pymongo are imported eagerly because the models are Beanie documents.
+    """
+    env = {
+        **os.environ,
+        "GEMINI_API_KEY": "test-placeholder",
+        "LLM_PROVIDER": "gemini",
+        "MONGODB_URL": "mongodb://127.0.0.1:1",  # Nothing listens here
+        "WARMUP_ON_STARTUP": "false",
+    }
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe == {"gemini_modules": [], "mongo_clients": 0, "connected": False}
@@ -0,0 +1,99 @@
+import pytest
+
+from app.models import Task
+from app.services.dependency_graph import DependencyGraph, GraphCache, graph_cache
+from app.services.task_service import task_service
+
+pytestmark = pytest.mark.anyio
+
+
+def graph(edges, hours=None):
+    """Graph over tasks named by the keys of edges ({task: [dependencies]})"""
+    ids = list(edges)
+    return DependencyGraph(
+        ids=ids,
+        titles=[task.upper() for task in ids],
+        hours=[(hours or {}).get(task, 1.0) for task in ids],
+        dependencies=[edges[task] for task in ids],
+    )
+
+
+def test_diamond_critical_path_and_slack():
+    analysis = graph(
+        {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]},
+        hours={"a": 2, "b": 5, "c": 1, "d": 1},
+    ).analyze()
+
+    assert analysis["is_acyclic"]
+    assert analysis["levels"] == [["a"], ["b", "c"], ["d"]]
+    assert analysis["critical_path"] == ["a", "b", "d"]
+    assert analysis["critical_path_hours"] == 8
+    assert analysis["nodes"]["c"]["slack"] == 4
+    assert analysis["nodes"]["c"]["earliest_start"] == 2 and analysis["nodes"]["c"]["latest_start"] == 6
+    assert not analysis["nodes"]["c"]["critical"]
+
+
+def test_cycle_blocks_its_downstream_tasks():
+    analysis = graph({"a": [], "b": ["a", "c"], "c": ["b"], "d": ["c"], "e": ["e"]}).analyze()
+
+    assert not analysis["is_acyclic"]
+    assert sorted(sorted(cycle) for cycle in analysis["cycles"]) == [["b", "c"], ["e"]]
+    assert sorted(analysis["blocked_by_cycle"]) == ["b", "c", "d", "e"]
+    assert analysis["order"] == ["a"]
+    assert analysis["nodes"]["d"]["level"] is None and analysis["nodes"]["d"]["slack"] is None
+
+
+def test_dangling_and_duplicate_dependencies():
+    g = graph({"a": [], "b": ["a", "a", "gone"]})
+
+    assert g.predecessors == [[], [0]]
+    assert g.dangling == [{"task_id": "b", "missing_task_id": "gone"}]
+
+
+def test_long_chain_has_one_task_per_level():
+    edges = {"t0": []}
+    for i in range(1, 5000):
+        edges[f"t{i}"] = [f"t{i - 1}"]
+
+    analysis = graph(edges).analyze()
+
+    assert len(analysis["levels"]) == 5000
+    assert analysis["critical_path_hours"] == 5000
+
+
+async def test_goal_graph_uses_stored_dependencies(db, seed_goal):
+    goal, tasks = await seed_goal(task_count=3)
+
+    analysis = await task_service.get_goal_graph(str(goal.id))
+
+    assert analysis["order"] == [str(task.id) for task in tasks]
+    assert analysis["critical_path_hours"] == 1 + 2 + 3
+    with pytest.raises(ValueError):
+        await task_service.get_goal_graph("000000000000000000000000")
+
+
+async def test_goal_graph_cache_is_keyed_by_canonical_id(db, seed_goal):
+    goal, tasks = await seed_goal(task_count=2)
+    await task_service.get_goal_graph(str(goal.id).upper())
+
+    # Write paths invalidate str(goal.id); the uppercase spelling must see that
+    await Task.get_motor_collection().update_one({"_id": tasks[1].id}, {"$set": {"dependencies": []}})
+    graph_cache.invalidate(str(goal.id))
+    analysis = await task_service.get_goal_graph(str(goal.id).upper())
+
+    assert analysis["levels"] == [[str(tasks[0].id), str(tasks[1].id)]]
+
+    await task_service._discard_goal(goal.id)
+    assert graph_cache.get(str(goal.id)) is None
+
+
+def test_graph_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setenv("GRAPH_CACHE_MAX_ENTRIES", "2")
+    cache = GraphCache()
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})
+    cache.get("a")
+    cache.set("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1} and cache.get("c") == {"n": 3}
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from bson import ObjectId
+
+from app.services.event_hub import EventHub
+from app.services.task_service import task_service
+
+
+def change(collection, operation, **fields):
+    return {"ns": {"db": "test", "coll": collection}, "operationType": operation, **fields}
+
+
+def decode(frame: bytes) -> dict:
+    data = frame.decode().split("data: ", 1)[1]
+    return json.loads(data)
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = EventHub()
+    # Events published through task_service land on this hub
+    monkeypatch.setattr("app.services.task_service.event_hub", hub)
+    return hub
+
+
+def test_task_update_patches_every_changed_field(hub):
+    goal_id, task_id = ObjectId(), ObjectId()
+    doc = {"_id": task_id, "goal_id": goal_id, "title": "New title", "description": "New text",
+           "estimated_hours": 3.0, "status": "pending", "version": 4}
+    updated = {"title": "New title", "description": "New text", "estimated_hours": 3.0, "version": 4}
+
+    [(topic, event)] = hub._translate(change("tasks", "update", fullDocument=doc,
+                                             updateDescription={"updatedFields": updated}))
+
+    assert topic == str(goal_id)
+    assert event["tasks"] == [{"id": task_id, **updated}]
+    assert event["removed"] == [] and event["progress"] is None
+
+
+def test_goal_progress_patch_has_the_publish_shape(hub):
+    goal_id = ObjectId()
+    queue = hub.subscribe(str(goal_id))
+    task_service._publish_patch(goal_id, [])
+    published = decode(queue.get_nowait())
+
+    doc = {"_id": goal_id, "progress": {"total_tasks": 2, "completed": 1}}
+    [(topic, event)] = hub._translate(change("goals", "update", fullDocument=doc,
+                                             updateDescription={"updatedFields": {"progress.completed": 1}}))
+
+    assert topic == str(goal_id)
+    assert set(event) == set(published)
+    assert event["removed"] == [] and event["progress"] == doc["progress"]
+
+
+def test_task_delete_with_pre_image_removes_the_task(hub):
+    goal_id, task_id = ObjectId(), ObjectId()
+    deleted = change("tasks", "delete", documentKey={"_id": task_id},
+                     fullDocumentBeforeChange={"_id": task_id, "goal_id": goal_id})
+
+    assert hub._translate(deleted) == [
+        (str(goal_id), {"type": "patch", "goal_id": goal_id, "tasks": [], "removed": [str(task_id)], "progress": None})
+    ]
+
+
+def test_task_delete_without_pre_image_resyncs_open_goals(hub):
+    hub.subscribe("goals")
+    hub.subscribe("goal-a")
+    hub.subscribe("goal-b")
+
+    events = hub._translate(change("tasks", "delete", documentKey={"_id": ObjectId()}))
+
+    assert sorted(events) == [("goal-a", {"type": "resync"}), ("goal-b", {"type": "resync"})]
+
+
+def test_goal_delete_resyncs_its_page(hub):
+    goal_id = ObjectId()
+
+    assert hub._translate(change("goals", "delete", documentKey={"_id": goal_id})) == [(str(goal_id), {"type": "resync"})]
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from conftest import PLAN, ScriptedProvider
+
+from app.models import Goal, Task
+from app.services.task_service import task_service
+
+pytestmark = pytest.mark.anyio
+
+
+def dependency_titles(tasks):
+    return {task.title: [dep.task_title for dep in task.dependencies] for task in tasks}
+
+
+async def test_create_goal_renumbers_dependencies_of_dropped_task(db, scripted_llm):
+    scripted_llm(PLAN)
+
+    result = await task_service.create_goal_with_tasks("Goal", "Description")
+
+    assert dependency_titles(result["tasks"]) == {"A": [], "C": [], "D": ["A", "C"]}
+    stored = await Task.find(Task.goal_id == result["goal"].id).to_list()
+    assert dependency_titles(stored) == {"A": [], "C": [], "D": ["A", "C"]}
+
+
+async def test_streamed_goal_renumbers_dependencies_of_dropped_task(db, scripted_llm):
+    scripted_llm(PLAN)
+
+    events = [event async for event in task_service.stream_goal_with_tasks("Goal", "Description")]
+
+    assert events[-1]["type"] == "complete"
+    stored = await Task.find(Task.goal_id == events[-1]["goal"].id).to_list()
+    assert dependency_titles(stored) == {"A": [], "C": [], "D": ["A", "C"]}
+
+
+async def test_resolve_dependencies_ignores_self_and_out_of_range_references(db):
+    goal = Goal(title="Goal", description="")
+    tasks_data = [
+        {"title": "A", "dependencies": [0, "A"]},
+        {"title": "B", "dependencies": [0, 1, "B", 5, -1, "missing"]},
+    ]
+    tasks = [task_service._build_task(goal.id, data) for data in tasks_data]
+
+    task_service._resolve_dependencies(tasks, tasks_data)
+
+    assert dependency_titles(tasks) == {"A": [], "B": ["A"]}
+
+
+class SlowProvider(ScriptedProvider):
+    """Streams the plan, then hangs until cancelled"""
+
+    async def stream_task_breakdown(self, goal_title: str, goal_description: str, deadline: str = None):
+        async for chunk in super().stream_task_breakdown(goal_title, goal_description, deadline):
+            yield chunk
+        await asyncio.Event().wait()
+
+
+async def goal_count() -> int:
+    return await Goal.get_motor_collection().count_documents({})
+
+
+@pytest.mark.parametrize("idempotency_key", [None, "key-1"])
+async def test_closed_stream_removes_partial_goal(db, use_llm, idempotency_key):
+    use_llm(SlowProvider(PLAN[:PLAN.index('"t": "D"')]))
+
+    stream = task_service.stream_goal_with_tasks("Goal", "Description", idempotency_key=idempotency_key)
+    events = [await stream.__anext__() for _ in range(3)]
+    assert [event["type"] for event in events] == ["goal", "task", "task"]
+    assert await goal_count() == 1
+
+    # What the response does when the client disconnects between events
+    await stream.aclose()
+
+    assert await goal_count() == 0
+    assert await Task.get_motor_collection().count_documents({}) == 0
+
+
+async def test_cancelled_stream_removes_partial_goal(db, use_llm):
+    use_llm(SlowProvider(PLAN[:PLAN.index('"t": "D"')]))
+    seen = []
+
+    async def consume():
+        async for event in task_service.stream_goal_with_tasks("Goal", "Description"):
+            seen.append(event["type"])
+
+    consumer = asyncio.create_task(consume())
+    while seen.count("task") < 2:
+        await asyncio.sleep(0)
+    consumer.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await consumer
+    await asyncio.sleep(0)
+
+    assert await goal_count() == 0
+    assert await Task.get_motor_collection().count_documents({}) == 0
+
+
+async def test_failed_stream_reports_error_and_removes_goal(db, scripted_llm):
+    scripted_llm('{"tasks": [{"t": "", "d": "only an invalid task"}]}')
+
+    events = [event async for event in task_service.stream_goal_with_tasks("Goal", "Description")]
+
+    assert [event["type"] for event in events] == ["goal", "error"]
+    assert await goal_count() == 0
+
+
+async def test_completed_stream_keeps_goal_when_closed_after_complete(db, scripted_llm):
+    scripted_llm(PLAN)
+    stream = task_service.stream_goal_with_tasks("Goal", "Description")
+
+    async for event in stream:
+        if event["type"] == "complete":
+            break
+    await stream.aclose()
+
+    assert await goal_count() == 1
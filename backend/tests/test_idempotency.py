@@ -0,0 +1,159 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models import Goal, IdempotencyRecord, Task
+from app.services.idempotency import IdempotencyConflictError, IdempotencyKeyReuseError, idempotency_store
+from app.services.task_service import task_service
+from conftest import PLAN
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_retry_replays_the_first_goal(db, scripted_llm):
+    scripted_llm(PLAN)
+
+    first = await task_service.create_goal_idempotent("Goal", "Description", idempotency_key="k1")
+    retry = await task_service.create_goal_idempotent("Goal", " Description ", idempotency_key="k1")
+
+    assert not first["replayed"] and retry["replayed"]
+    assert retry["goal"].id == first["goal"].id
+    assert [task.id for task in retry["tasks"]] == [task.id for task in first["tasks"]]
+    assert await Goal.count() == 1
+
+
+async def test_concurrent_duplicates_create_one_goal(db, scripted_llm):
+    scripted_llm(PLAN)
+
+    results = await asyncio.gather(*(
+        task_service.create_goal_idempotent("Goal", "Description", idempotency_key="k1") for _ in range(5)
+    ))
+
+    assert len({result["goal"].id for result in results}) == 1
+    assert await Goal.count() == 1
+    assert await Task.count() == 3
+
+
+async def test_key_reused_for_another_request_is_rejected(db, scripted_llm):
+    scripted_llm(PLAN)
+    await task_service.create_goal_idempotent("Goal", "Description", idempotency_key="k1")
+
+    with pytest.raises(IdempotencyKeyReuseError):
+        await task_service.create_goal_idempotent("Other goal", "Description", idempotency_key="k1")
+
+
+async def test_failed_creation_releases_the_key(db, scripted_llm):
+    scripted_llm("not json at all")
+    with pytest.raises(Exception):
+        await task_service.create_goal_idempotent("Goal", "Description", idempotency_key="k1")
+    assert await IdempotencyRecord.count() == 0
+
+    scripted_llm(PLAN)
+    result = await task_service.create_goal_idempotent("Goal", "Description", idempotency_key="k1")
+
+    assert not result["replayed"]
+    assert await Goal.count() == 1
+
+
+async def test_running_request_conflicts_after_the_wait(db, monkeypatch):
+    monkeypatch.setattr(idempotency_store, "wait", 0)
+    fingerprint = idempotency_store.fingerprint("Goal", "Description", None)
+    assert (await idempotency_store.acquire("k1", fingerprint)).status == "processing"
+
+    with pytest.raises(IdempotencyConflictError):
+        await idempotency_store.acquire("k1", fingerprint)
+
+
+async def expire_lock(key):
+    await IdempotencyRecord.get_motor_collection().update_one(
+        {"key": key}, {"$set": {"locked_until": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+
+
+async def test_abandoned_claim_is_taken_over(db):
+    fingerprint = idempotency_store.fingerprint("Goal", "Description", None)
+    first = await idempotency_store.acquire("k1", fingerprint)
+    await expire_lock("k1")
+
+    second = await idempotency_store.acquire("k1", fingerprint)
+
+    assert second.status == "processing"
+    assert second.owner != first.owner
+
+
+async def test_stale_owner_cannot_release_or_complete(db):
+    fingerprint = idempotency_store.fingerprint("Goal", "Description", None)
+    stale = await idempotency_store.acquire("k1", fingerprint)
+    await expire_lock("k1")
+    current = await idempotency_store.acquire("k1", fingerprint)
+
+    await idempotency_store.release("k1", stale.owner)
+    assert not await idempotency_store.renew("k1", stale.owner)
+    assert not await idempotency_store.complete("k1", stale.owner, PydanticObjectId(), {})
+    assert await idempotency_store.renew("k1", current.owner)
+
+    record = await IdempotencyRecord.find_one(IdempotencyRecord.key == "k1")
+    assert record.status == "processing" and record.owner == current.owner
+
+
+async def test_creation_that_lost_its_claim_discards_its_goal(db, scripted_llm, monkeypatch):
+    scripted_llm(PLAN)
+    complete = idempotency_store.complete
+    winner = {}
+
+    async def taken_over_then_complete(key, owner, goal_id, ai_insights):
+        # Another request takes the expired claim over and finishes first
+        if not winner:
+            result = await task_service.create_goal_with_tasks("Goal", "Description")
+            winner["id"] = result["goal"].id
+            await IdempotencyRecord.get_motor_collection().update_one(
+                {"key": key},
+                {"$set": {"owner": "other", "status": "completed", "goal_id": result["goal"].id}}
+            )
+        return await complete(key, owner, goal_id, ai_insights)
+
+    monkeypatch.setattr(idempotency_store, "complete", taken_over_then_complete)
+    result = await task_service.create_goal_idempotent("Goal", "Description", idempotency_key="k1")
+
+    assert result["replayed"]
+    assert result["goal"].id == winner["id"]
+    assert await Goal.count() == 1
+    assert await Task.count() == 3
+
+
+async def test_creation_checks_its_claim_before_saving(db, scripted_llm, monkeypatch):
+    scripted_llm(PLAN)
+    renewals = []
+
+    async def lost_once(key, owner):
+        # First attempt finds its lock expired; the retry claims it afresh
+        renewals.append(owner)
+        if len(renewals) == 1:
+            await expire_lock(key)
+            return False
+        return True
+
+    monkeypatch.setattr(idempotency_store, "renew", lost_once)
+    result = await task_service.create_goal_idempotent("Goal", "Description", idempotency_key="k1")
+
+    assert not result["replayed"]
+    assert len(renewals) == 2 and renewals[0] != renewals[1]
+    assert await Goal.count() == 1
+
+
+async def test_stream_that_lost_its_claim_discards_its_goal(db, scripted_llm):
+    scripted_llm(PLAN)
+    fingerprint = idempotency_store.fingerprint("Goal", "Description", None)
+    events = []
+    async for event in task_service.stream_goal_with_tasks("Goal", "Description", idempotency_key="k1"):
+        events.append(event)
+        if event["type"] == "goal":
+            await expire_lock("k1")
+            taker = await idempotency_store.acquire("k1", fingerprint)
+
+    assert events[-1]["type"] == "error"
+    assert await Goal.count() == 0
+    record = await IdempotencyRecord.find_one(IdempotencyRecord.key == "k1")
+    assert record.status == "processing" and record.owner == taker.owner
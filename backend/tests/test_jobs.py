@@ -0,0 +1,37 @@
+import httpx
+import pytest
+
+from app.main import app
+from app.models import GenerationJob, JobStatus
+from app.services.job_queue import job_worker, worker_mode
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("env, mode", [
+    ({}, "inline"),
+    ({"VERCEL": "1"}, "external"),
+    ({"AWS_LAMBDA_FUNCTION_NAME": "api"}, "external"),
+    ({"VERCEL": "1", "JOB_WORKER_MODE": "inline"}, "inline"),
+    ({"JOB_WORKER_MODE": "External"}, "external"),
+])
+def test_worker_mode(monkeypatch, env, mode):
+    for name in ("VERCEL", "AWS_LAMBDA_FUNCTION_NAME", "JOB_WORKER_MODE"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+    assert worker_mode() == mode
+
+
+async def test_serverless_enqueue_leaves_the_job_for_an_external_worker(db, monkeypatch):
+    monkeypatch.delenv("JOB_WORKER_MODE", raising=False)
+    monkeypatch.setenv("VERCEL", "1")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/jobs/", json={"title": "Goal", "description": "Description"})
+
+    assert response.status_code == 202
+    assert not job_worker.running
+    [job] = await GenerationJob.find_all().to_list()
+    assert job.status == JobStatus.QUEUED and job.lease_owner is None
@@ -0,0 +1,30 @@
+from bson import ObjectId
+import pytest
+
+from migrations.goal_id_to_objectid import migrate
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_goal_id_migration_skips_invalid_ids(db):
+    goal_id = ObjectId()
+    await db["tasks"].insert_many([
+        {"_id": "valid", "goal_id": str(goal_id)},
+        {"_id": "converted", "goal_id": goal_id},
+        {"_id": "not-hex", "goal_id": "not-an-object-id"},
+        {"_id": "short", "goal_id": "abc123"},
+    ])
+    
+    result = await migrate()
+    
+    assert result == {"converted": 1, "skipped": ["not-hex", "short"]}
+    docs = {doc["_id"]: doc["goal_id"] async for doc in db["tasks"].find()}
+    assert docs == {
+        "valid": goal_id,
+        "converted": goal_id,
+        "not-hex": "not-an-object-id",
+        "short": "abc123",
+    }
+    
+    # Re-running converts nothing new and reports the same rows
+    assert await migrate() == {"converted": 0, "skipped": ["not-hex", "short"]}
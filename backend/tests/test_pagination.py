@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+from bson import ObjectId
+
+from app.models import Goal, Task, TaskStatus
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.task_service import task_service
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 10, 12, 9)
+
+
+def test_cursor_round_trip():
+    last_id = ObjectId()
+
+    assert decode_cursor(encode_cursor("newest", NOW, last_id), "newest") == (NOW, last_id)
+    assert decode_cursor(encode_cursor("deadline", None, last_id), "deadline") == (None, last_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("oldest", NOW, ObjectId())])
+def test_bad_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "newest")
+
+
+async def seed_goals(count: int):
+    # Pairs share created_at, so pages must break ties on _id
+    goals = [
+        Goal(id=PydanticObjectId(), title=f"Goal {i}", description="", created_at=NOW + timedelta(minutes=i // 2),
+             deadline=NOW + timedelta(days=count - i) if i % 3 else None)
+        for i in range(count)
+    ]
+    await Goal.insert_many(goals)
+    return goals
+
+
+async def walk(sort: str, limit: int, **filters):
+    pages, cursor = [], None
+    while True:
+        page = await task_service.list_goals(limit=limit, cursor=cursor, sort=sort, **filters)
+        pages.append([goal.title for goal in page["goals"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort", ["newest", "oldest"])
+async def test_pages_cover_every_goal_once(db, sort):
+    goals = await seed_goals(11)
+
+    pages = await walk(sort, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 3, 2]
+    titles = [title for page in pages for title in page]
+    expected = sorted(goals, key=lambda goal: (goal.created_at, goal.id), reverse=sort == "newest")
+    assert titles == [goal.title for goal in expected]
+
+
+async def test_deadline_sort_skips_goals_without_deadline(db):
+    goals = await seed_goals(9)
+
+    titles = [title for page in await walk("deadline", limit=2) for title in page]
+
+    with_deadline = sorted((goal for goal in goals if goal.deadline), key=lambda goal: goal.deadline)
+    assert titles == [goal.title for goal in with_deadline]
+
+
+async def test_overdue_filter(db):
+    goals = await seed_goals(4)
+    past = datetime.utcnow() - timedelta(days=1)
+    await Task.insert_many([
+        Task(goal_id=goals[0].id, title="Late", description="", end_date=past),
+        Task(goal_id=goals[1].id, title="Done late", description="", end_date=past, status=TaskStatus.COMPLETED),
+        Task(goal_id=goals[2].id, title="On time", description="", end_date=past + timedelta(days=7)),
+    ])
+
+    overdue = await walk("oldest", limit=1, has_overdue_tasks=True)
+    on_track = await walk("oldest", limit=10, has_overdue_tasks=False)
+
+    assert overdue == [["Goal 0"]]
+    assert on_track == [["Goal 1", "Goal 2", "Goal 3"]]
+
+
+async def test_unknown_sort_is_rejected(db):
+    with pytest.raises(ValueError):
+        await task_service.list_goals(sort="title")
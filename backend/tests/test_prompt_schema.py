@@ -0,0 +1,75 @@
+from datetime import date
+import json
+
+import pytest
+
+from app.models import Task
+from app.services.llm_provider import StubProvider
+from app.services.prompt_schema import expand_task
+from app.services.response_parser import TaskStreamParser, parse_task_breakdown
+from app.services.task_service import task_service
+
+TODAY = date(2026, 3, 2)
+
+
+def compact(title, dep=(), **fields):
+    return {"t": title, "d": f"{title} description", "h": 2, "p": "medium", "dep": list(dep), **fields}
+
+
+def test_expand_task_maps_short_keys_and_day_offsets():
+    task = expand_task(compact("A", [0], s=0, e=3), today=TODAY)
+
+    assert task == {
+        "title": "A",
+        "description": "A description",
+        "estimated_hours": 2,
+        "priority": "medium",
+        "dependencies": [0],
+        "start_date": "2026-03-02",
+        "end_date": "2026-03-05",
+    }
+
+
+def test_expand_task_leaves_verbose_tasks_alone():
+    verbose = {"title": "A", "dependencies": ["B"], "start_date": "2026-03-02"}
+
+    assert expand_task(verbose) is verbose
+
+
+def test_compact_breakdown_with_invalid_task_keeps_a_consistent_graph():
+    text = json.dumps({"tasks": [
+        compact("A"),
+        compact("  ", [0]),
+        compact("C", [0, 1]),
+        compact("D", [1, 2]),
+    ], "h": 8, "tl": "Two days"})
+
+    result = parse_task_breakdown(text)
+
+    assert result["total_estimated_hours"] == 8
+    assert result["suggested_timeline"] == "Two days"
+    assert [(task["title"], task["dependencies"]) for task in result["tasks"]] == [("A", []), ("C", [0]), ("D", [1])]
+
+    parser = TaskStreamParser()
+    emitted = [task for i in range(0, len(text), 9) for task in parser.feed(text[i:i + 9])]
+    parser.finish()
+    assert [task["dependencies"] for task in emitted] == [[], [0], [1]]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("stream", [False, True])
+async def test_compact_plans_only_depend_on_earlier_tasks(db, use_llm, stream):
+    use_llm(StubProvider(latency=0, task_count=12))
+
+    for i in range(5):
+        if stream:
+            events = [event async for event in task_service.stream_goal_with_tasks(f"Goal {i}", "Compact plan")]
+            goal = events[-1]["goal"]
+        else:
+            goal = (await task_service.create_goal_with_tasks(f"Goal {i}", "Compact plan"))["goal"]
+
+        tasks = await Task.find(Task.goal_id == goal.id).sort("title").to_list()
+        position = {str(task.id): int(task.title.rsplit(" ", 1)[1]) for task in tasks}
+        assert len(tasks) == 12
+        for task in tasks:
+            assert all(position[dep.task_id] < position[str(task.id)] for dep in task.dependencies)
@@ -0,0 +1,62 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models import TaskStatus
+from app.services.read_cache import ReadCache
+from app.services.task_service import task_service
+
+pytestmark = pytest.mark.anyio
+
+
+def test_set_after_invalidation_is_dropped():
+    cache = ReadCache()
+    generation = cache.generation()
+    cache.invalidate_goal("g1")
+
+    assert cache.set("goal:g1", "g1", "etag", b"stale", generation=generation) is False
+    assert cache.get("goal:g1") is None
+    assert cache.set("goal:g1", "g1", "etag", b"fresh", generation=cache.generation()) is True
+    assert cache.get("goal:g1") == ("etag", b"fresh")
+
+
+def test_invalidate_goal_drops_its_tasks_only():
+    cache = ReadCache()
+    cache.set("goal:g1", "g1", "e1", b"goal")
+    cache.set("task:t1", "g1", "e2", b"task")
+    cache.set("goal:g2", "g2", "e3", b"other")
+
+    cache.invalidate_goal("g1")
+
+    assert cache.get("goal:g1") is None and cache.get("task:t1") is None
+    assert cache.get("goal:g2") == ("e3", b"other")
+
+
+async def test_read_racing_a_write_does_not_cache_stale_body(db, monkeypatch, seed_goal):
+    goal, tasks = await seed_goal(task_count=2)
+    read_done, proceed = asyncio.Event(), asyncio.Event()
+    get_goal_with_tasks = task_service.get_goal_with_tasks
+
+    async def slow_read(goal_id):
+        # The database read is done; the response is not rendered or cached yet
+        result = await get_goal_with_tasks(goal_id)
+        read_done.set()
+        await proceed.wait()
+        return result
+
+    monkeypatch.setattr(task_service, "get_goal_with_tasks", slow_read)
+    url = f"/api/goals/{goal.id}"
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        racing = asyncio.create_task(client.get(url))
+        await read_done.wait()
+        await task_service.update_task_status(str(tasks[0].id), TaskStatus.COMPLETED)
+        proceed.set()
+        stale = await racing
+
+        fresh = await client.get(url)
+
+    assert stale.json()["tasks"][0]["status"] == "pending"
+    assert fresh.json()["tasks"][0]["status"] == "completed"
+    assert fresh.headers["etag"] != stale.headers["etag"]
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app.models import Task
+from app.services.response_parser import parse_refinement
+from app.services.task_service import task_service
+
+pytestmark = pytest.mark.anyio
+
+
+def refinement(*tasks) -> str:
+    return json.dumps({"tasks": [{"d": "", "h": 1, "p": "medium", "dep": [], **task} for task in tasks]})
+
+
+def test_refinement_refs_skip_dropped_tasks():
+    parsed = parse_refinement(refinement(
+        {"ref": "s0", "t": "First"},
+        {"t": ""},  # invalid: no title
+        {"t": "Third", "dep": ["n0", "n1", "n2", "c0"]},
+    ))
+
+    assert [task["title"] for task in parsed["tasks"]] == ["First", "Third"]
+    # n1 pointed at the dropped task; n2 is now n1 and depends on itself
+    assert parsed["tasks"][1]["dependencies"] == ["n0", "n1", "c0"]
+
+
+async def test_only_selected_refs_are_rewritten(db, scripted_llm, monkeypatch, seed_goal):
+    monkeypatch.setattr(task_service, "auto_reschedule", False)  # Keep dates out of "updated"
+    goal, tasks = await seed_goal(task_count=4)
+    provider = scripted_llm(refinement(
+        {"ref": "s0", "t": "Task 1 revised", "dep": ["c0"]},
+        {"ref": "c1", "t": "Copy of the dependent"},
+        {"ref": "s9", "t": "Made-up ref"},
+        {"t": "Follow-up", "dep": ["n0"]},
+    ))
+
+    result = await task_service.refine_goal(str(goal.id), [str(tasks[1].id)], "Split it")
+
+    # The model saw task 1 as s0 and its neighbours as context
+    [request] = provider.refine_requests
+    assert [task["ref"] for task in request["tasks"]] == ["s0"]
+    assert [(item["ref"], item["title"]) for item in request["context"]] == [("c0", "Task 0"), ("c1", "Task 2")]
+
+    stored = {task.title: task for task in await Task.find(Task.goal_id == goal.id).to_list()}
+    assert sorted(stored) == ["Follow-up", "Task 0", "Task 1 revised", "Task 2", "Task 3"]
+    assert result["changes"]["inserted"] == [str(stored["Follow-up"].id)]
+    # Task 2 only picks up the renamed dependency title
+    assert result["changes"]["updated"] == [str(tasks[1].id), str(tasks[2].id)]
+    assert result["changes"]["deleted"] == []
+    assert [dep.task_id for dep in stored["Follow-up"].dependencies] == [str(tasks[1].id)]
+    assert [dep.task_title for dep in stored["Task 2"].dependencies] == ["Task 1 revised"]
+    assert result["goal"].progress.total_tasks == 5
+
+
+async def test_left_out_task_is_deleted_and_dependents_relinked(db, scripted_llm, seed_goal):
+    goal, tasks = await seed_goal(task_count=3)
+    scripted_llm(refinement({"t": "Step A"}, {"t": "Step B", "dep": ["n0", "c0"]}))
+
+    result = await task_service.refine_goal(str(goal.id), [str(tasks[1].id)], "Split it")
+
+    stored = {task.title: task for task in await Task.find(Task.goal_id == goal.id).to_list()}
+    assert sorted(stored) == ["Step A", "Step B", "Task 0", "Task 2"]
+    assert result["changes"]["deleted"] == [str(tasks[1].id)]
+    assert [dep.task_title for dep in stored["Step B"].dependencies] == ["Step A", "Task 0"]
+    # Task 2 depended on the removed task; it now waits for the new sink
+    assert [dep.task_title for dep in stored["Task 2"].dependencies] == ["Step B"]
+
+
+async def test_unknown_task_is_rejected_before_calling_the_model(db, scripted_llm, seed_goal):
+    goal, _ = await seed_goal(task_count=2)
+    provider = scripted_llm(refinement())
+
+    with pytest.raises(ValueError):
+        await task_service.refine_goal(str(goal.id), ["000000000000000000000000"], "Split it")
+    assert provider.refine_requests == []
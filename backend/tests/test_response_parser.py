@@ -0,0 +1,79 @@
+import json
+
+from app.services.response_parser import TaskStreamParser, parse_task_breakdown
+
+
+def breakdown(*tasks, **extra) -> str:
+    return json.dumps({"tasks": list(tasks), **extra})
+
+
+def task(title, dependencies=(), **fields):
+    return {"title": title, "description": "", "estimated_hours": 2, "dependencies": list(dependencies), **fields}
+
+
+def test_dropped_task_renumbers_index_dependencies():
+    result = parse_task_breakdown(breakdown(task("A"), task("", [0]), task("C", [1]), task("D", [0, 2])))
+
+    assert [t["title"] for t in result["tasks"]] == ["A", "C", "D"]
+    # C depended on the dropped task only; D's [0, 2] now points at A and C
+    assert [t["dependencies"] for t in result["tasks"]] == [[], [], [0, 1]]
+
+
+def test_title_dependencies_are_kept():
+    result = parse_task_breakdown(breakdown(task("A"), {"description": "no title"}, task("C", ["A", 0])))
+
+    assert result["tasks"][1]["dependencies"] == ["A", 0]
+
+
+def test_repaired_response_renumbers_too():
+    text = '```json\n{"tasks": [{"title": "A", "dependencies": []}, {"title": null}, {"title": "C", "dependencies": [1, 7, 0,]},]\n```'
+
+    result = parse_task_breakdown(text)
+
+    assert [t["dependencies"] for t in result["tasks"]] == [[], [0]]
+
+
+def test_total_hours_defaults_to_sum_of_valid_tasks():
+    result = parse_task_breakdown(breakdown(task("A"), task(""), task("C", estimated_hours="3 hours")))
+
+    assert result["total_estimated_hours"] == 5
+
+
+def stream(text: str, size: int):
+    parser = TaskStreamParser()
+    emitted = []
+    for i in range(0, len(text), size):
+        emitted.extend(parser.feed(text[i:i + size]))
+    return parser, emitted
+
+
+def test_stream_parser_renumbers_emitted_tasks_on_finish():
+    text = breakdown(task("A"), task("", [0]), "not a task", task("D", [1, 0]), task("E", [3, 5]))
+
+    for size in (1, 7, len(text)):
+        parser, emitted = stream(text, size)
+        result = parser.finish()
+
+        assert [t["title"] for t in emitted] == ["A", "D", "E"]
+        # The dicts already handed out are fixed in place, as TaskService relies on
+        assert [t["dependencies"] for t in emitted] == [[], [0], [1]]
+        assert [t["dependencies"] for t in result["tasks"]] == [[], [0], [1]]
+
+
+def test_stream_parser_ignores_commas_inside_tasks():
+    text = breakdown(task("A, B", description="x, y", dependencies=[]), task("C", [0], tags=["a", "b"]))
+
+    parser, emitted = stream(text, 5)
+    parser.finish()
+
+    assert [t["dependencies"] for t in emitted] == [[], [0]]
+
+
+def test_stream_parser_falls_back_to_emitted_tasks_when_truncated():
+    text = breakdown(task("A"), task(""), task("C", [0, 1]))[:-2] + ', {"title": "half'
+    parser, emitted = stream(text, 16)
+
+    result = parser.finish()
+
+    assert [t["title"] for t in result["tasks"]] == ["A", "C"]
+    assert result["tasks"][1]["dependencies"] == [0]
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+
+import pytest
+from beanie import PydanticObjectId
+
+from app.models import Goal, Task, TaskDependency, TaskPlanningView, TaskPriority, TaskStatus
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import Scheduler, WorkCalendar
+from app.services.task_service import task_service
+
+pytestmark = pytest.mark.anyio
+
+MONDAY = datetime(2026, 10, 12, 9)
+
+
+def chain(*hours, **fields):
+    tasks = []
+    for i, estimate in enumerate(hours):
+        task = TaskPlanningView(_id=PydanticObjectId(), goal_id=PydanticObjectId(), title=f"Task {i}",
+                                status=TaskStatus.PENDING, priority=TaskPriority.MEDIUM, estimated_hours=estimate)
+        if tasks:
+            task.dependencies = [TaskDependency(task_id=str(tasks[-1].id), task_title=tasks[-1].title)]
+        tasks.append(task)
+    for attr, value in fields.items():
+        setattr(tasks[0], attr, value)
+    return tasks
+
+
+def scheduler(**kwargs):
+    return Scheduler(calendar=WorkCalendar(day_start_hour=9, hours_per_day=8, working_days=(0, 1, 2, 3, 4)), **kwargs)
+
+
+def dates(result, tasks):
+    return [result["dates"][str(task.id)] for task in tasks]
+
+
+def test_chain_follows_the_working_calendar():
+    tasks = chain(6, 4)
+    result = scheduler().schedule(tasks, start=MONDAY + timedelta(hours=2))
+
+    assert dates(result, tasks) == [
+        (datetime(2026, 10, 12, 11), datetime(2026, 10, 12, 17)),
+        (datetime(2026, 10, 13, 9), datetime(2026, 10, 13, 13)),
+    ]
+    assert result["makespan_hours"] == 10
+
+
+def test_weekend_is_skipped():
+    tasks = chain(4)
+    result = scheduler().schedule(tasks, start=datetime(2026, 10, 16, 15))  # Friday afternoon
+
+    assert dates(result, tasks) == [(datetime(2026, 10, 16, 15), datetime(2026, 10, 19, 11))]
+
+
+def test_offset_inverts_at():
+    plan = WorkCalendar().plan(datetime(2026, 10, 15, 13))  # Thursday
+    for hours in (0, 1, 3.5, 4, 8, 12, 27, 40):
+        assert plan.offset(plan.at(hours)) == pytest.approx(hours)
+    assert plan.offset(datetime(2026, 10, 1)) == 0
+
+
+def test_started_task_keeps_its_dates_while_they_hold():
+    started = (datetime(2026, 10, 9, 14), datetime(2026, 10, 12, 13))
+    tasks = chain(8, 2, status=TaskStatus.IN_PROGRESS, start_date=started[0], end_date=started[1])
+
+    result = scheduler().schedule(tasks, start=MONDAY + timedelta(hours=1))
+
+    # Pinned as stored, and the next task still starts when it ends
+    assert dates(result, tasks) == [started, (started[1], datetime(2026, 10, 12, 15))]
+
+
+def test_overdue_started_task_keeps_its_start_only():
+    start_date = datetime(2026, 10, 9, 9)
+    tasks = chain(3, status=TaskStatus.IN_PROGRESS, start_date=start_date, end_date=datetime(2026, 10, 9, 12))
+
+    result = scheduler().schedule(tasks, start=MONDAY)
+
+    assert dates(result, tasks) == [(start_date, datetime(2026, 10, 12, 12))]
+
+
+def test_blocked_dependent_waits_for_started_task():
+    # Started out of order: its dependency is unfinished, but the work is under way
+    tasks = chain(2, 3)
+    tasks[1].status = TaskStatus.IN_PROGRESS
+    tasks[1].start_date, tasks[1].end_date = MONDAY, MONDAY + timedelta(hours=3)
+
+    result = scheduler(max_parallel=1).schedule(tasks, start=MONDAY + timedelta(hours=1))
+
+    assert dates(result, tasks) == [
+        (MONDAY + timedelta(hours=3), MONDAY + timedelta(hours=5)),
+        (MONDAY, MONDAY + timedelta(hours=3)),
+    ]
+    assert result["unscheduled"] == []
+
+
+def test_cycles_are_reported_unscheduled():
+    tasks = chain(1, 1)
+    tasks[0].dependencies = [TaskDependency(task_id=str(tasks[1].id), task_title=tasks[1].title)]
+
+    result = scheduler().schedule(tasks, start=MONDAY)
+
+    assert result["dates"] == {}
+    assert sorted(result["unscheduled"]) == sorted(str(task.id) for task in tasks)
+
+
+def frozen_clock(monkeypatch, moment):
+    class Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return clock["now"]
+
+    clock = {"now": moment}
+    monkeypatch.setattr(scheduler_module, "datetime", Clock)
+    return clock
+
+
+async def test_rescheduling_later_leaves_work_in_progress_untouched(db, monkeypatch, seed_goal):
+    clock = frozen_clock(monkeypatch, MONDAY)
+    goal, tasks = await seed_goal(task_count=3)
+    await Task.get_motor_collection().update_one({"_id": tasks[0].id}, {"$set": {"estimated_hours": 8}})
+    await task_service.update_task_status(str(tasks[0].id), TaskStatus.IN_PROGRESS)
+
+    first = await task_service.reschedule_goal(str(goal.id))
+    before = await Task.find(Task.goal_id == goal.id).sort("+created_at").to_list()
+    goal_version = (await Goal.get(goal.id)).version
+
+    # Two hours later the started task is on track, so nothing moves
+    clock["now"] = MONDAY + timedelta(hours=2, minutes=20)
+    second = await task_service.reschedule_goal(str(goal.id))
+    after = await Task.find(Task.goal_id == goal.id).sort("+created_at").to_list()
+
+    assert first["updated_tasks"] == 3
+    assert second["updated_tasks"] == 0
+    assert [(t.start_date, t.end_date, t.version) for t in after] == [(t.start_date, t.end_date, t.version) for t in before]
+    assert after[0].start_date == MONDAY
+    assert (await Goal.get(goal.id)).version == goal_version
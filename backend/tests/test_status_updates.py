@@ -0,0 +1,109 @@
+import asyncio
+import random
+
+import pytest
+
+from app.models import Goal, Task, TaskStatus
+from app.services.task_service import VersionConflictError, task_service
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_updates_lose_no_writes_and_keep_counts(db, interleave, seed_goal):
+    goal, tasks = await seed_goal()
+    rng = random.Random(7)
+    plan = [(rng.choice(tasks), rng.choice(list(TaskStatus))) for _ in range(200)]
+
+    await asyncio.gather(*(task_service.update_task_status(str(task.id), status) for task, status in plan))
+
+    stored = await Task.find(Task.goal_id == goal.id).to_list()
+    for task in stored:
+        assert task.version == sum(1 for planned, _ in plan if planned.id == task.id)
+    goal = await Goal.get(goal.id)
+    recount = task_service._compute_progress(stored)
+    for status in TaskStatus:
+        assert getattr(goal.progress, status.value) == getattr(recount, status.value)
+    assert goal.progress.completed_hours == recount.completed_hours
+    assert goal.version == len(plan)
+    # The last change to bump the version refreshed from every earlier one
+    assert not goal.needs_refresh
+    assert goal.progress.next_actionable == recount.next_actionable
+
+
+async def test_status_update_writes_task_then_goal_then_refresh(db, interleave, seed_goal):
+    goal, tasks = await seed_goal()
+
+    interleave.clear()
+    result = await task_service.update_task_status(str(tasks[0].id), TaskStatus.COMPLETED)
+
+    assert interleave == {"find_one_and_update": 2, "find_one": 1, "to_list": 1, "update_one": 1}
+    assert result["progress"].completed == 1
+    assert result["progress"].completed_hours == 1
+    assert [dep.task_title for dep in result["progress"].next_actionable] == ["Task 1"]
+
+
+async def test_only_one_conditional_update_wins(db, interleave, seed_goal):
+    goal, tasks = await seed_goal()
+
+    results = await asyncio.gather(
+        *(task_service.update_task_status(str(tasks[0].id), status, expected_version=0) for status in list(TaskStatus) * 5),
+        return_exceptions=True
+    )
+
+    assert sum(not isinstance(result, Exception) for result in results) == 1
+    assert all(isinstance(result, VersionConflictError) for result in results if isinstance(result, Exception))
+    assert (await Task.get(tasks[0].id)).version == 1
+
+
+async def test_status_change_refreshes_next_actionable(db, seed_goal):
+    goal, tasks = await seed_goal(4)
+    await task_service.update_task_status(str(tasks[0].id), TaskStatus.COMPLETED)
+    await task_service.update_task_status(str(tasks[1].id), TaskStatus.IN_PROGRESS)
+
+    stored = await Goal.get(goal.id)
+    assert not stored.needs_refresh
+    assert [dep.task_title for dep in stored.progress.next_actionable] == ["Task 1"]
+    listed = await Goal.find_all().to_list()
+    assert [dep.task_title for dep in listed[0].progress.next_actionable] == ["Task 1"]
+
+
+async def test_detail_read_writes_nothing(db, seed_goal):
+    goal, tasks = await seed_goal(3)
+    await Goal.get_motor_collection().update_one({"_id": goal.id}, {"$set": {"needs_refresh": True}})
+    await Task.get_motor_collection().update_one({"_id": tasks[0].id}, {"$set": {"status": "completed"}})
+    before = await Goal.get_motor_collection().find_one({"_id": goal.id})
+
+    detail = await task_service.get_goal_with_tasks(str(goal.id))
+
+    assert [dep.task_title for dep in detail["goal"].progress.next_actionable] == ["Task 1"]
+    assert await Goal.get_motor_collection().find_one({"_id": goal.id}) == before
+    assert detail["goal"].version == before["version"]
+
+
+async def test_refresh_keeps_flag_when_goal_changed_meanwhile(db, seed_goal):
+    goal, tasks = await seed_goal(3)
+    await task_service.update_task_status(str(tasks[0].id), TaskStatus.COMPLETED)
+    goal = await Goal.get(goal.id)
+    # A status change lands after the goal was read; its own refresh is still to come
+    await Task.get_motor_collection().update_one({"_id": tasks[1].id}, {"$set": {"status": "completed"}})
+    await Goal.get_motor_collection().update_one({"_id": goal.id}, {"$inc": {"version": 1}, "$set": {"needs_refresh": True}})
+
+    task_docs = await Task.find(Task.goal_id == goal.id).to_list()
+    await task_service._refresh_goal(goal, task_docs, reschedule=False)
+
+    assert (await Goal.get(goal.id)).needs_refresh
+
+
+async def test_goal_without_rollups_is_backfilled_on_status_change(db, seed_goal):
+    goal, tasks = await seed_goal(3, progress=False)
+
+    detail = await task_service.get_goal_with_tasks(str(goal.id))
+    assert detail["goal"].progress.pending == 3
+    assert (await Goal.get(goal.id)).progress is None
+
+    result = await task_service.update_task_status(str(tasks[0].id), TaskStatus.COMPLETED)
+
+    stored = await Goal.get(goal.id)
+    assert stored.progress == result["progress"]
+    assert stored.progress.completed == 1
+    assert [dep.task_title for dep in stored.progress.next_actionable] == ["Task 1"]
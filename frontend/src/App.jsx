@@ -23,21 +23,93 @@ function App() {
   const [tasks, setTasks] = useState([])
   const [loading, setLoading] = useState(false)
   const [goals, setGoals] = useState([])
+  const [goalsCursor, setGoalsCursor] = useState(null)
+  const [loadingMoreGoals, setLoadingMoreGoals] = useState(false)
 
   // Fetch all goals on mount
   useEffect(() => {
     fetchGoals()
   }, [])
 
-  // ✅ FIXED: Use baseURL properly (no hardcoded URL)
+  // Goals created elsewhere (other tabs, background jobs) appear at the top
+  useEffect(() => {
+    const source = new EventSource(new URL('/api/goals/events', axios.defaults.baseURL), { withCredentials: true })
+    source.addEventListener('goal_created', (event) => {
+      const { goal } = JSON.parse(event.data)
+      setGoals(prev => prev.some(g => g.id === goal.id) ? prev : [goal, ...prev])
+    })
+    return () => source.close()
+  }, [])
+
+  // Live task changes for the open goal arrive as small patches
+  const goalId = currentGoal?.id
+  useEffect(() => {
+    if (!goalId) return
+    const source = new EventSource(new URL(`/api/goals/${goalId}/events`, axios.defaults.baseURL), { withCredentials: true })
+    let dropped = false
+
+    const refetch = async () => {
+      try {
+        const response = await axios.get(`/api/goals/${goalId}`)
+        setCurrentGoal(response.data.goal)
+        setTasks(response.data.tasks)
+      } catch (error) {
+        console.error('Failed to refresh goal:', error)
+      }
+    }
+
+    source.addEventListener('patch', (event) => {
+      const patch = JSON.parse(event.data)
+      setTasks(prev => {
+        const byId = new Map(patch.tasks.map(task => [task.id, task]))
+        const removed = new Set(patch.removed || [])
+        const merged = prev
+          .filter(task => !removed.has(task.id))
+          .map(task => byId.has(task.id) ? { ...task, ...byId.get(task.id) } : task)
+        const known = new Set(prev.map(task => task.id))
+        // Unknown ids are new tasks, sent in full
+        return merged.concat(patch.tasks.filter(task => !known.has(task.id) && task.title))
+      })
+      if (patch.progress) {
+        setCurrentGoal(prev => prev?.id === patch.goal_id ? { ...prev, progress: patch.progress } : prev)
+      }
+    })
+    // Events were missed (slow client or reconnect): reload once
+    source.addEventListener('resync', refetch)
+    source.onerror = () => { dropped = true }
+    source.onopen = () => {
+      if (dropped) refetch()
+      dropped = false
+    }
+    return () => source.close()
+  }, [goalId])
+
+  // Goals are paginated; fetchGoals loads the first page, loadMoreGoals the next
   const fetchGoals = async () => {
     try {
-      const response = await axios.get('/api/goals/')  // ✅ Uses baseURL + this path
-      console.log('Goals API response:', response.data)
-      setGoals(response.data)
+      const response = await axios.get('/api/goals/')
+      setGoals(response.data.goals)
+      setGoalsCursor(response.data.next_cursor)
     } catch (error) {
       console.error('Failed to fetch goals:', error)
       setGoals([])
+      setGoalsCursor(null)
+    }
+  }
+
+  const loadMoreGoals = async () => {
+    if (!goalsCursor || loadingMoreGoals) return
+    setLoadingMoreGoals(true)
+    try {
+      const response = await axios.get('/api/goals/', {
+        params: { cursor: goalsCursor }
+      })
+      setGoals(prev => [...prev, ...response.data.goals])
+      setGoalsCursor(response.data.next_cursor)
+    } catch (error) {
+      console.error('Failed to load more goals:', error)
+    } finally {
+      setLoadingMoreGoals(false)
     }
   }
 
@@ -64,14 +136,17 @@ function App() {
 
   const handleTaskUpdate = async (taskId, newStatus) => {
     try {
-      await axios.patch(`/api/tasks/${taskId}/status`, {
+      const response = await axios.patch(`/api/tasks/${taskId}/status`, {
         status: newStatus
       })
       
-      // Update local state
-      setTasks(tasks.map(task => 
+      // Update local state (the live patch for this change may land first)
+      setTasks(prev => prev.map(task => 
         task.id === taskId ? { ...task, status: newStatus } : task
       ))
+      if (response.data.goal_progress) {
+        setCurrentGoal(prev => ({ ...prev, progress: response.data.goal_progress }))
+      }
     } catch (error) {
       console.error('Failed to update task:', error)
     }
@@ -158,6 +233,9 @@ function App() {
                 goals={goals} 
                 onGoalSelect={handleGoalSelect}
                 currentGoalId={currentGoal?.id}
+                hasMore={Boolean(goalsCursor)}
+                loadingMore={loadingMoreGoals}
+                onLoadMore={loadMoreGoals}
               />
             </div>
           </div>
@@ -197,6 +275,7 @@ function App() {
 
             <TaskList 
               tasks={tasks} 
+              progress={currentGoal.progress}
               onTaskUpdate={handleTaskUpdate}
             />
           </div>
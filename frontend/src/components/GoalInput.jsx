@@ -1,4 +1,4 @@
-import { useState } from 'react'
+import { useEffect, useRef, useState } from 'react'
 import { Target, Calendar, FileText, Sparkles, AlertCircle } from 'lucide-react'
 import axios from 'axios'
 
@@ -9,29 +9,83 @@ export default function GoalInput({ onGoalCreated }) {
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState(null)
 
+  const [streamedTasks, setStreamedTasks] = useState([])
+
+  // One Idempotency-Key per goal: retries after a failure or a double
+  // submit reuse it, so the backend creates the goal at most once
+  const idempotencyKey = useRef(null)
+  const submitting = useRef(false)
+
+  useEffect(() => {
+    idempotencyKey.current = null
+  }, [title, description, deadline])
+
+  // Read the NDJSON stream from /api/goals/stream, rendering tasks as they arrive
   const handleSubmit = async (e) => {
     e.preventDefault()
+    if (submitting.current) return
+    submitting.current = true
+    if (!idempotencyKey.current) {
+      idempotencyKey.current = crypto.randomUUID()
+    }
     setError(null)
+    setStreamedTasks([])
     setLoading(true)
 
     try {
-      const response = await axios.post('/api/goals/', {
-        title,
-        description,
-        deadline: deadline || null
+      const response = await fetch(new URL('/api/goals/stream', axios.defaults.baseURL), {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Idempotency-Key': idempotencyKey.current
+        },
+        credentials: 'include',
+        body: JSON.stringify({
+          title,
+          description,
+          deadline: deadline || null
+        })
       })
 
-      if (response.data.success) {
-        onGoalCreated(response.data)
-        // Clear form
-        setTitle('')
-        setDescription('')
-        setDeadline('')
+      if (!response.ok || !response.body) {
+        throw new Error(`Request failed with status ${response.status}`)
+      }
+
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+
+      while (true) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+
+        const lines = buffer.split('\n')
+        buffer = lines.pop()
+
+        for (const line of lines) {
+          if (!line.trim()) continue
+          const event = JSON.parse(line)
+
+          if (event.type === 'task') {
+            setStreamedTasks(prev => [...prev, event.task])
+          } else if (event.type === 'complete') {
+            onGoalCreated({ success: true, ...event })
+            // Clear form
+            setTitle('')
+            setDescription('')
+            setDeadline('')
+            setStreamedTasks([])
+          } else if (event.type === 'error') {
+            throw new Error(event.detail)
+          }
+        }
       }
     } catch (err) {
-      setError(err.response?.data?.detail || 'Failed to create goal. Please try again.')
+      setError(err.message || 'Failed to create goal. Please try again.')
       console.error('Error creating goal:', err)
     } finally {
+      submitting.current = false
       setLoading(false)
     }
   }
@@ -129,6 +183,28 @@ export default function GoalInput({ onGoalCreated }) {
         </button>
       </form>
 
+      {/* Live preview while the plan is being generated */}
+      {loading && streamedTasks.length > 0 && (
+        <div className="mt-6 pt-6 border-t border-gray-200">
+          <h3 className="text-sm font-semibold text-gray-900 mb-2">
+            Planning... {streamedTasks.length} tasks so far
+          </h3>
+          <ul className="space-y-2">
+            {streamedTasks.map((task, index) => (
+              <li key={task.id} className="flex items-start space-x-2 text-sm">
+                <span className="text-gray-400">{index + 1}.</span>
+                <div>
+                  <p className="font-medium text-gray-900">{task.title}</p>
+                  {task.estimated_hours && (
+                    <p className="text-xs text-gray-500">{task.estimated_hours}h • {task.priority}</p>
+                  )}
+                </div>
+              </li>
+            ))}
+          </ul>
+        </div>
+      )}
+
       {/* Tips Section */}
       <div className="mt-6 pt-6 border-t border-gray-200">
         <h3 className="text-sm font-semibold text-gray-900 mb-2">💡 Tips for better results:</h3>
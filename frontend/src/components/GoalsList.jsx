@@ -1,6 +1,14 @@
 import { Target, Calendar, Clock, ChevronRight } from 'lucide-react'
 
-export default function GoalsList({ goals, onGoalSelect, currentGoalId }) {
+export default function GoalsList({ goals, onGoalSelect, currentGoalId, hasMore, loadingMore, onLoadMore }) {
+  // Load the next page when the list is scrolled near its bottom
+  const handleScroll = (e) => {
+    const { scrollTop, scrollHeight, clientHeight } = e.currentTarget
+    if (hasMore && !loadingMore && scrollHeight - scrollTop - clientHeight < 80) {
+      onLoadMore()
+    }
+  }
+
   const formatDate = (dateString) => {
     if (!dateString) return null
     const date = new Date(dateString)
@@ -30,7 +38,7 @@ export default function GoalsList({ goals, onGoalSelect, currentGoalId }) {
           <p className="text-xs text-gray-400 mt-1">Create your first goal to get started</p>
         </div>
       ) : (
-        <div className="space-y-2 max-h-96 overflow-y-auto">
+        <div className="space-y-2 max-h-96 overflow-y-auto" onScroll={handleScroll}>
           {goals.map((goal) => (
             <button
               key={goal.id}
@@ -65,6 +73,11 @@ export default function GoalsList({ goals, onGoalSelect, currentGoalId }) {
                         {goal.total_estimated_hours}h
                       </span>
                     )}
+                    {goal.progress?.total_tasks > 0 && (
+                      <span className="flex items-center">
+                        {goal.progress.completed}/{goal.progress.total_tasks} done
+                      </span>
+                    )}
                   </div>
                 </div>
                 
@@ -74,13 +87,22 @@ export default function GoalsList({ goals, onGoalSelect, currentGoalId }) {
               </div>
             </button>
           ))}
+          {hasMore && (
+            <button
+              onClick={onLoadMore}
+              disabled={loadingMore}
+              className="w-full py-2 text-xs text-primary-600 hover:text-primary-700"
+            >
+              {loadingMore ? 'Loading...' : 'Load more goals'}
+            </button>
+          )}
         </div>
       )}
 
       {goals.length > 0 && (
         <div className="mt-4 pt-4 border-t border-gray-200">
           <p className="text-xs text-gray-500 text-center">
-            {goals.length} goal{goals.length !== 1 ? 's' : ''} created
+            {goals.length}{hasMore ? '+' : ''} goal{goals.length !== 1 ? 's' : ''} created
           </p>
         </div>
       )}
@@ -1,6 +1,6 @@
 import { Clock, AlertCircle, CheckCircle2, Circle, Pause, Link2 } from 'lucide-react'
 
-export default function TaskList({ tasks, onTaskUpdate }) {
+export default function TaskList({ tasks, progress, onTaskUpdate }) {
   const getStatusIcon = (status) => {
     switch (status) {
       case 'completed':
@@ -45,8 +45,14 @@ export default function TaskList({ tasks, onTaskUpdate }) {
     return status.replace('_', ' ').replace(/\b\w/g, l => l.toUpperCase())
   }
 
-  // Calculate statistics
-  const stats = {
+  // Use the goal's server-side rollups, falling back to counting tasks
+  const stats = progress ? {
+    total: progress.total_tasks,
+    completed: progress.completed,
+    inProgress: progress.in_progress,
+    pending: progress.pending,
+    totalHours: progress.total_hours
+  } : {
     total: tasks.length,
     completed: tasks.filter(t => t.status === 'completed').length,
     inProgress: tasks.filter(t => t.status === 'in_progress').length,